@@ -1,80 +1,185 @@
-import pandas as pd
-import numpy as np
+"""
+Synthetic double-entry journal (accounting_journal.csv and larger)
+
+Every transaction is one scenario (a debit account, a credit account and a
+description), a date and an amount, written as a debit line followed by its
+credit line. Scenarios, dates and amounts are drawn as whole arrays and
+expanded to the paired lines with np.repeat and strided assignment.
+
+The date range is cut into shards of --shard-days consecutive days. The
+number of transactions per day is drawn once up front, so a shard knows
+its transaction ids without looking at the others, and each shard draws
+from its own seed (seed, shard). Shards run in worker processes and write
+a part file each, the parts are joined in shard order. The output is
+byte-identical for any --workers and sorted by (Date, Transaction_ID).
+
+    python generate_data.py
+    python generate_data.py --transactions 5000000 --days 365 --workers 4 --output ledger.parquet
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# Setup some basic accounts
+ACCOUNTS = {
+    '1000': {'name': 'Cash', 'category': 'Asset'},
+    '1200': {'name': 'Accounts Receivable', 'category': 'Asset'},
+    '2000': {'name': 'Accounts Payable', 'category': 'Liability'},
+    '3000': {'name': 'Owner Equity', 'category': 'Equity'},
+    '4000': {'name': 'Sales Revenue', 'category': 'Revenue'},
+    '5000': {'name': 'Rent Expense', 'category': 'Expense'},
+    '5100': {'name': 'Salary Expense', 'category': 'Expense'},
+    '5200': {'name': 'Office Supplies', 'category': 'Expense'}
+}
+
+# scenario: (debit account, credit account, description)
+SCENARIOS = {
+    'Sale_Cash': ('1000', '4000', "Cash sale to customer"),
+    'Sale_Credit': ('1200', '4000', "Invoice sent to customer"),
+    'Pay_Rent': ('5000', '1000', "Monthly rent payment"),
+    'Pay_Salary': ('5100', '1000', "Employee salary payout"),
+    'Buy_Supplies': ('5200', '2000', "Bought supplies on credit"),
+}
+
+COLUMNS = ['Transaction_ID', 'Date', 'Account_ID', 'Account_Name', 'Category', 'Description', 'Debit', 'Credit']
+FORMATS = ('csv', 'parquet')
+
+# lookup tables indexed by scenario / account code position
+_ACCOUNT_IDS = list(ACCOUNTS)
+_ACCOUNT_NAMES = [a['name'] for a in ACCOUNTS.values()]
+_CATEGORIES = list(dict.fromkeys(a['category'] for a in ACCOUNTS.values()))
+_ACCOUNT_CATEGORY = np.array([_CATEGORIES.index(a['category']) for a in ACCOUNTS.values()])
+_DEBIT = np.array([_ACCOUNT_IDS.index(dr) for dr, _, _ in SCENARIOS.values()])
+_CREDIT = np.array([_ACCOUNT_IDS.index(cr) for _, cr, _ in SCENARIOS.values()])
+_DESCRIPTIONS = [desc for _, _, desc in SCENARIOS.values()]
+
+
+def daily_counts(n_transactions, days, seed):
+    """Transactions per day, drawn before any shard runs"""
+    rng = np.random.default_rng(np.random.SeedSequence(seed))
+    return rng.multinomial(n_transactions, np.full(days, 1 / days))
+
+
+def generate_shard(counts, first_day, first_id, start_date, seed, shard):
+    """
+    The journal lines of days first_day .. first_day + len(counts) - 1 with
+    counts[i] transactions on each, numbered from first_id in date order
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(shard,)))
+    n = int(counts.sum())
+    day = np.repeat(np.arange(len(counts)), counts)
+    scenario = rng.integers(0, len(SCENARIOS), n)
+    amount = np.round(rng.uniform(50, 5000, n), 2)
+
+    # line 2i is the debit of transaction i, line 2i + 1 its credit
+    account = np.empty(2 * n, dtype=np.int64)
+    account[0::2] = _DEBIT[scenario]
+    account[1::2] = _CREDIT[scenario]
+    debit = np.zeros(2 * n)
+    debit[0::2] = amount
+    credit = np.zeros(2 * n)
+    credit[1::2] = amount
+
+    dates = [(start_date + timedelta(days=first_day + d)).strftime('%Y-%m-%d') for d in range(len(counts))]
+    ids = np.char.add('TXN-', np.arange(first_id, first_id + n).astype(str))
+    # categoricals keep the repeated strings as small codes until they are written
+    return pd.DataFrame({
+        'Transaction_ID': np.repeat(ids, 2),
+        'Date': pd.Categorical.from_codes(np.repeat(day, 2), dates),
+        'Account_ID': pd.Categorical.from_codes(account, _ACCOUNT_IDS),
+        'Account_Name': pd.Categorical.from_codes(account, _ACCOUNT_NAMES),
+        'Category': pd.Categorical.from_codes(_ACCOUNT_CATEGORY[account], _CATEGORIES),
+        'Description': pd.Categorical.from_codes(np.repeat(scenario, 2), _DESCRIPTIONS),
+        'Debit': debit,
+        'Credit': credit,
+    }, columns=COLUMNS)
+
+
+def _write_shard(task):
+    path, fmt, counts, first_day, first_id, start_date, seed, shard = task
+    df = generate_shard(counts, first_day, first_id, start_date, seed, shard)
+    if fmt == 'csv':
+        df.to_csv(path, index=False, header=False)
+    else:
+        # plain strings, so every part has the same Arrow schema
+        df.astype({c: str for c in COLUMNS[:6]}).to_parquet(path, index=False)
+    return len(df)
+
+
+def _join_parts(parts, output, fmt):
+    if fmt == 'csv':
+        with open(output, 'w', newline='') as out:
+            out.write(','.join(COLUMNS) + '\n')
+        with open(output, 'ab') as out:
+            for part in parts:
+                with open(part, 'rb') as f:
+                    shutil.copyfileobj(f, out)
+        return
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for part in parts:
+            table = pq.read_table(part)
+            if writer is None:
+                writer = pq.ParquetWriter(output, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def generate_accounting_data(n_transactions=50, output='accounting_journal.csv', fmt=None,
+                             start_date=datetime(2026, 4, 1), days=30, first_id=100,
+                             seed=42, shard_days=1, workers=1):
+    """Write the journal to output (csv or parquet, from the extension by default), returns the line count"""
+    fmt = fmt or ('parquet' if output.endswith('.parquet') else 'csv')
+    if fmt not in FORMATS:
+        raise ValueError(f'format must be one of {FORMATS}, got {fmt!r}')
+    if days < 1 or shard_days < 1:
+        raise ValueError('days and shard_days must be at least 1')
+
+    counts = daily_counts(n_transactions, days, seed)
+    starts = range(0, days, shard_days)
+    # ids continue across shards in date order
+    first_ids = first_id + np.concatenate(([0], np.cumsum(counts)))[list(starts)]
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as tmp:
+        tasks = [
+            (os.path.join(tmp, f'part-{shard:05d}.{fmt}'), fmt, counts[day:day + shard_days],
+             day, int(first_ids[shard]), start_date, seed, shard)
+            for shard, day in enumerate(starts)
+        ]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                lines = sum(pool.map(_write_shard, tasks))
+        else:
+            lines = sum(map(_write_shard, tasks))
+        _join_parts([task[0] for task in tasks], output, fmt)
+    print(f"Created '{output}' successfully! ({lines} lines)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=50, help='each one is a debit and a credit line')
+    parser.add_argument('--output', default='accounting_journal.csv')
+    parser.add_argument('--format', choices=FORMATS, help='default: from the output extension')
+    parser.add_argument('--start-date', type=datetime.fromisoformat, default=datetime(2026, 4, 1))
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--first-id', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--shard-days', type=int, default=1, help='days per shard, fixes the output layout')
+    parser.add_argument('--workers', type=int, default=1, help='processes, does not change the output')
+    args = parser.parse_args()
+    generate_accounting_data(
+        args.transactions, args.output, args.format, args.start_date, args.days,
+        args.first_id, args.seed, args.shard_days, args.workers,
+    )
+
 
-def generate_accounting_data():
-    np.random.seed(42) # For reproducibility
-    
-    # Setup some basic accounts
-    accounts = {
-        '1000': {'name': 'Cash', 'category': 'Asset'},
-        '1200': {'name': 'Accounts Receivable', 'category': 'Asset'},
-        '2000': {'name': 'Accounts Payable', 'category': 'Liability'},
-        '3000': {'name': 'Owner Equity', 'category': 'Equity'},
-        '4000': {'name': 'Sales Revenue', 'category': 'Revenue'},
-        '5000': {'name': 'Rent Expense', 'category': 'Expense'},
-        '5100': {'name': 'Salary Expense', 'category': 'Expense'},
-        '5200': {'name': 'Office Supplies', 'category': 'Expense'}
-    }
-
-    start_date = datetime(2026, 4, 1)
-    data = []
-    transaction_id = 100
-
-    # Generate 50 random transactions (each needs a debit and a credit)
-    for _ in range(50):
-        date = start_date + timedelta(days=np.random.randint(0, 30))
-        amount = round(np.random.uniform(50, 5000), 2)
-        
-        # Randomly choose a transaction scenario
-        scenario = np.random.choice(['Sale_Cash', 'Sale_Credit', 'Pay_Rent', 'Pay_Salary', 'Buy_Supplies'])
-        
-        if scenario == 'Sale_Cash':
-            dr_acc, cr_acc = '1000', '4000'
-            desc = "Cash sale to customer"
-        elif scenario == 'Sale_Credit':
-            dr_acc, cr_acc = '1200', '4000'
-            desc = "Invoice sent to customer"
-        elif scenario == 'Pay_Rent':
-            dr_acc, cr_acc = '5000', '1000'
-            desc = "Monthly rent payment"
-        elif scenario == 'Pay_Salary':
-            dr_acc, cr_acc = '5100', '1000'
-            desc = "Employee salary payout"
-        else: # Buy_Supplies
-            dr_acc, cr_acc = '5200', '2000'
-            desc = "Bought supplies on credit"
-
-        # DEBIT Entry
-        data.append({
-            'Transaction_ID': f'TXN-{transaction_id}',
-            'Date': date.strftime('%Y-%m-%d'),
-            'Account_ID': dr_acc,
-            'Account_Name': accounts[dr_acc]['name'],
-            'Category': accounts[dr_acc]['category'],
-            'Description': desc,
-            'Debit': amount,
-            'Credit': 0.0
-        })
-        
-        # CREDIT Entry
-        data.append({
-            'Transaction_ID': f'TXN-{transaction_id}',
-            'Date': date.strftime('%Y-%m-%d'),
-            'Account_ID': cr_acc,
-            'Account_Name': accounts[cr_acc]['name'],
-            'Category': accounts[cr_acc]['category'],
-            'Description': desc,
-            'Debit': 0.0,
-            'Credit': amount
-        })
-        
-        transaction_id += 1
-
-    df = pd.DataFrame(data)
-    # Sort by date and transaction ID
-    df = df.sort_values(by=['Date', 'Transaction_ID']).reset_index(drop=True)
-    df.to_csv('accounting_journal.csv', index=False)
-    print("Created 'accounting_journal.csv' successfully!")
-
-generate_accounting_data()
+if __name__ == '__main__':
+    main()
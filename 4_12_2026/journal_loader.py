@@ -0,0 +1,129 @@
+"""
+Typed loader for accounting_journal.csv style journals
+
+pd.read_csv with default dtypes keeps every name, category and description
+as a full string per line (a Python object per cell before pandas 3),
+Account_ID as int64 and Date as unparsed text.
+load_journal reads the same columns with a declared schema:
+
+    Account_Name, Category, Description                  category
+    Transaction_ID                                        str (one value per transaction, too
+                                                          many distinct ones for a category)
+    Account_ID                                            int32
+    Date                                                  datetime64, parsed with an explicit format
+    Debit, Credit                                         float64, or int64 cents with amounts='cents'
+
+Dates are read as a categorical and only the distinct strings are parsed
+(a journal has a few hundred dates over millions of lines), through a
+cache that lives for the whole file so chunked reads parse each date once.
+
+    python journal_loader.py accounting_journal.csv
+    python journal_loader.py ledger.csv --date-format %Y-%m-%d --chunksize 1000000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# what the committed accounting_journal.csv uses, generate_data.py writes %Y-%m-%d
+DATE_FORMAT = '%m/%d/%Y'
+AMOUNTS = ('float', 'cents')
+MONEY_COLUMNS = ['Debit', 'Credit']
+
+SCHEMA = {
+    'Transaction_ID': 'str',
+    'Date': 'category',
+    'Account_ID': 'int32',
+    'Account_Name': 'category',
+    'Category': 'category',
+    'Description': 'category',
+    'Debit': 'float64',
+    'Credit': 'float64',
+}
+
+
+def _parse_dates(column, date_format, cache):
+    """Categorical date strings to datetime64, parsing only strings not in cache"""
+    categories = column.cat.categories
+    new = [value for value in categories if value not in cache]
+    if new:
+        cache.update(zip(new, pd.to_datetime(pd.Index(new), format=date_format)))
+    lookup = pd.DatetimeIndex([cache[value] for value in categories])
+    # code -1 (an empty cell) becomes NaT
+    return pd.Series(lookup.take(column.cat.codes.to_numpy(), allow_fill=True), index=column.index, name=column.name)
+
+
+def _to_cents(column):
+    return np.round(column.to_numpy() * 100).astype(np.int64)
+
+
+def _normalize(chunk, date_format, amounts, cache):
+    chunk['Date'] = _parse_dates(chunk['Date'], date_format, cache)
+    if amounts == 'cents':
+        for name in MONEY_COLUMNS:
+            chunk[name] = _to_cents(chunk[name])
+    return chunk
+
+
+def iter_journal(path, chunksize, date_format=DATE_FORMAT, amounts='float'):
+    """Yield typed chunks of chunksize lines, each with its own categories"""
+    if amounts not in AMOUNTS:
+        raise ValueError(f'amounts must be one of {AMOUNTS}, got {amounts!r}')
+    cache = {}
+    with pd.read_csv(path, dtype=SCHEMA, usecols=list(SCHEMA), chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield _normalize(chunk, date_format, amounts, cache)
+
+
+def _concat(chunks):
+    """pd.concat that keeps categoricals when the chunks saw different categories"""
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for name in chunks[0].columns:
+        if isinstance(chunks[0][name].dtype, pd.CategoricalDtype):
+            columns[name] = union_categoricals([chunk[name] for chunk in chunks])
+        else:
+            columns[name] = pd.concat([chunk[name] for chunk in chunks], ignore_index=True)
+    return pd.DataFrame(columns, columns=chunks[0].columns)
+
+
+def load_journal(path, date_format=DATE_FORMAT, amounts='float', chunksize=None):
+    """
+    The whole journal as one typed frame. With chunksize the file is parsed
+    that many lines at a time and the chunks are joined, which bounds the
+    parser's own memory on multi-GB files
+    """
+    if amounts not in AMOUNTS:
+        raise ValueError(f'amounts must be one of {AMOUNTS}, got {amounts!r}')
+    if chunksize:
+        return _concat(list(iter_journal(path, chunksize, date_format, amounts)))
+    df = pd.read_csv(path, dtype=SCHEMA, usecols=list(SCHEMA))
+    return _normalize(df, date_format, amounts, {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', nargs='?', default='accounting_journal.csv')
+    parser.add_argument('--date-format', default=DATE_FORMAT)
+    parser.add_argument('--amounts', choices=AMOUNTS, default='float')
+    parser.add_argument('--chunksize', type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    plain = pd.read_csv(args.path)
+    plain_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    typed = load_journal(args.path, args.date_format, args.amounts, args.chunksize)
+    typed_seconds = time.perf_counter() - start
+
+    plain_mb = plain.memory_usage(deep=True).sum() / 2**20
+    typed_mb = typed.memory_usage(deep=True).sum() / 2**20
+    print(f'{len(typed)} lines')
+    print(f'pd.read_csv   {plain_seconds:8.3f}s {plain_mb:10.1f} MB')
+    print(f'load_journal  {typed_seconds:8.3f}s {typed_mb:10.1f} MB  ({plain_mb / typed_mb:.1f}x less memory)')
+
+
+if __name__ == '__main__':
+    main()
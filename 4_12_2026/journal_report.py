@@ -0,0 +1,204 @@
+"""
+The practice.ipynb report set in one pass over the journal
+
+practice.ipynb computes the expense summary, the frequency tables, the
+revenue/expense totals, the top 5 expenses and the trial balance with a
+separate groupby, filter or sort over the whole frame each. journal_report
+reads the journal once, in chunks from journal_loader.iter_journal, and
+keeps per (Category, Account_Name) debit/credit sums and line counts with
+np.bincount over the categorical codes. Every table in the bundle is a
+roll-up of those few rows. The largest expense debits go through a heap
+bounded at k entries.
+
+Results are cached on disk under the file's content hash, so running the
+report again on an unchanged journal only hashes the file and unpickles.
+
+    python journal_report.py accounting_journal.csv
+    python journal_report.py ledger.csv --date-format %Y-%m-%d --top 10
+"""
+import argparse
+import hashlib
+import heapq
+import os
+import pickle
+import time
+import numpy as np
+import pandas as pd
+from journal_loader import DATE_FORMAT, iter_journal
+
+# bump when the bundle's contents change, so old cache entries are not read
+REPORT_VERSION = 1
+CHUNKSIZE = 1_000_000
+CACHE_DIR = '.journal_report_cache'
+TOP_COLUMNS = ['Date', 'Account_Name', 'Description', 'Debit']
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'blake2b').hexdigest()
+
+
+class _Totals:
+    """Running sums per (Category, Account_Name) pair, grown as chunks bring new pairs"""
+
+    def __init__(self):
+        self.keys = {}
+        self.debit = np.zeros(0)
+        self.credit = np.zeros(0)
+        self.lines = np.zeros(0, dtype=np.int64)
+
+    def add(self, chunk):
+        # pairs seen in this chunk, as codes into the chunk's own categoricals
+        category = chunk['Category'].cat
+        account = chunk['Account_Name'].cat
+        n_accounts = len(account.categories)
+        combined = category.codes.to_numpy(np.int64) * n_accounts + account.codes.to_numpy(np.int64)
+        uniques, codes = np.unique(combined, return_inverse=True)
+        slots = np.array([
+            self.keys.setdefault(
+                (category.categories[pair // n_accounts], account.categories[pair % n_accounts]), len(self.keys)
+            )
+            for pair in uniques
+        ], dtype=np.int64)
+        if len(self.keys) > len(self.debit):
+            grow = len(self.keys) - len(self.debit)
+            self.debit = np.concatenate([self.debit, np.zeros(grow)])
+            self.credit = np.concatenate([self.credit, np.zeros(grow)])
+            self.lines = np.concatenate([self.lines, np.zeros(grow, dtype=np.int64)])
+        rows = slots[codes]
+        size = len(self.keys)
+        self.debit += np.bincount(rows, weights=chunk['Debit'].to_numpy(), minlength=size)
+        self.credit += np.bincount(rows, weights=chunk['Credit'].to_numpy(), minlength=size)
+        self.lines += np.bincount(rows, minlength=size)
+
+    def frame(self):
+        index = pd.MultiIndex.from_tuples(list(self.keys), names=['Category', 'Account_Name'])
+        return pd.DataFrame({'Debit': self.debit, 'Credit': self.credit, 'Lines': self.lines}, index=index)
+
+
+def _push_top(heap, chunk, offset, k):
+    """Offer the chunk's largest expense debits to a min-heap of at most k"""
+    expense = chunk['Category'] == 'Expense'
+    debit = chunk['Debit'].to_numpy()
+    candidates = np.flatnonzero(expense.to_numpy() & (debit > 0))
+    if len(heap) == k:
+        candidates = candidates[debit[candidates] >= heap[0][0]]
+    if len(candidates) > k:
+        # everything tied with the k-th largest stays in, the heap settles ties
+        kth = np.partition(debit[candidates], len(candidates) - k)[len(candidates) - k]
+        candidates = candidates[debit[candidates] >= kth]
+    rows = chunk[TOP_COLUMNS].iloc[candidates]
+    for position, row in zip(candidates, rows.itertuples(index=False)):
+        # earlier lines win ties, like a stable sort of the whole frame
+        item = (row.Debit, -(offset + position), tuple(row))
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+
+def compute_report(path, top=5, date_format=DATE_FORMAT, chunksize=CHUNKSIZE):
+    """One pass over the journal, see build_report for the bundle"""
+    totals = _Totals()
+    heap = []
+    offset = 0
+    for chunk in iter_journal(path, chunksize, date_format):
+        totals.add(chunk)
+        if top:
+            _push_top(heap, chunk, offset, top)
+        offset += len(chunk)
+    return build_report(totals.frame(), sorted(heap, reverse=True), offset)
+
+
+def build_report(pairs, top_items, lines):
+    """The report bundle from the per (Category, Account_Name) sums"""
+    trial_balance = pairs.groupby(level='Account_Name', sort=True)[['Debit', 'Credit']].sum().reset_index()
+    trial_balance['Net_Change'] = trial_balance['Debit'] - trial_balance['Credit']
+    by_category = pairs.groupby(level='Category', sort=True)[['Debit', 'Credit', 'Lines']].sum()
+
+    def category(name, column):
+        return float(by_category[column].get(name, 0.0))
+
+    total_revenue = category('Revenue', 'Credit') - category('Revenue', 'Debit')
+    total_expenses = category('Expense', 'Debit') - category('Expense', 'Credit')
+    return {
+        'lines': lines,
+        'trial_balance': trial_balance,
+        'drill_down': pairs[['Debit', 'Credit']].sort_index(),
+        'expense_summary': trial_balance[['Account_Name', 'Debit']]
+        .sort_values('Debit', ascending=False, kind='stable').reset_index(drop=True),
+        'category_totals': by_category[['Debit', 'Credit']],
+        'account_counts': pairs['Lines'].groupby(level='Account_Name').sum().sort_values(ascending=False, kind='stable'),
+        'category_counts': by_category['Lines'].sort_values(ascending=False, kind='stable'),
+        'top_expenses': pd.DataFrame([row for _, _, row in top_items], columns=TOP_COLUMNS),
+        'total_revenue': total_revenue,
+        'total_expenses': total_expenses,
+        'net_income': total_revenue - total_expenses,
+        'total_assets': category('Asset', 'Debit') - category('Asset', 'Credit'),
+        'total_liabilities': category('Liability', 'Credit') - category('Liability', 'Debit'),
+    }
+
+
+def journal_report(path, top=5, date_format=DATE_FORMAT, chunksize=CHUNKSIZE, cache_dir=CACHE_DIR):
+    """
+    The report bundle for the journal at path, from the cache when this exact
+    file content was reported on before with the same top and date format.
+    cache_dir=None always recomputes
+    """
+    if cache_dir is None:
+        return compute_report(path, top, date_format, chunksize)
+    key = hashlib.blake2b(
+        repr((REPORT_VERSION, file_digest(path), top, date_format)).encode(), digest_size=16
+    ).hexdigest()
+    cached = os.path.join(cache_dir, f'{key}.pkl')
+    if os.path.exists(cached):
+        with open(cached, 'rb') as f:
+            return pickle.load(f)
+    report = compute_report(path, top, date_format, chunksize)
+    os.makedirs(cache_dir, exist_ok=True)
+    # write then rename, a reader never sees half a file
+    with open(cached + '.tmp', 'wb') as f:
+        pickle.dump(report, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(cached + '.tmp', cached)
+    return report
+
+
+def print_report(report):
+    print(report['expense_summary'])
+    print(f"                       {report['expense_summary']['Debit'].sum()}")
+    print(report['account_counts'])
+    print(report['category_counts'])
+    print(f"Total Revenue: ${report['total_revenue']}")
+    print(f"Total Expenses: ${report['total_expenses']}")
+    print(f"Net Income: ${report['net_income']}")
+    print(report['top_expenses'])
+    print('---End of month Trial Balance ---')
+    print(report['trial_balance'])
+    print(report['drill_down'])
+    print('--- The Balance Sheet ----')
+    print(f"Total Assets: ${report['total_assets']:,.2f}")
+    print(f"Total Liabilities ${report['total_liabilities']:,.2f}")
+    print(f"Total Equity: ${report['net_income']:,.2f} (from net Income)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', nargs='?', default='accounting_journal.csv')
+    parser.add_argument('--date-format', default=DATE_FORMAT)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = journal_report(
+        args.path, args.top, args.date_format, args.chunksize, None if args.no_cache else args.cache_dir
+    )
+    seconds = time.perf_counter() - start
+    print_report(report)
+    print(f"{report['lines']} lines in {seconds:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+generate_data: the output depends on the seed and the shard layout only,
+never on how many worker processes write the shards.
+"""
+import pandas as pd
+import pytest
+from generate_data import generate_accounting_data
+
+
+def generate(tmp_path, name, **kwargs):
+    output = str(tmp_path / name)
+    options = dict(n_transactions=400, days=9, first_id=100, seed=7, shard_days=2)
+    options.update(kwargs)
+    lines = generate_accounting_data(output=output, **options)
+    return output, lines
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_output_is_identical_for_any_worker_count(tmp_path, fmt):
+    outputs = [generate(tmp_path, f'journal-{workers}.{fmt}', workers=workers) for workers in (1, 2, 4)]
+    assert {lines for _, lines in outputs} == {800}
+    if fmt == 'csv':
+        contents = [open(path, 'rb').read() for path, _ in outputs]
+        assert contents[1:] == contents[:1] * 2
+    else:
+        frames = [pd.read_parquet(path) for path, _ in outputs]
+        for frame in frames[1:]:
+            pd.testing.assert_frame_equal(frame, frames[0])
+
+
+def test_journal_is_balanced_and_in_date_order(tmp_path):
+    path, _ = generate(tmp_path, 'journal.csv', workers=2)
+    df = pd.read_csv(path)
+    per_transaction = df.groupby('Transaction_ID')[['Debit', 'Credit']].sum()
+    assert (per_transaction['Debit'].round(2) == per_transaction['Credit'].round(2)).all()
+    assert (df.groupby('Transaction_ID').size() == 2).all()
+    ids = df['Transaction_ID'].str.removeprefix('TXN-').astype(int)
+    assert df['Date'].is_monotonic_increasing and ids.is_monotonic_increasing
+    assert ids.iloc[0] == 100 and ids.iloc[-1] == 499
@@ -0,0 +1,47 @@
+"""
+journal_loader: the typed frame holds the same values as a plain
+pd.read_csv of the journal, whole or in chunks, in currency or cents.
+"""
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from generate_data import generate_accounting_data
+from journal_loader import SCHEMA, load_journal
+
+JOURNAL = Path(__file__).resolve().parent.parent / 'accounting_journal.csv'
+
+
+def plain(path, date_format):
+    """What practice.ipynb reads, with the dates parsed the slow way"""
+    df = pd.read_csv(path)[list(SCHEMA)]
+    df['Date'] = pd.to_datetime(df['Date'], format=date_format)
+    return df
+
+
+def assert_same_values(typed, expected):
+    assert list(typed.columns) == list(expected.columns)
+    for name in typed.columns:
+        assert typed[name].tolist() == expected[name].tolist(), name
+
+
+@pytest.mark.parametrize('chunksize', [None, 7])
+def test_committed_journal_matches_read_csv(chunksize):
+    typed = load_journal(JOURNAL, chunksize=chunksize)
+    assert_same_values(typed, plain(JOURNAL, '%m/%d/%Y'))
+    assert typed['Account_ID'].dtype == np.int32
+    assert isinstance(typed['Category'].dtype, pd.CategoricalDtype)
+    assert typed['Date'].dtype.kind == 'M'
+
+
+def test_chunked_generated_journal_in_cents(tmp_path):
+    path = tmp_path / 'journal.csv'
+    generate_accounting_data(n_transactions=300, output=str(path), days=20, seed=3)
+    expected = plain(path, '%Y-%m-%d')
+    for name in ['Debit', 'Credit']:
+        expected[name] = (expected[name] * 100).round().astype(np.int64)
+    typed = load_journal(path, date_format='%Y-%m-%d', amounts='cents', chunksize=64)
+    assert_same_values(typed, expected)
+    assert typed['Debit'].dtype == np.int64
+    # the chunks saw different subsets of categories, the join keeps one categorical
+    assert typed['Description'].cat.categories.is_unique
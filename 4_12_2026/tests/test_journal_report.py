@@ -0,0 +1,77 @@
+"""
+journal_report: the one-pass bundle matches what the practice.ipynb cells
+compute over the whole frame, however the journal is chunked, and a cached
+bundle matches a fresh one.
+"""
+from pathlib import Path
+import pandas as pd
+import pytest
+from generate_data import generate_accounting_data
+from journal_report import compute_report, journal_report
+
+JOURNAL = Path(__file__).resolve().parent.parent / 'accounting_journal.csv'
+
+
+def notebook_report(path, date_format, top):
+    """The practice.ipynb cells, one groupby/filter/sort each"""
+    df = pd.read_csv(path)
+    trial_balance = df.groupby('Account_Name')[['Debit', 'Credit']].sum().reset_index()
+    trial_balance['Net_Change'] = trial_balance['Debit'] - trial_balance['Credit']
+    revenue_data = df[df['Category'] == 'Revenue']
+    expense_data = df[df['Category'] == 'Expense']
+    assets_data = df[df['Category'] == 'Asset']
+    liabilities_data = df[df['Category'] == 'Liability']
+    total_revenue = revenue_data['Credit'].sum() - revenue_data['Debit'].sum()
+    total_expenses = expense_data['Debit'].sum() - expense_data['Credit'].sum()
+    top_expenses = expense_data.sort_values(by='Debit', ascending=False, kind='stable').head(top)
+    top_expenses = top_expenses[['Date', 'Account_Name', 'Description', 'Debit']].reset_index(drop=True)
+    top_expenses['Date'] = pd.to_datetime(top_expenses['Date'], format=date_format)
+    return {
+        'lines': len(df),
+        'trial_balance': trial_balance,
+        'drill_down': df.groupby(['Category', 'Account_Name'])[['Debit', 'Credit']].sum(),
+        'expense_summary': df.groupby('Account_Name')['Debit'].sum().reset_index()
+        .sort_values(by='Debit', ascending=False).reset_index(drop=True),
+        'account_counts': df['Account_Name'].value_counts(),
+        'category_counts': df['Category'].value_counts(),
+        'top_expenses': top_expenses,
+        'total_revenue': total_revenue,
+        'total_expenses': total_expenses,
+        'net_income': total_revenue - total_expenses,
+        'total_assets': assets_data['Debit'].sum() - assets_data['Credit'].sum(),
+        'total_liabilities': liabilities_data['Credit'].sum() - liabilities_data['Debit'].sum(),
+    }
+
+
+def assert_same_report(report, expected):
+    assert report['lines'] == expected['lines']
+    for name in ['total_revenue', 'total_expenses', 'net_income', 'total_assets', 'total_liabilities']:
+        assert report[name] == pytest.approx(expected[name]), name
+    for name in ['trial_balance', 'drill_down', 'expense_summary', 'top_expenses']:
+        pd.testing.assert_frame_equal(report[name], expected[name], check_dtype=False,
+                                      check_index_type=False, check_categorical=False, obj=name)
+    for name in ['account_counts', 'category_counts']:
+        # counts tie often, compare them per label
+        assert report[name].to_dict() == expected[name].to_dict(), name
+        assert report[name].is_monotonic_decreasing, name
+
+
+@pytest.mark.parametrize('chunksize', [1_000_000, 17])
+def test_committed_journal_matches_the_notebook(chunksize):
+    report = compute_report(JOURNAL, chunksize=chunksize)
+    assert_same_report(report, notebook_report(JOURNAL, '%m/%d/%Y', 5))
+
+
+def test_chunked_generated_journal_matches_the_notebook(tmp_path):
+    path = tmp_path / 'journal.csv'
+    generate_accounting_data(n_transactions=2000, output=str(path), days=30, seed=11)
+    report = compute_report(path, top=10, date_format='%Y-%m-%d', chunksize=250)
+    assert_same_report(report, notebook_report(path, '%Y-%m-%d', 10))
+
+
+def test_cached_report_matches_a_fresh_one(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    first = journal_report(JOURNAL, cache_dir=cache_dir)
+    assert len(list(cache_dir.iterdir())) == 1
+    second = journal_report(JOURNAL, cache_dir=cache_dir)
+    assert_same_report(second, first)
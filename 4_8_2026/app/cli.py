@@ -0,0 +1,149 @@
+"""
+Maintenance commands for the accounting database
+
+    python -m app.cli balances verify
+    python -m app.cli balances rebuild
+    python -m app.cli rollups verify
+    python -m app.cli rollups rebuild
+    python -m app.cli closure verify
+    python -m app.cli closure rebuild
+    python -m app.cli import-journal accounting_journal.csv
+    python -m app.cli import-invoices ar_aging_data.csv
+    python -m app.cli migrate
+"""
+import argparse
+import sys
+import time
+from sqlmodel import Session
+from app.database import engine,create_db_and_tables
+from app.migrations import SCHEMA_VERSION
+from app.services.posting import (
+    rebuild_account_balances,verify_account_balances,
+    rebuild_monthly_rollups,verify_monthly_rollups,
+)
+from app.services.hierarchy import rebuild_account_closure,verify_account_closure
+from app.services.journal_import import import_journal_csv,DEFAULT_CHUNKSIZE
+from app.services.aging import import_invoices_csv
+
+
+def _rebuild_or_verify(action:str,label:str,rebuild,verify) -> int:
+    with Session(engine) as session:
+        if action == 'rebuild':
+            count = rebuild(session)
+            session.commit()
+            print(f'rebuilt {count} {label} rows')
+            return 0
+
+        drift = verify(session)
+        for row in drift:
+            key = ' '.join(
+                f'{k}={v}' for k,v in row.items() if not k.startswith(('expected_','stored_'))
+            )
+            print(
+                f"{key}: "
+                f"debit {row['stored_debit']} (expected {row['expected_debit']}), "
+                f"credit {row['stored_credit']} (expected {row['expected_credit']})"
+            )
+        print(f'{len(drift)} {label} row(s) drifted')
+        return 1 if drift else 0
+
+
+def balances(args) -> int:
+    return _rebuild_or_verify(
+        args.action,'account balance',rebuild_account_balances,verify_account_balances
+    )
+
+
+def rollups(args) -> int:
+    return _rebuild_or_verify(
+        args.action,'monthly rollup',rebuild_monthly_rollups,verify_monthly_rollups
+    )
+
+
+def closure(args) -> int:
+    with Session(engine) as session:
+        if args.action == 'rebuild':
+            count = rebuild_account_closure(session)
+            session.commit()
+            print(f'rebuilt {count} account closure rows')
+            return 0
+        problems = verify_account_closure(session)
+        for row in problems:
+            print(f"{row['problem']}: ancestor {row['ancestor_id']} -> descendant {row['descendant_id']} depth {row['depth']}")
+        print(f'{len(problems)} account closure row(s) out of sync')
+        return 1 if problems else 0
+
+
+def import_journal(args) -> int:
+    with Session(engine) as session:
+        start = time.perf_counter()
+        try:
+            report = import_journal_csv(
+                session,args.path,chunksize=args.chunksize,date_format=args.date_format
+            )
+        except ValueError as exc:
+            print(exc,file=sys.stderr)
+            return 2
+        elapsed = time.perf_counter() - start
+    for error in report['errors']:
+        print(f"{error['transaction_id']}: {error['error']}")
+    rate = report['lines_imported'] / elapsed if elapsed else 0
+    print(
+        f"imported {report['entries_imported']} entries / {report['lines_imported']} lines "
+        f"in {elapsed:.2f}s ({rate:,.0f} lines/s), rejected {report['entries_rejected']} entries"
+    )
+    return 1 if report['entries_rejected'] else 0
+
+
+def import_invoices(args) -> int:
+    with Session(engine) as session:
+        count = import_invoices_csv(session,args.path)
+        session.commit()
+    print(f'loaded {count} invoices')
+    return 0
+
+
+def migrate(args) -> int:
+    for step in create_db_and_tables():
+        print(step)
+    print(f'schema is at version {SCHEMA_VERSION}')
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m app.cli')
+    commands = parser.add_subparsers(dest='command',required=True)
+
+    balances_cmd = commands.add_parser('balances',help='materialized account balances')
+    balances_cmd.add_argument('action',choices=['verify','rebuild'])
+    balances_cmd.set_defaults(func=balances)
+
+    rollups_cmd = commands.add_parser('rollups',help='per account monthly rollups')
+    rollups_cmd.add_argument('action',choices=['verify','rebuild'])
+    rollups_cmd.set_defaults(func=rollups)
+
+    closure_cmd = commands.add_parser('closure',help='account hierarchy closure table')
+    closure_cmd.add_argument('action',choices=['verify','rebuild'])
+    closure_cmd.set_defaults(func=closure)
+
+    import_cmd = commands.add_parser('import-journal',help='bulk load a journal CSV')
+    import_cmd.add_argument('path')
+    import_cmd.add_argument('--chunksize',type=int,default=DEFAULT_CHUNKSIZE)
+    import_cmd.add_argument('--date-format',default=None,help='e.g. %%m/%%d/%%Y')
+    import_cmd.set_defaults(func=import_journal)
+
+    invoices_cmd = commands.add_parser('import-invoices',help='load or refresh invoices from an AR aging CSV')
+    invoices_cmd.add_argument('path')
+    invoices_cmd.set_defaults(func=import_invoices)
+
+    migrate_cmd = commands.add_parser('migrate',help='upgrade an existing database schema')
+    migrate_cmd.set_defaults(func=migrate)
+
+    args = parser.parse_args(argv)
+    if args.func is not migrate:
+        create_db_and_tables()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
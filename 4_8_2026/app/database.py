@@ -1,12 +1,98 @@
-from sqlmodel import SQLModel,Session,create_engine
+import os
+from sqlalchemy import event
+from sqlmodel import SQLModel,Session,create_engine,select
+from app.migrations import migrate
+from app.models.transactions import Account,AccountClosure
+from app.services.hierarchy import rebuild_account_closure
+# registers the session hooks that bump DataVersion, in every process that writes
+from app.services import report_cache  # noqa: F401
+from app.profiling import sql_profiler
 
-DATABASE_URL = 'sqlite:///./accounting.db'
+DATABASE_PATH = os.getenv('ACCOUNTING_DB_PATH','./accounting.db')
+DATABASE_URL = f'sqlite:///{DATABASE_PATH}'
 
-engine = create_engine(DATABASE_URL,echo=True)
+# 'default' keeps the development behaviour (SQL echo, stock SQLite settings),
+# 'performance' turns echo off and runs both engines on WAL with tuned pragmas
+DATABASE_PROFILE = os.getenv('ACCOUNTING_DB_PROFILE','default')
 
-def create_db_and_tables():
+PROFILES = {
+    'default':{
+        'echo':True,
+        'read_pool_size':5,
+        'pragmas':{},
+    },
+    'performance':{
+        'echo':False,
+        'read_pool_size':int(os.getenv('ACCOUNTING_DB_READ_POOL','8')),
+        'pragmas':{
+            'journal_mode':'WAL',
+            'synchronous':'NORMAL',
+            'cache_size':-64000,        # KiB, so 64MB of page cache per connection
+            'mmap_size':268435456,      # 256MB
+            'temp_store':'MEMORY',
+            'busy_timeout':5000,
+        },
+    },
+}
+
+
+def _set_pragmas(engine,pragmas:dict,read_only:bool = False):
+    @event.listens_for(engine,'connect')
+    def _on_connect(dbapi_connection,connection_record):
+        cursor = dbapi_connection.cursor()
+        for name,value in pragmas.items():
+            # journal mode is a property of the file, only the writer sets it
+            if read_only and name == 'journal_mode':
+                continue
+            cursor.execute(f'PRAGMA {name}={value}')
+        if read_only:
+            cursor.execute('PRAGMA query_only=ON')
+        cursor.close()
+
+
+def create_engines(path:str = DATABASE_PATH,profile:str = DATABASE_PROFILE):
+    """
+    Build the (write, read) engine pair for a database file.
+    The read engine opens the file read-only and is used by report traffic
+    """
+    settings = PROFILES[profile]
+    write_engine = create_engine(
+        f'sqlite:///{path}',echo=settings['echo'],
+        connect_args={'check_same_thread':False},
+    )
+    read_engine = create_engine(
+        f'sqlite:///file:{path}?mode=ro&uri=true',echo=settings['echo'],
+        pool_size=settings['read_pool_size'],
+        connect_args={'check_same_thread':False},
+    )
+    _set_pragmas(write_engine,settings['pragmas'])
+    _set_pragmas(read_engine,settings['pragmas'],read_only=True)
+    return write_engine,read_engine
+
+
+engine,read_engine = create_engines()
+sql_profiler.instrument(engine)
+sql_profiler.instrument(read_engine)
+
+def create_db_and_tables() -> list[str]:
+    """Create missing tables, migrate existing ones, returns the migration steps applied"""
     SQLModel.metadata.create_all(engine)
+    steps = migrate(engine)
+    # create_all only indexes tables it creates, add new indexes to existing ones
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine,checkfirst=True)
+    # databases from before the closure table get it built once
+    with Session(engine) as session:
+        if session.exec(select(AccountClosure)).first() is None and session.exec(select(Account)).first() is not None:
+            steps.append(f'built {rebuild_account_closure(session)} account closure rows')
+            session.commit()
+    return steps
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def get_read_session():
+    with Session(read_engine) as session:
+        yield session
@@ -1,13 +1,17 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from app.database import create_db_and_tables
-from app.routers import reports,webhooks
+from app.routers import reports,webhooks,imports,metrics
+from app.profiling import SQLProfilerMiddleware,sql_profiler
+from app.services.ingestion import ingestion_queue
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    await ingestion_queue.start()
     yield
+    await ingestion_queue.stop()
 
 
 app = FastAPI(
@@ -19,6 +23,9 @@ app = FastAPI(
 
 app.include_router(reports.router)
 app.include_router(webhooks.router)
+app.include_router(imports.router)
+app.include_router(metrics.router)
+app.add_middleware(SQLProfilerMiddleware,profiler=sql_profiler)
 
 @app.get('/')
 def root():
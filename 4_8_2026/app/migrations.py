@@ -0,0 +1,115 @@
+"""
+In-place schema migrations for existing accounting databases
+
+The schema version lives in PRAGMA user_version. create_db_and_tables runs
+migrate() on every start, fresh databases are created at SCHEMA_VERSION and
+only get stamped.
+
+    1: TransactionLine, AccountBalance and AccountMonthlyRollup store money as
+       integer cents instead of REAL
+    2: JournalEntry.idempotency_key, the webhook key, moves out of
+       reference_number into its own uniquely indexed column
+"""
+from sqlalchemy import Engine
+from sqlalchemy.schema import CreateIndex,CreateTable
+from sqlmodel import Session
+from app.models.transactions import JournalEntry,TransactionLine,AccountBalance,AccountMonthlyRollup
+from app.money import to_cents
+from app.services.posting import rebuild_account_balances,rebuild_monthly_rollups
+
+SCHEMA_VERSION = 2
+MONEY_TABLES = (TransactionLine,AccountBalance,AccountMonthlyRollup)
+
+
+def migrate(engine:Engine) -> list[str]:
+    """Bring the database up to SCHEMA_VERSION, returns the steps applied"""
+    with engine.connect() as conn:
+        version = conn.exec_driver_sql('PRAGMA user_version').scalar()
+    steps = []
+    if version < 1:
+        steps += _money_to_cents(engine)
+    if version < 2:
+        steps += _add_idempotency_key(engine)
+    if version != SCHEMA_VERSION:
+        with engine.connect() as conn:
+            conn.exec_driver_sql(f'PRAGMA user_version={SCHEMA_VERSION}')
+    return steps
+
+
+def _column_type(conn,table:str,column:str) -> str:
+    for row in conn.exec_driver_sql(f'PRAGMA table_info({table})'):
+        if row[1] == column:
+            return row[2].upper()
+    return None
+
+
+def _money_to_cents(engine:Engine) -> list[str]:
+    """
+    A REAL column keeps turning integers back into floats, so the money
+    tables are rebuilt with INTEGER columns. Lines are copied over through
+    to_cents; the balance and rollup stores are recomputed from them.
+    Everything runs in one transaction.
+    """
+    with engine.connect() as conn:
+        stale = [
+            model.__table__ for model in MONEY_TABLES
+            if _column_type(conn,model.__tablename__,'debit') not in (None,'INTEGER')
+        ]
+    if not stale:
+        return []
+
+    steps = []
+    with engine.connect() as conn:
+        # pysqlite does not open transactions for DDL, so manage it by hand
+        dbapi_connection = conn.connection.driver_connection
+        isolation_level = dbapi_connection.isolation_level
+        dbapi_connection.isolation_level = None
+        dbapi_connection.create_function('to_cents',1,to_cents,deterministic=True)
+        try:
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+            for table in stale:
+                old = f'_{table.name}_real'
+                for (index,) in conn.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                    (table.name,)
+                ).all():
+                    conn.exec_driver_sql(f'DROP INDEX {index}')
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} RENAME TO {old}')
+                conn.execute(CreateTable(table))
+                for index in table.indexes:
+                    conn.execute(CreateIndex(index))
+                if table is TransactionLine.__table__:
+                    conn.exec_driver_sql(
+                        f'INSERT INTO {table.name} (id,journal_entry_id,account_id,debit,credit,memo) '
+                        f'SELECT id,journal_entry_id,account_id,to_cents(debit),to_cents(credit),memo FROM {old}'
+                    )
+                    steps.append(f'converted {table.name} amounts to cents')
+                conn.exec_driver_sql(f'DROP TABLE {old}')
+
+            session = Session(bind=conn)
+            steps.append(f'rebuilt {rebuild_account_balances(session)} account balance rows')
+            steps.append(f'rebuilt {rebuild_monthly_rollups(session)} monthly rollup rows')
+            session.close()
+            conn.exec_driver_sql('COMMIT')
+        except Exception:
+            conn.exec_driver_sql('ROLLBACK')
+            raise
+        finally:
+            dbapi_connection.isolation_level = isolation_level
+    return steps
+
+
+def _add_idempotency_key(engine:Engine) -> list[str]:
+    """
+    Entries posted before this step keep their key in reference_number only;
+    it is not copied over since imported Transaction_IDs share that column
+    and cannot be told apart from webhook keys.
+    """
+    table = JournalEntry.__table__
+    with engine.begin() as conn:
+        if _column_type(conn,table.name,'idempotency_key') is not None:
+            return []
+        conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN idempotency_key VARCHAR')
+        for index in table.indexes:
+            index.create(conn,checkfirst=True)
+    return [f'added {table.name}.idempotency_key']
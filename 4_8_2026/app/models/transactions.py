@@ -1,4 +1,4 @@
-from sqlmodel import SQLModel,Field
+from sqlmodel import SQLModel,Field,Index
 from datetime import datetime,date
 from typing import Optional
 from enum import Enum
@@ -14,22 +14,92 @@ class Account(SQLModel,table=True):
     id: Optional[int] = Field(default=None,primary_key=True)
     code: str = Field(unique=True)
     name: str
-    account_type:AccountType
+    account_type:AccountType = Field(index=True)
     parent_id:Optional[int] = None
     is_active:bool = True
 
 class JournalEntry(SQLModel,table=True):
+    # idempotency_key is the webhook sender's key, kept apart from
+    # reference_number (free text, Transaction_ID on imports) so the two
+    # cannot collide; unique, so a retry can never post twice
+    __table_args__ = (
+        Index('ix_journalentry_date','date'),
+        Index('ix_journalentry_idempotency_key','idempotency_key',unique=True),
+    )
+
     id:Optional[int] = Field(default=None,primary_key=True)
     date: date
     description:str
     reference_number:Optional[str]=None
+    idempotency_key:Optional[str]=None
     created_at:datetime = Field(default_factory=datetime.utcnow)
 
 class TransactionLine(SQLModel,table=True):
+    # debit/credit are integer cents (see app.money), carried in the index so
+    # per-account sums never touch the table
+    __table_args__ = (
+        Index('ix_transactionline_account_entry','account_id','journal_entry_id','debit','credit'),
+    )
 
     id:Optional[int] = Field(default=None,primary_key=True)
-    journal_entry_id:int = Field(foreign_key='journalentry.id')
+    journal_entry_id:int = Field(foreign_key='journalentry.id',index=True)
     account_id:int = Field(foreign_key='account.id')
-    debit: float = 0.0
-    credit: float = 0.0
-    memo:Optional[str] = None
\ No newline at end of file
+    debit: int = 0
+    credit: int = 0
+    memo:Optional[str] = None
+
+class AccountBalance(SQLModel,table=True):
+    """
+    Running debit/credit totals per account in cents, kept in step with
+    TransactionLine by app.services.posting so reports do not rescan the ledger
+    """
+    account_id:int = Field(foreign_key='account.id',primary_key=True)
+    debit: int = 0
+    credit: int = 0
+
+
+class AccountMonthlyRollup(SQLModel,table=True):
+    """
+    Debit/credit totals in cents per account per calendar month (month is the 1st),
+    so date-range reports read whole months here instead of raw lines
+    """
+    __table_args__ = (
+        Index('ix_accountmonthlyrollup_type_month','account_type','month','debit','credit'),
+    )
+
+    account_id:int = Field(foreign_key='account.id',primary_key=True)
+    month: date = Field(primary_key=True)
+    account_type:AccountType
+    debit: int = 0
+    credit: int = 0
+
+
+class Invoice(SQLModel,table=True):
+    id:Optional[int] = Field(default=None,primary_key=True)
+    invoice_number: str = Field(unique=True)
+    customer_name: str
+    invoice_date: date
+    due_date: date
+    invoice_amount: float
+    amount_paid: float = 0.0
+
+
+class AccountClosure(SQLModel,table=True):
+    """
+    Every (ancestor, descendant) pair of the Account.parent_id tree, including
+    each account paired with itself at depth 0. Maintained by
+    app.services.hierarchy so subtree totals are a single join
+    """
+    ancestor_id:int = Field(foreign_key='account.id',primary_key=True)
+    descendant_id:int = Field(foreign_key='account.id',primary_key=True,index=True)
+    depth:int
+
+
+class DataVersion(SQLModel,table=True):
+    """
+    Commit counter per cached data set ('ledger', 'aging'), bumped inside the
+    writing transaction by app.services.report_cache, so any process can tell
+    that its cached reports are stale
+    """
+    name:str = Field(primary_key=True)
+    version:int = 0
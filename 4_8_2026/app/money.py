@@ -0,0 +1,58 @@
+"""
+Money is stored and summed as integer cents (64-bit minor units).
+These helpers convert at the edges: amounts coming in from payloads and
+CSVs go through to_cents, amounts going out in responses through
+from_cents / present.
+"""
+from decimal import Decimal,ROUND_HALF_UP
+import numpy as np
+
+CENT = Decimal('0.01')
+
+# response fields that carry cents and are shown in currency units
+MONEY_FIELDS = {
+    'debit','credit','balance','debit_balance','credit_balance',
+    'total_revenue','total_expenses','net_income','assets','liabilities','equity',
+}
+
+
+def to_cents(amount) -> int:
+    """
+    Currency units -> cents, half up. Floats go through their shortest repr
+    so 0.285 becomes 29, not the 28 that round(0.285 * 100) gives
+    """
+    if amount is None:
+        return 0
+    if isinstance(amount,int):
+        return amount * 100
+    if not isinstance(amount,Decimal):
+        amount = Decimal(repr(amount) if isinstance(amount,float) else str(amount))
+    return int(amount.quantize(CENT,rounding=ROUND_HALF_UP) * 100)
+
+
+def to_cents_array(amounts:np.ndarray) -> np.ndarray:
+    """
+    Vectorized to_cents for parsed CSV columns. Scaling first and snapping to
+    6 decimals absorbs the binary error (0.285 * 100 == 28.499999999999996),
+    then halves round away from zero like to_cents
+    """
+    scaled = np.round(np.asarray(amounts,dtype=np.float64) * 100,6)
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)
+
+
+def from_cents(cents:int) -> float:
+    """Cents -> currency units for JSON, exact to the cent"""
+    return (cents or 0) / 100
+
+
+def present(report):
+    """Copy of a report (nested dicts/lists) with MONEY_FIELDS converted to currency units"""
+    if isinstance(report,dict):
+        return {
+            key:from_cents(value) if key in MONEY_FIELDS and isinstance(value,int) and not isinstance(value,bool)
+            else present(value)
+            for key,value in report.items()
+        }
+    if isinstance(report,list):
+        return [present(item) for item in report]
+    return report
@@ -0,0 +1,197 @@
+"""
+Per-request SQL profiling
+
+With SQL_PROFILING=1 every engine passed to sql_profiler.instrument()
+reports its statements to the request that issued them: statement count,
+total DB time, the slowest statements and statements repeated with the
+same shape (the N+1 pattern, same SQL text with different parameters).
+Responses carry the numbers in headers and GET /metrics returns the
+aggregates per route.
+
+Off by default. When off no engine listeners are registered and the
+middleware passes requests straight through.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SQL_PROFILING = os.getenv('SQL_PROFILING','0') == '1'
+# a statement shape seen this many times in one request is flagged as N+1
+SQL_REPEAT_THRESHOLD = int(os.getenv('SQL_REPEAT_THRESHOLD','10'))
+SLOWEST_KEPT = 5
+STATEMENT_PREVIEW = 200
+
+_current = contextvars.ContextVar('sql_profile',default=None)
+
+
+class RequestProfile:
+    __slots__ = ('statements','db_seconds','shapes','slowest')
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.shapes = {}
+        self.slowest = []
+
+    def record(self,statement:str,seconds:float) -> None:
+        self.statements += 1
+        self.db_seconds += seconds
+        # SQLAlchemy renders bound parameters as placeholders, so the text is the shape
+        self.shapes[statement] = self.shapes.get(statement,0) + 1
+        if len(self.slowest) < SLOWEST_KEPT or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds,statement))
+            self.slowest.sort(key=lambda s: s[0],reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+    def repeated(self,threshold:int) -> dict:
+        return {shape:n for shape,n in self.shapes.items() if n >= threshold}
+
+
+class SQLProfiler:
+
+    def __init__(self,enabled:bool = SQL_PROFILING,repeat_threshold:int = SQL_REPEAT_THRESHOLD):
+        self.enabled = enabled
+        self.repeat_threshold = repeat_threshold
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.routes = {}
+            self.repeated_shapes = {}
+            self.slowest = []
+
+    def instrument(self,engine) -> None:
+        """Hook an engine's cursor events, no-op while profiling is off"""
+        if not self.enabled:
+            return
+        event.listen(engine,'before_cursor_execute',_before_cursor_execute)
+        event.listen(engine,'after_cursor_execute',_after_cursor_execute)
+        event.listen(engine,'handle_error',_handle_error)
+
+    def finish(self,route:str,profile:RequestProfile,seconds:float) -> None:
+        """Fold one finished request into the per-route aggregates"""
+        repeated = profile.repeated(self.repeat_threshold)
+        for shape,n in repeated.items():
+            logger.warning('%s ran the same statement %d times: %s',route,n,shape[:STATEMENT_PREVIEW])
+        with self._lock:
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = {
+                    'requests':0,'seconds':0.0,'db_seconds':0.0,
+                    'statements':0,'max_statements':0,'n_plus_one_requests':0,
+                }
+            stats['requests'] += 1
+            stats['seconds'] += seconds
+            stats['db_seconds'] += profile.db_seconds
+            stats['statements'] += profile.statements
+            stats['max_statements'] = max(stats['max_statements'],profile.statements)
+            if repeated:
+                stats['n_plus_one_requests'] += 1
+            for shape,n in repeated.items():
+                key = (route,shape)
+                self.repeated_shapes[key] = max(self.repeated_shapes.get(key,0),n)
+            if profile.slowest:
+                self.slowest.extend((s,route,shape) for s,shape in profile.slowest)
+                self.slowest.sort(key=lambda s: s[0],reverse=True)
+                del self.slowest[SLOWEST_KEPT:]
+
+    def headers(self,profile:RequestProfile) -> list[tuple[bytes,bytes]]:
+        db_ms = profile.db_seconds * 1000
+        return [
+            (b'x-sql-statements',str(profile.statements).encode()),
+            (b'x-sql-time-ms',f'{db_ms:.3f}'.encode()),
+            (b'x-sql-repeated-statements',str(len(profile.repeated(self.repeat_threshold))).encode()),
+            (b'server-timing',f'db;dur={db_ms:.3f};desc="{profile.statements} statements"'.encode()),
+        ]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes = {
+                route:{
+                    'requests':s['requests'],
+                    'avg_ms':round(s['seconds'] * 1000 / s['requests'],3),
+                    'avg_db_ms':round(s['db_seconds'] * 1000 / s['requests'],3),
+                    'db_share':round(s['db_seconds'] / s['seconds'],3) if s['seconds'] else 0.0,
+                    'avg_statements':round(s['statements'] / s['requests'],2),
+                    'max_statements':s['max_statements'],
+                    'n_plus_one_requests':s['n_plus_one_requests'],
+                }
+                for route,s in sorted(self.routes.items())
+            }
+            return {
+                'enabled':self.enabled,
+                'repeat_threshold':self.repeat_threshold,
+                'routes':routes,
+                'n_plus_one':[
+                    {'route':route,'max_repeats':n,'statement':shape[:STATEMENT_PREVIEW]}
+                    for (route,shape),n in sorted(self.repeated_shapes.items(),key=lambda i: -i[1])
+                ],
+                'slowest':[
+                    {'route':route,'ms':round(s * 1000,3),'statement':shape[:STATEMENT_PREVIEW]}
+                    for s,route,shape in self.slowest
+                ],
+            }
+
+
+def _before_cursor_execute(conn,cursor,statement,parameters,context,executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('sql_profile_start',[]).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn,cursor,statement,parameters,context,executemany):
+    profile = _current.get()
+    starts = conn.info.get('sql_profile_start')
+    if profile is not None and starts:
+        profile.record(statement,time.perf_counter() - starts.pop())
+
+
+def _handle_error(context):
+    # a failed statement never reaches after_cursor_execute
+    if _current.get() is not None and context.connection is not None:
+        starts = context.connection.info.get('sql_profile_start')
+        if starts:
+            starts.pop()
+
+
+class SQLProfilerMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware task hop): opens a
+    RequestProfile for the request and adds the headers to the response start
+    """
+
+    def __init__(self,app,profiler:SQLProfiler = None):
+        self.app = app
+        self.profiler = profiler or sql_profiler
+
+    async def __call__(self,scope,receive,send):
+        if scope['type'] != 'http' or not self.profiler.enabled:
+            await self.app(scope,receive,send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+
+        async def send_with_headers(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = list(message.get('headers',[])) + self.profiler.headers(profile)
+            await send(message)
+
+        try:
+            await self.app(scope,receive,send_with_headers)
+        finally:
+            _current.reset(token)
+            # route templates, not raw paths, so 404 probes do not grow the table
+            route = scope.get('route')
+            self.profiler.finish(
+                getattr(route,'path','<unmatched>'),profile,time.perf_counter() - start
+            )
+
+
+sql_profiler = SQLProfiler()
@@ -0,0 +1,23 @@
+from fastapi import APIRouter,Depends,HTTPException,UploadFile,File,Query
+from sqlmodel import Session
+from app.database import get_session
+from app.services.journal_import import import_journal_csv,DEFAULT_CHUNKSIZE
+
+router = APIRouter(prefix='/api/imports',tags=['Imports'])
+
+@router.post('/journal')
+def import_journal(
+    file:UploadFile = File(...),
+    chunksize:int = Query(DEFAULT_CHUNKSIZE,gt=0),
+    date_format:str = Query(None),
+    session:Session = Depends(get_session)
+    ):
+    """
+    Bulk load a CSV in the accounting_journal.csv layout.
+    Entries that fail validation are listed in errors, the rest are imported.
+    An empty file or missing columns are a 400
+    """
+    try:
+        return import_journal_csv(session,file.file,chunksize=chunksize,date_format=date_format)
+    except ValueError as exc:
+        raise HTTPException(status_code=400,detail=str(exc))
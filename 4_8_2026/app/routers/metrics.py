@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from app.profiling import sql_profiler
+
+router = APIRouter(tags=['Metrics'])
+
+
+@router.get('/metrics')
+def metrics():
+    """Per-route SQL aggregates, N+1 suspects and the slowest statements (needs SQL_PROFILING=1)"""
+    return sql_profiler.snapshot()
+
+
+@router.delete('/metrics',status_code=204)
+def reset_metrics():
+    sql_profiler.reset()
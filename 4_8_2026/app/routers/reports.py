@@ -1,41 +1,128 @@
-from fastapi import APIRouter,Depends,Query
+from fastapi import APIRouter,Depends,Query,HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Literal
 from sqlmodel import Session
-from app.database import get_session
+from app.database import get_read_session,read_engine
+from app.money import present
 from app.services.analytics import AccountingAnalytics
-from datetime import date 
+from app.services.aging import AgingEngine
+from app.services.general_ledger import iter_general_ledger,ndjson_chunks,csv_chunks
+from app.services.report_cache import report_cache
+from datetime import date
 
 router = APIRouter(prefix='/api/reports',tags=['Reports'])
 
 @router.get('/trial-balance')
-def trial_balance(session: Session = Depends(get_session)):
-    analytics = AccountingAnalytics(sessions)
-    return analytics.get_trial_balance()
+def trial_balance(
+    rollup:bool = Query(False),
+    session: Session = Depends(get_read_session)
+    ):
+    analytics = AccountingAnalytics(session)
+    return report_cache.get_or_compute(
+        session,'trial-balance',{'rollup':rollup},lambda: present(analytics.get_trial_balance(rollup))
+    )
 
 @router.get('/income-statement')
 def income_statement(
     start_date:date = Query(...),
     end_date: date = Query(...),
-    session:Session = Depends(get_session)
+    session:Session = Depends(get_read_session)
     ):
     analytics = AccountingAnalytics(session)
-    return analytics.get_income_statement(start_date,end_date)
+    return report_cache.get_or_compute(
+        session,'income-statement',
+        {'start_date':start_date,'end_date':end_date},
+        lambda: present(analytics.get_income_statement(start_date,end_date))
+    )
+
+
+@router.get('/income-statement/series')
+def income_statement_series(
+    start_date:date = Query(...),
+    end_date:date = Query(...),
+    grain:Literal['day','week','month','quarter'] = Query('month'),
+    session:Session = Depends(get_read_session)
+    ):
+    """Revenue, expenses, net income and margin per period, e.g. a trailing 12 month P&L"""
+    analytics = AccountingAnalytics(session)
+    try:
+        return report_cache.get_or_compute(
+            session,'income-statement-series',
+            {'start_date':start_date,'end_date':end_date,'grain':grain},
+            lambda: present(analytics.get_income_statement_series(start_date,end_date,grain))
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422,detail=str(exc))
 
 
 @router.get('/balance-sheet')
-def balance_sheet(session:Session = Depends(get_session)):
+def balance_sheet(session:Session = Depends(get_read_session)):
     analytics = AccountingAnalytics(session)
-    return analytics.get_balance_sheet()
+    return report_cache.get_or_compute(
+        session,'balance-sheet',{},lambda: present(analytics.get_balance_sheet())
+    )
 
 
 @router.get('/dashboard')
-def dashboard_summary(session:Session = Depends(get_session)):
+def dashboard_summary(session:Session = Depends(get_read_session)):
 
     analytics = AccountingAnalytics(session)
     today = date.today()
     first_of_month = today.replace(day=1)
 
-    return {
-        'balance_sheet':analytics.get_balance_sheet(),
-        'monthly_pnl':analytics.get_income_statement(first_of_month,today),
-        'generated_at':today.isoformat()
-    }
\ No newline at end of file
+    def build():
+        return present({
+            'balance_sheet':analytics.get_balance_sheet(),
+            'monthly_pnl':analytics.get_income_statement(first_of_month,today),
+            'generated_at':today.isoformat()
+        })
+
+    return report_cache.get_or_compute(session,'dashboard',{'today':today},build)
+
+
+@router.get('/aging')
+def aging(
+    as_of:date = Query(None),
+    customer:list[str] = Query(None),
+    session:Session = Depends(get_read_session)
+    ):
+    as_of = as_of or date.today()
+    # the loaded invoice arrays are cached too, so a new as_of or customer
+    # filter only re-buckets rows instead of reloading every open invoice
+    engine = report_cache.get_or_compute(
+        session,'aging-engine',{},lambda: AgingEngine.from_session(session),depends_on='aging'
+    )
+    return report_cache.get_or_compute(
+        session,'aging',
+        {'as_of':as_of,'customer':tuple(sorted(customer)) if customer else None},
+        lambda: engine.report(as_of,customer),
+        depends_on='aging'
+    )
+
+
+@router.get('/general-ledger')
+def general_ledger(
+    output_format:Literal['ndjson','csv'] = Query('ndjson',alias='format'),
+    start_date:date = Query(None),
+    end_date:date = Query(None),
+    account_code:str = Query(None)
+    ):
+    """Streamed export, one row per transaction line with running balances"""
+
+    # the session has to outlive the handler, so the stream opens its own
+    def stream():
+        with Session(read_engine) as session:
+            batches = iter_general_ledger(session,start_date,end_date,account_code)
+            yield from (ndjson_chunks if output_format == 'ndjson' else csv_chunks)(batches)
+
+    if output_format == 'csv':
+        return StreamingResponse(
+            stream(),media_type='text/csv',
+            headers={'Content-Disposition':'attachment; filename="general-ledger.csv"'}
+        )
+    return StreamingResponse(stream(),media_type='application/x-ndjson')
+
+
+@router.get('/cache-stats')
+def cache_stats():
+    return report_cache.stats()
@@ -1,24 +1,49 @@
-from fastapi import APIRouter,Request
+from fastapi import APIRouter,Request,Header,HTTPException
+from typing import Optional
 import logging
+from app.money import to_cents
+from app.services.ingestion import ingestion_queue,WebhookTransaction,QueueFull
 
 router = APIRouter(prefix='/api/webhook',tags=['Webhooks'])
 
-@router.post('/n8n/transaction')
-async def recieve_from_n8n(request:Request):
+@router.post('/n8n/transaction',status_code=202)
+async def recieve_from_n8n(
+    transaction:WebhookTransaction,
+    idempotency_key:Optional[str] = Header(None)
+    ):
     """
     n8n send classified/processed data back here
-    
+
+    The transaction is queued and written in the next micro-batch, an
+    Idempotency-Key header overrides the key in the body
     """
+    if idempotency_key:
+        transaction.idempotency_key = idempotency_key
+    if not transaction.idempotency_key:
+        raise HTTPException(status_code=400,detail='an Idempotency-Key header or idempotency_key field is required')
+    if len(transaction.lines) < 2:
+        raise HTTPException(status_code=422,detail='a journal entry needs at least two lines')
+    if sum(to_cents(l.debit) - to_cents(l.credit) for l in transaction.lines) != 0:
+        raise HTTPException(status_code=422,detail='debits and credits are not balanced')
 
-    payload = await request.json()
-    logging.info(f'Recieved from n8n:{payload}')
+    try:
+        status = ingestion_queue.submit(transaction)
+    except QueueFull:
+        raise HTTPException(
+            status_code=429,detail='ingestion queue is full',headers={'Retry-After':'1'}
+        )
+    logging.debug('Recieved from n8n: %s (%s)',transaction.idempotency_key,status)
+
+    return {'status':status,'idempotency_key':transaction.idempotency_key}
 
-    return { 'status':'recieved','data':payload }
 
+@router.get('/n8n/metrics')
+def ingestion_metrics():
+    return ingestion_queue.metrics()
 
 
 @router.post('/n8n/alert')
 async def recieve_alrt(request:Request):
     payload = await request.json()
-    logging.info(f"Recieve fron n8n:{payload}")
-    return {'status':'alert_processed'}
\ No newline at end of file
+    logging.debug('Recieve from n8n alert with keys: %s',sorted(payload) if isinstance(payload,dict) else type(payload).__name__)
+    return {'status':'alert_processed'}
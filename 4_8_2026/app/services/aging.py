@@ -0,0 +1,145 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session,select
+from app.models.transactions import Invoice
+
+BUCKETS = ['current','1-30','31-60','61-90','90+']
+# lower bound (days past due) of every bucket after 'current'
+BUCKET_EDGES = np.array([1,31,61,91])
+
+INVOICE_COLUMNS = ['Invoice_ID','Customer_Name','Invoice_Date','Due_Date','Invoice_Amount','Amount_Paid']
+INVOICE_DATE_FORMAT = '%m/%d/%Y'
+
+
+def read_invoice_csv(source) -> pd.DataFrame:
+    """An ar_aging_data.csv style file with its dates parsed"""
+    df = pd.read_csv(source,usecols=INVOICE_COLUMNS)
+    for column in ('Invoice_Date','Due_Date'):
+        df[column] = pd.to_datetime(df[column],format=INVOICE_DATE_FORMAT)
+    return df
+
+
+def import_invoices_csv(session:Session,source) -> int:
+    """
+    Load an ar_aging_data.csv style file into Invoice, keyed on Invoice_ID.
+    Re-importing a newer export updates the amounts of invoices already
+    loaded. Returns the row count. The caller owns the commit
+    """
+    df = read_invoice_csv(source)
+    if not len(df):
+        return 0
+    stmt = sqlite_insert(Invoice)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Invoice.invoice_number],
+        set_={
+            column:stmt.excluded[column]
+            for column in ('customer_name','invoice_date','due_date','invoice_amount','amount_paid')
+        }
+    )
+    session.execute(stmt,[
+        {
+            'invoice_number':number,
+            'customer_name':customer,
+            'invoice_date':invoice_date.date(),
+            'due_date':due_date.date(),
+            'invoice_amount':float(amount),
+            'amount_paid':float(paid),
+        }
+        for number,customer,invoice_date,due_date,amount,paid in df[INVOICE_COLUMNS].itertuples(index=False)
+    ])
+    return len(df)
+
+
+class AgingEngine:
+    """
+    Accounts receivable aging over open invoices held as NumPy arrays.
+
+    Invoices are sorted by customer once at load time, so a report for a
+    handful of customers only slices their rows and the bucketing is one
+    vectorized pass over whatever is selected.
+    """
+
+    def __init__(self,customers,due_dates,outstanding):
+        customers = np.asarray(customers,dtype=object)
+        order = np.argsort(customers,kind='stable')
+        self.customer_names,starts = np.unique(customers[order],return_index=True)
+        self.offsets = np.r_[starts,len(order)]
+        self.due_days = np.asarray(due_dates,dtype='datetime64[D]')[order]
+        self.outstanding = np.asarray(outstanding,dtype=np.float64)[order]
+        self.customer_index = np.repeat(
+            np.arange(len(self.customer_names)),np.diff(self.offsets)
+        )
+
+    @classmethod
+    def from_frame(cls,df:pd.DataFrame) -> 'AgingEngine':
+        """Build from a frame as returned by read_invoice_csv"""
+        outstanding = (df['Invoice_Amount'] - df['Amount_Paid']).to_numpy()
+        open_rows = outstanding > 0
+        return cls(
+            df['Customer_Name'].to_numpy()[open_rows],
+            df['Due_Date'].to_numpy()[open_rows],
+            outstanding[open_rows],
+        )
+
+    @classmethod
+    def from_csv(cls,path) -> 'AgingEngine':
+        """Report straight from an export, without loading it into Invoice"""
+        return cls.from_frame(read_invoice_csv(path))
+
+    @classmethod
+    def from_session(cls,session:Session) -> 'AgingEngine':
+        """Load every open invoice in one query"""
+        rows = session.exec(
+            select(
+                Invoice.customer_name,
+                Invoice.due_date,
+                Invoice.invoice_amount - Invoice.amount_paid,
+            ).where(Invoice.invoice_amount > Invoice.amount_paid)
+        ).all()
+        if not rows:
+            return cls([],[],[])
+        customers,due_dates,outstanding = zip(*rows)
+        return cls(customers,due_dates,outstanding)
+
+    def _rows_for(self,customers) -> tuple[np.ndarray,np.ndarray]:
+        if customers is None:
+            return np.arange(len(self.outstanding)),np.arange(len(self.customer_names))
+        names = np.asarray(customers,dtype=object)
+        positions = np.searchsorted(self.customer_names,names)
+        found = positions < len(self.customer_names)
+        found[found] = self.customer_names[positions[found]] == names[found]
+        positions = np.unique(positions[found])
+        rows = [np.arange(self.offsets[p],self.offsets[p + 1]) for p in positions]
+        return (np.concatenate(rows) if rows else np.array([],dtype=np.int64)),positions
+
+    def report(self,as_of:date,customers:list[str] = None) -> dict:
+        rows,selected = self._rows_for(customers)
+        days_past_due = (np.datetime64(as_of,'D') - self.due_days[rows]).astype(np.int64)
+        bucket = np.digitize(days_past_due,BUCKET_EDGES)
+        amounts = self.outstanding[rows]
+
+        # position of each row's customer within the selection
+        local_customer = np.searchsorted(selected,self.customer_index[rows])
+        grid = np.bincount(
+            local_customer * len(BUCKETS) + bucket,
+            weights=amounts,
+            minlength=len(selected) * len(BUCKETS),
+        ).reshape(len(selected),len(BUCKETS))
+
+        by_customer = []
+        for name,subtotals in zip(self.customer_names[selected],grid.round(2).tolist()):
+            by_customer.append({
+                'customer':name,
+                **dict(zip(BUCKETS,subtotals)),
+                'total':round(sum(subtotals),2),
+            })
+        totals = grid.sum(axis=0).round(2).tolist()
+        return {
+            'as_of':str(as_of),
+            'buckets':BUCKETS,
+            'totals':{**dict(zip(BUCKETS,totals)),'total':round(float(amounts.sum()),2)},
+            'invoice_count':int(len(rows)),
+            'customers':by_customer,
+        }
@@ -1,43 +1,136 @@
+import os
+from collections import defaultdict
+from sqlalchemy import or_
 from sqlmodel import Session, select, func
-from app.models.transactions import TransactionLine,Account,AccountType,JournalEntry
-from datetime import date
+from app.models.transactions import (
+    TransactionLine,Account,AccountType,JournalEntry,AccountBalance,AccountMonthlyRollup,
+    AccountClosure
+)
+from app.services.aging import AgingEngine
+from datetime import date,timedelta
+
+PERIOD_GRAINS = ('day','week','month','quarter')
+MAX_PERIODS = int(os.getenv('REPORT_MAX_PERIODS','1000'))
 
 class AccountingAnalytics:
     
     def __init__(self,session:Session):
         self.session = session
     
-    def get_account_balance(self,account:int) -> float:
+    def get_account_balance(self,account_id:int) -> int:
         """
-        Calculate running balance for an account
+        Calculate running balance for an account, in cents
         """
         result = self.session.exec(
             select(
                 func.coalesce(func.sum(TransactionLine.debit),0) -
                 func.coalesce(func.sum(TransactionLine.credit),0)
-            ).where(TransactionLine.account == account_id)
+            ).where(TransactionLine.account_id == account_id)
         ).first()
-        return result or 0.0
+        return result or 0
 
     
-    def get_trial_balance(self) -> list[dict]:
+    def get_trial_balance(self,rollup:bool = False) -> list[dict]:
         """
         Generate trial balance report - all account with their balance
+
+        One grouped aggregate over TransactionLine joined back to Account,
+        so the query count does not grow with the chart of accounts.
+        With rollup every account also carries the totals of its subtree.
+        Balances are integer cents, app.money.present converts them for output
         """
-        accounts = self.session.exec(select(Account)).all()
+        if rollup:
+            return self.get_rollup_trial_balance()
+        totals = (
+            select(
+                TransactionLine.account_id,
+                func.sum(TransactionLine.debit).label('debit'),
+                func.sum(TransactionLine.credit).label('credit'),
+            )
+            .group_by(TransactionLine.account_id)
+            .subquery()
+        )
+        rows = self.session.exec(
+            select(
+                Account.code,
+                Account.name,
+                Account.account_type,
+                func.coalesce(totals.c.debit,0) - func.coalesce(totals.c.credit,0),
+            )
+            .outerjoin(totals,totals.c.account_id == Account.id)
+            .order_by(Account.id)
+        ).all()
         trial_balance = []
-        for account in accounts:
-            balance = self.get_account_balance(account.id)
+        for code,name,account_type,balance in rows:
             trial_balance.append({
-                'code':account.code,
-                'name':account.name,
-                'type':account.account_type,
+                'code':code,
+                'name':name,
+                'type':account_type,
                 'debit_balance':balance if balance > 0 else 0,
                 'credit_balance': abs(balance) if balance < 0 else 0,
             })
         
         return trial_balance
     
+    def get_rollup_trial_balance(self,account_id:int = None) -> list[dict]:
+        """
+        Consolidated balances from AccountClosure joined to AccountBalance:
+        each account's row includes every descendant. Pass account_id for a
+        single subtree total
+        """
+        totals = (
+            select(
+                AccountClosure.ancestor_id,
+                func.sum(AccountBalance.debit).label('debit'),
+                func.sum(AccountBalance.credit).label('credit'),
+            )
+            .join(AccountBalance,AccountBalance.account_id == AccountClosure.descendant_id)
+            .group_by(AccountClosure.ancestor_id)
+        )
+        levels = (
+            select(
+                AccountClosure.descendant_id,
+                func.max(AccountClosure.depth).label('level'),
+            )
+            .group_by(AccountClosure.descendant_id)
+        )
+        if account_id is not None:
+            totals = totals.where(AccountClosure.ancestor_id == account_id)
+            levels = levels.where(AccountClosure.descendant_id == account_id)
+        totals = totals.subquery()
+        levels = levels.subquery()
+
+        query = (
+            select(
+                Account.id,
+                Account.code,
+                Account.name,
+                Account.account_type,
+                Account.parent_id,
+                func.coalesce(levels.c.level,0),
+                func.coalesce(totals.c.debit,0) - func.coalesce(totals.c.credit,0),
+            )
+            .outerjoin(totals,totals.c.ancestor_id == Account.id)
+            .outerjoin(levels,levels.c.descendant_id == Account.id)
+            .order_by(Account.id)
+        )
+        if account_id is not None:
+            query = query.where(Account.id == account_id)
+
+        trial_balance = []
+        for id,code,name,account_type,parent_id,level,balance in self.session.exec(query).all():
+            trial_balance.append({
+                'code':code,
+                'name':name,
+                'type':account_type,
+                'account_id':id,
+                'parent_id':parent_id,
+                'level':level,
+                'debit_balance':balance if balance > 0 else 0,
+                'credit_balance': abs(balance) if balance < 0 else 0,
+            })
+        return trial_balance
+
     def get_income_statement(self,start_date:date,end_date:date) -> dict:
 
         revenue = self._sum_by_type(AccountType.REVENUE,start_date,end_date)
@@ -50,26 +143,113 @@ class AccountingAnalytics:
             'profit_margin':(revenue - expenses) / revenue * 100 if revenue else 0
         }
 
-    
+    def get_income_statement_series(self,start_date:date,end_date:date,grain:str = 'month') -> dict:
+        """
+        get_income_statement for every day/week/month/quarter bucket of the
+        range, buckets clipped to start_date/end_date and empty ones included.
+
+        All buckets come from one grouped aggregate: month and quarter read
+        whole months from AccountMonthlyRollup plus one pass over the raw
+        lines of the partial edge months, day and week group the raw lines
+        of the range. Weeks start on Monday.
+        """
+        if grain not in PERIOD_GRAINS:
+            raise ValueError(f'grain must be one of {PERIOD_GRAINS}')
+        if start_date > end_date:
+            raise ValueError('start_date is after end_date')
+        buckets = _period_starts(start_date,end_date,grain)
+        if len(buckets) > MAX_PERIODS:
+            raise ValueError(f'more than {MAX_PERIODS} {grain} periods requested')
+
+        if grain in ('day','week'):
+            rows = self._lines_by_period(_PERIOD_OF_LINE[grain],[(start_date,end_date)])
+        else:
+            rows = self._months_by_period(start_date,end_date)
+        totals = defaultdict(int)
+        for period,account_type,amount in rows:
+            totals[_bucket_start(_as_date(period),grain),account_type] += amount or 0
+
+        periods = []
+        for i,bucket in enumerate(buckets):
+            revenue = totals[bucket,AccountType.REVENUE]
+            expenses = totals[bucket,AccountType.EXPENSE]
+            last = buckets[i + 1] - timedelta(days=1) if i + 1 < len(buckets) else end_date
+            periods.append({
+                'period':{'start':str(max(bucket,start_date)),'end':str(last)},
+                'total_revenue':revenue,
+                'total_expenses':expenses,
+                'net_income':revenue - expenses,
+                'profit_margin':(revenue - expenses) / revenue * 100 if revenue else 0
+            })
+        return {'grain':grain,'start':str(start_date),'end':str(end_date),'periods':periods}
+
     def get_balance_sheet(self) -> dict:
         """ Snapshot of financial position"""
-        assets = self._sum_by_type(AccountType.ASSET)
-        liabilities = self._sum_by_type(AccountType.LIABILITY)
-        equity = self._sum_by_type(AccountType.EQUITY)
+        totals = self._balances_by_type()
+        assets = totals.get(AccountType.ASSET,0)
+        liabilities = totals.get(AccountType.LIABILITY,0)
+        equity = totals.get(AccountType.EQUITY,0)
         return{
             'assets':assets,
             'liabilities':liabilities,
             'equity':equity,
-            'balanced':round(assets,2) == round(liabilities + equity,2)
+            # integer cents, so this is exact
+            'balanced':assets == liabilities + equity
         }
 
-    def get_aging_report(self,as_of:date) -> dict:
+    def get_aging_report(self,as_of:date,customers:list[str] = None) -> dict:
+        """Receivables aging by days past due, with per-customer subtotals"""
+        return AgingEngine.from_session(self.session).report(as_of,customers)
 
-        pass
+    def _balances_by_type(self) -> dict:
+        """
+        All-time credit - debit per account type, read from the AccountBalance
+        store so the cost follows the number of accounts, not ledger history
+        """
+        rows = self.session.exec(
+            select(
+                Account.account_type,
+                func.sum(AccountBalance.credit) - func.sum(AccountBalance.debit)
+            )
+            .join(Account,AccountBalance.account_id == Account.id)
+            .group_by(Account.account_type)
+        ).all()
+        return {AccountType(account_type):total or 0 for account_type,total in rows}
 
     def _sum_by_type(self,account_type:AccountType,
             start_date: date = None, end_date:date = None
-        ) -> float:
+        ) -> int:
+        """
+        credit - debit in cents for one account type. With a date range, whole months
+        come from AccountMonthlyRollup and only the partial months at either
+        edge are summed from raw lines
+        """
+        if not (start_date and end_date):
+            return self._sum_lines(account_type)
+        if start_date > end_date:
+            return 0
+
+        first_full,after_last_full = _full_months(start_date,end_date)
+        if first_full >= after_last_full:
+            return self._sum_lines(account_type,start_date,end_date)
+
+        total = self.session.exec(
+            select(func.coalesce(
+                func.sum(AccountMonthlyRollup.credit) - func.sum(AccountMonthlyRollup.debit),0
+            ))
+            .where(AccountMonthlyRollup.account_type == account_type)
+            .where(AccountMonthlyRollup.month >= first_full)
+            .where(AccountMonthlyRollup.month < after_last_full)
+        ).first() or 0
+        if start_date < first_full:
+            total += self._sum_lines(account_type,start_date,first_full - timedelta(days=1))
+        if after_last_full <= end_date:
+            total += self._sum_lines(account_type,after_last_full,end_date)
+        return total
+
+    def _sum_lines(self,account_type:AccountType,
+            start_date: date = None, end_date:date = None
+        ) -> int:
         query = (
             select(func.coalesce(
                 func.sum(TransactionLine.credit) - func.sum(TransactionLine.debit),0
@@ -81,4 +261,100 @@ class AccountingAnalytics:
             query = query.join(
                 JournalEntry, TransactionLine.journal_entry_id == JournalEntry.id
             ).where(JournalEntry.date.between(start_date,end_date))
-        return self.session.exec(query).first() or 0
\ No newline at end of file
+        return self.session.exec(query).first() or 0
+
+    def _months_by_period(self,start_date:date,end_date:date) -> list[tuple]:
+        """(month, account_type, credit - debit) for revenue and expense, whole months from the rollup"""
+        first_full,after_last_full = _full_months(start_date,end_date)
+        if first_full >= after_last_full:
+            return self._lines_by_period(_PERIOD_OF_LINE['month'],[(start_date,end_date)])
+
+        month = AccountMonthlyRollup.month
+        rows = self.session.exec(
+            select(
+                month,
+                AccountMonthlyRollup.account_type,
+                func.sum(AccountMonthlyRollup.credit) - func.sum(AccountMonthlyRollup.debit),
+            )
+            .where(AccountMonthlyRollup.account_type.in_([AccountType.REVENUE,AccountType.EXPENSE]))
+            .where(month >= first_full)
+            .where(month < after_last_full)
+            .group_by(AccountMonthlyRollup.account_type,month)
+        ).all()
+        edges = []
+        if start_date < first_full:
+            edges.append((start_date,first_full - timedelta(days=1)))
+        if after_last_full <= end_date:
+            edges.append((after_last_full,end_date))
+        if edges:
+            rows += self._lines_by_period(_PERIOD_OF_LINE['month'],edges)
+        return rows
+
+    def _lines_by_period(self,period,ranges:list[tuple[date,date]]) -> list[tuple]:
+        """(period, account_type, credit - debit) for revenue and expense lines in the date ranges"""
+        return self.session.exec(
+            select(
+                period,
+                Account.account_type,
+                func.sum(TransactionLine.credit) - func.sum(TransactionLine.debit),
+            )
+            .join(Account,TransactionLine.account_id == Account.id)
+            .join(JournalEntry,TransactionLine.journal_entry_id == JournalEntry.id)
+            .where(Account.account_type.in_([AccountType.REVENUE,AccountType.EXPENSE]))
+            .where(or_(*(JournalEntry.date.between(start,end) for start,end in ranges)))
+            .group_by(period,Account.account_type)
+        ).all()
+
+
+# SQL bucket of a line's entry date, weeks snap back to Monday
+_PERIOD_OF_LINE = {
+    'day':JournalEntry.date,
+    'week':func.date(JournalEntry.date,'-6 days','weekday 1'),
+    'month':func.strftime('%Y-%m-01',JournalEntry.date),
+}
+
+
+def _full_months(start_date:date,end_date:date) -> tuple[date,date]:
+    """First whole month inside the range and the month after the last whole one"""
+    first_full = start_date if start_date.day == 1 else _next_month(start_date)
+    after_last_full = _next_month(end_date) if _is_month_end(end_date) else end_date.replace(day=1)
+    return first_full,after_last_full
+
+
+def _bucket_start(day:date,grain:str) -> date:
+    if grain == 'week':
+        return day - timedelta(days=day.weekday())
+    if grain == 'month':
+        return day.replace(day=1)
+    if grain == 'quarter':
+        return date(day.year,(day.month - 1) // 3 * 3 + 1,1)
+    return day
+
+
+def _period_starts(start_date:date,end_date:date,grain:str) -> list[date]:
+    """Start of every bucket touching the range, the first one may begin before start_date"""
+    bucket = _bucket_start(start_date,grain)
+    starts = [bucket]
+    while True:
+        if grain == 'day':
+            bucket += timedelta(days=1)
+        elif grain == 'week':
+            bucket += timedelta(days=7)
+        else:
+            for _ in range(3 if grain == 'quarter' else 1):
+                bucket = _next_month(bucket)
+        if bucket > end_date or len(starts) > MAX_PERIODS:
+            return starts
+        starts.append(bucket)
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value,date) else date.fromisoformat(value)
+
+
+def _next_month(day:date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _is_month_end(day:date) -> bool:
+    return (day + timedelta(days=1)).day == 1
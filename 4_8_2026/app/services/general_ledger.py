@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+from datetime import date
+from sqlmodel import Session,select,func
+from app.models.transactions import Account,AccountMonthlyRollup,JournalEntry,TransactionLine
+from app.money import from_cents
+from app.services.posting import month_start
+
+GL_COLUMNS = [
+    'account_code','account_name','date','journal_entry_id','reference_number',
+    'description','memo','debit','credit','balance',
+]
+BATCH_ROWS = 2000
+
+
+def iter_general_ledger(session:Session,start_date:date = None,end_date:date = None,
+                        account_code:str = None):
+    """
+    Yield general-ledger rows account by account, in date order within each
+    account, with a running balance (debit - credit) that starts from the
+    account's balance before start_date. The balance is kept in cents and
+    amounts are converted to currency units per row.
+
+    Opening balances come from AccountMonthlyRollup for the whole months
+    before start_date plus the raw lines of start_date's own month, so the
+    first row does not wait on a scan of all earlier history.
+
+    Rows come off the cursor in batches of BATCH_ROWS. Wide ranges walk the
+    (account_id, journal_entry_id) index so SQLite only sorts one account's
+    lines at a time, memory stays flat and the first rows arrive immediately;
+    a range of a few days is found through ix_journalentry_date instead.
+    """
+    query = (
+        select(
+            TransactionLine.account_id,
+            Account.code,
+            Account.name,
+            JournalEntry.date,
+            JournalEntry.id,
+            JournalEntry.reference_number,
+            JournalEntry.description,
+            TransactionLine.memo,
+            TransactionLine.debit,
+            TransactionLine.credit,
+        )
+        .join(Account,TransactionLine.account_id == Account.id)
+        .join(JournalEntry,TransactionLine.journal_entry_id == JournalEntry.id)
+        .order_by(TransactionLine.account_id,JournalEntry.date,TransactionLine.id)
+    )
+    if account_code is not None:
+        query = query.where(Account.code == account_code)
+    # dates are stored as ISO strings, so the bare column compares correctly
+    # and ix_journalentry_date stays usable for narrow ranges
+    if start_date is not None:
+        query = query.where(JournalEntry.date >= start_date)
+    if end_date is not None:
+        query = query.where(JournalEntry.date <= end_date)
+
+    opening_balances = (
+        _opening_balances(session,start_date,account_code) if start_date is not None else {}
+    )
+
+    current_account = None
+    balance = 0
+    result = session.execute(query.execution_options(yield_per=BATCH_ROWS))
+    for batch in result.partitions():
+        rows = []
+        for account_id,code,name,day,entry_id,reference,description,memo,debit,credit in batch:
+            if account_id != current_account:
+                current_account = account_id
+                balance = opening_balances.get(account_id) or 0
+            balance += debit - credit
+            rows.append({
+                'account_code':code,
+                'account_name':name,
+                'date':day.isoformat(),
+                'journal_entry_id':entry_id,
+                'reference_number':reference,
+                'description':description,
+                'memo':memo,
+                'debit':from_cents(debit),
+                'credit':from_cents(credit),
+                'balance':from_cents(balance),
+            })
+        yield rows
+
+
+def _opening_balances(session:Session,start_date:date,account_code:str = None) -> dict:
+    """account_id -> debit - credit in cents of everything dated before start_date"""
+    first_of_month = month_start(start_date)
+    months = (
+        select(
+            AccountMonthlyRollup.account_id,
+            func.sum(AccountMonthlyRollup.debit) - func.sum(AccountMonthlyRollup.credit),
+        )
+        .where(AccountMonthlyRollup.month < first_of_month)
+        .group_by(AccountMonthlyRollup.account_id)
+    )
+    partial_month = (
+        select(
+            TransactionLine.account_id,
+            func.sum(TransactionLine.debit) - func.sum(TransactionLine.credit),
+        )
+        .join(JournalEntry,TransactionLine.journal_entry_id == JournalEntry.id)
+        .where(JournalEntry.date >= first_of_month)
+        .where(JournalEntry.date < start_date)
+        .group_by(TransactionLine.account_id)
+    )
+    if account_code is not None:
+        months = months.join(Account,AccountMonthlyRollup.account_id == Account.id).where(Account.code == account_code)
+        partial_month = partial_month.join(Account,TransactionLine.account_id == Account.id).where(Account.code == account_code)
+
+    balances = dict(session.exec(months).all())
+    if start_date > first_of_month:
+        for account_id,amount in session.exec(partial_month).all():
+            balances[account_id] = balances.get(account_id,0) + amount
+    return balances
+
+
+def ndjson_chunks(batches):
+    for rows in batches:
+        yield ''.join(json.dumps(row) + '\n' for row in rows)
+
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer,fieldnames=GL_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
@@ -0,0 +1,109 @@
+from typing import Optional
+from sqlalchemy import delete,insert,literal,true
+from sqlmodel import Session,select,func
+from app.models.transactions import Account,AccountClosure
+
+
+def create_account(session:Session,account:Account) -> Account:
+    """
+    Add an account and its closure rows: itself at depth 0 plus one row per
+    ancestor of its parent. The caller owns the commit.
+    """
+    if account.parent_id is not None and session.get(Account,account.parent_id) is None:
+        raise ValueError(f'parent account {account.parent_id} does not exist')
+    session.add(account)
+    session.flush()
+    session.add(AccountClosure(ancestor_id=account.id,descendant_id=account.id,depth=0))
+    if account.parent_id is not None:
+        session.execute(
+            insert(AccountClosure).from_select(
+                ['ancestor_id','descendant_id','depth'],
+                select(
+                    AccountClosure.ancestor_id,
+                    literal(account.id),
+                    AccountClosure.depth + 1,
+                ).where(AccountClosure.descendant_id == account.parent_id)
+            )
+        )
+    return account
+
+
+def reparent_account(session:Session,account_id:int,new_parent_id:Optional[int]) -> Account:
+    """
+    Move an account (and its whole subtree) under new_parent_id, or to the
+    top level with None. The caller owns the commit.
+    """
+    account = session.get(Account,account_id)
+    if account is None:
+        raise ValueError(f'account {account_id} does not exist')
+
+    subtree = select(AccountClosure.descendant_id).where(AccountClosure.ancestor_id == account_id)
+    if new_parent_id is not None:
+        if session.get(Account,new_parent_id) is None:
+            raise ValueError(f'parent account {new_parent_id} does not exist')
+        if session.exec(subtree.where(AccountClosure.descendant_id == new_parent_id)).first() is not None:
+            raise ValueError(f'account {new_parent_id} is inside the subtree of {account_id}')
+
+    # drop the links from the old ancestors into the subtree
+    session.execute(
+        delete(AccountClosure)
+        .where(AccountClosure.descendant_id.in_(subtree))
+        .where(AccountClosure.ancestor_id.not_in(
+            select(AccountClosure.descendant_id).where(AccountClosure.ancestor_id == account_id)
+        ))
+    )
+    if new_parent_id is not None:
+        above = select(AccountClosure).where(AccountClosure.descendant_id == new_parent_id).subquery()
+        below = select(AccountClosure).where(AccountClosure.ancestor_id == account_id).subquery()
+        session.execute(
+            insert(AccountClosure).from_select(
+                ['ancestor_id','descendant_id','depth'],
+                select(above.c.ancestor_id,below.c.descendant_id,above.c.depth + below.c.depth + 1)
+                .select_from(above.join(below,true()))
+            )
+        )
+    account.parent_id = new_parent_id
+    session.add(account)
+    return account
+
+
+def _closure_from_parents():
+    """Recursive CTE over Account.parent_id giving (ancestor, descendant, depth)"""
+    tree = (
+        select(
+            Account.id.label('ancestor_id'),
+            Account.id.label('descendant_id'),
+            literal(0).label('depth'),
+        )
+        .cte('tree',recursive=True)
+    )
+    child = Account.__table__.alias('child')
+    tree = tree.union_all(
+        select(tree.c.ancestor_id,child.c.id,tree.c.depth + 1)
+        .join(child,child.c.parent_id == tree.c.descendant_id)
+    )
+    return select(tree.c.ancestor_id,tree.c.descendant_id,tree.c.depth)
+
+
+def rebuild_account_closure(session:Session) -> int:
+    """Recompute AccountClosure from Account.parent_id, returns row count"""
+    session.execute(delete(AccountClosure))
+    session.execute(
+        insert(AccountClosure).from_select(
+            ['ancestor_id','descendant_id','depth'],_closure_from_parents()
+        )
+    )
+    return session.exec(select(func.count()).select_from(AccountClosure)).one()
+
+
+def verify_account_closure(session:Session) -> list[dict]:
+    """Closure rows that are missing or extra compared with Account.parent_id"""
+    expected = set(session.exec(_closure_from_parents()).all())
+    stored = set(session.exec(
+        select(AccountClosure.ancestor_id,AccountClosure.descendant_id,AccountClosure.depth)
+    ).all())
+    return [
+        {'ancestor_id':a,'descendant_id':d,'depth':depth,'problem':problem}
+        for rows,problem in ((expected - stored,'missing'),(stored - expected,'extra'))
+        for a,d,depth in sorted(rows)
+    ]
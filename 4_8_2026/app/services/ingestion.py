@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+from sqlmodel import SQLModel,Session,select
+from app.database import engine
+from app.models.transactions import Account,JournalEntry,TransactionLine
+from app.money import to_cents
+from app.services.posting import post_journal_entry
+
+logger = logging.getLogger(__name__)
+
+INGEST_MAX_QUEUE = int(os.getenv('INGEST_MAX_QUEUE','10000'))
+INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE','500'))
+INGEST_FLUSH_INTERVAL = float(os.getenv('INGEST_FLUSH_INTERVAL','0.25'))
+RECENT_KEYS = 100_000
+_STOP = object()
+
+
+class WebhookLine(SQLModel):
+    """Amounts in currency units, converted to cents when posted"""
+    account_code: str
+    debit: float = 0.0
+    credit: float = 0.0
+    memo: Optional[str] = None
+
+
+class WebhookTransaction(SQLModel):
+    """
+    Journal entry as n8n sends it, idempotency_key is stored on the entry
+    and doubles as its reference_number. The key may come in the
+    Idempotency-Key header instead of the body
+    """
+    idempotency_key: Optional[str] = None
+    date: date
+    description: str
+    lines: list[WebhookLine]
+
+
+class QueueFull(Exception):
+    pass
+
+
+class IngestionQueue:
+    """
+    Accepts webhook transactions immediately and writes them in micro-batches.
+
+    A batch is flushed when it reaches batch_size or flush_interval seconds
+    after its first item, whichever comes first; each flush is one database
+    transaction. Keys are deduplicated in memory on submit and against
+    JournalEntry.idempotency_key on flush, so retries from n8n are safe. A
+    key whose entry is rejected or whose flush fails is forgotten again, so
+    a corrected retry gets written.
+    """
+
+    def __init__(self,max_size:int = INGEST_MAX_QUEUE,batch_size:int = INGEST_BATCH_SIZE,
+                 flush_interval:float = INGEST_FLUSH_INTERVAL,engine = engine):
+        self.engine = engine
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = None
+        self._worker = None
+        self._closing = False
+        self._recent = OrderedDict()
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.entries_written = 0
+        self.entries_failed = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+        self.last_errors = []
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop taking new work and flush whatever is still queued"""
+        if self._worker is None:
+            return
+        self._closing = True
+        await self._queue.put(_STOP)
+        await self._worker
+        self._worker = None
+
+    def submit(self,transaction:WebhookTransaction) -> str:
+        key = transaction.idempotency_key
+        if key is None:
+            raise ValueError('transaction has no idempotency key')
+        if self._closing:
+            self.rejected += 1
+            raise QueueFull()
+        if key in self._recent:
+            self.duplicates += 1
+            return 'duplicate'
+        try:
+            self._queue.put_nowait(transaction)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull()
+        self._recent[key] = None
+        if len(self._recent) > RECENT_KEYS:
+            self._recent.popitem(last=False)
+        self.accepted += 1
+        return 'queued'
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(),timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                failed = await asyncio.to_thread(self._flush,batch)
+            except Exception:
+                # nothing from the batch was committed, let retries through
+                for transaction in batch:
+                    self._forget(transaction.idempotency_key)
+                self.entries_failed += len(batch)
+                logger.exception('ingestion flush of %d transactions failed',len(batch))
+                continue
+            # _recent is only touched on the event loop, not in the flush thread
+            for key in failed:
+                self._forget(key)
+
+    def _flush(self,batch:list[WebhookTransaction]) -> list[str]:
+        """Write one batch in one transaction, returns the keys of the rejected entries"""
+        start = time.perf_counter()
+        keys = [t.idempotency_key for t in batch]
+        codes = {line.account_code for t in batch for line in t.lines}
+        written = 0
+        failed = []
+        with Session(self.engine) as session:
+            existing = set(session.exec(
+                select(JournalEntry.idempotency_key).where(JournalEntry.idempotency_key.in_(keys))
+            ).all())
+            accounts = dict(session.exec(
+                select(Account.code,Account.id).where(Account.code.in_(codes))
+            ).all())
+            for transaction in batch:
+                if transaction.idempotency_key in existing:
+                    self.duplicates += 1
+                    continue
+                missing = {l.account_code for l in transaction.lines} - accounts.keys()
+                if missing:
+                    failed.append(self._fail(transaction,f'unknown account code(s) {sorted(missing)}'))
+                    continue
+                try:
+                    # balance is checked before anything is added to the session
+                    post_journal_entry(
+                        session,
+                        JournalEntry(
+                            date=transaction.date,
+                            description=transaction.description,
+                            reference_number=transaction.idempotency_key,
+                            idempotency_key=transaction.idempotency_key,
+                        ),
+                        [
+                            TransactionLine(
+                                account_id=accounts[l.account_code],
+                                debit=to_cents(l.debit),credit=to_cents(l.credit),memo=l.memo
+                            )
+                            for l in transaction.lines
+                        ]
+                    )
+                except ValueError as exc:
+                    failed.append(self._fail(transaction,str(exc)))
+                    continue
+                existing.add(transaction.idempotency_key)
+                written += 1
+            session.commit()
+
+        elapsed = time.perf_counter() - start
+        self.flushes += 1
+        self.entries_written += written
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds,elapsed)
+        self.total_flush_seconds += elapsed
+        logger.debug('ingestion flushed %d/%d transactions in %.3fs',written,len(batch),elapsed)
+        return failed
+
+    def _forget(self,key:str) -> None:
+        self._recent.pop(key,None)
+
+    def _fail(self,transaction:WebhookTransaction,error:str) -> str:
+        self.entries_failed += 1
+        self.last_errors = [
+            *self.last_errors[-19:],
+            {'idempotency_key':transaction.idempotency_key,'error':error},
+        ]
+        return transaction.idempotency_key
+
+    def metrics(self) -> dict:
+        return {
+            'queue_depth':self._queue.qsize() if self._queue else 0,
+            'max_queue':self.max_size,
+            'batch_size':self.batch_size,
+            'flush_interval':self.flush_interval,
+            'accepted':self.accepted,
+            'duplicates':self.duplicates,
+            'rejected_full':self.rejected,
+            'flushes':self.flushes,
+            'entries_written':self.entries_written,
+            'entries_failed':self.entries_failed,
+            'last_flush_ms':round(self.last_flush_seconds * 1000,3),
+            'max_flush_ms':round(self.max_flush_seconds * 1000,3),
+            'avg_flush_ms':round(self.total_flush_seconds * 1000 / self.flushes,3) if self.flushes else 0.0,
+            'last_errors':self.last_errors,
+        }
+
+
+ingestion_queue = IngestionQueue()
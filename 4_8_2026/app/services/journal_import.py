@@ -0,0 +1,181 @@
+"""
+Bulk journal import for CSVs in the accounting_journal.csv layout
+(Transaction_ID, Date, Account_ID, Debit, Credit, optional Description)
+
+Account_ID is matched against Account.code. Lines are grouped into one
+JournalEntry per Transaction_ID (rows of a transaction must be contiguous,
+which is how 4_12_2026/generate_data.py writes them), validated per entry
+and written with executemany, one transaction per chunk. A bad entry is
+reported and skipped, it does not abort the file. An empty file or one
+missing a required column raises ValueError.
+
+Entry ids are assigned by hand so the lines can reference them without a
+round trip per entry. Each chunk takes SQLite's write lock (BEGIN IMMEDIATE)
+before reading max(id), so entries posted concurrently cannot collide.
+"""
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sqlmodel import Session,select,func
+from app.models.transactions import Account,JournalEntry,TransactionLine
+from app.money import to_cents_array
+from app.services.posting import apply_totals
+
+REQUIRED_COLUMNS = ['Transaction_ID','Date','Account_ID','Debit','Credit']
+DEFAULT_CHUNKSIZE = 100_000
+MAX_REPORTED_ERRORS = 1000
+
+
+def import_journal_csv(session:Session,source,chunksize:int = DEFAULT_CHUNKSIZE,
+                       date_format:str = None) -> dict:
+    """
+    Stream a journal CSV (path or file object) into the database.
+    Returns counts plus a per-entry error list
+    """
+    accounts = dict(session.exec(select(Account.code,Account.id)).all())
+
+    report = {'entries_imported':0,'lines_imported':0,'entries_rejected':0,'errors':[]}
+    try:
+        reader = pd.read_csv(
+            source,
+            dtype={'Transaction_ID':str,'Account_ID':str},
+            chunksize=chunksize,
+        )
+    except pd.errors.EmptyDataError:
+        raise ValueError('journal CSV is empty')
+    carry = None
+    for chunk in reader:
+        missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+        if missing:
+            raise ValueError(f'journal CSV is missing columns: {missing}')
+        if carry is not None:
+            chunk = pd.concat([carry,chunk],ignore_index=True)
+        if not len(chunk):
+            continue
+
+        # the last transaction may continue in the next chunk, hold it back
+        last_id = chunk['Transaction_ID'].iat[-1]
+        tail = (chunk['Transaction_ID'] == last_id).to_numpy()
+        carry = chunk[tail]
+        chunk = chunk[~tail]
+        if len(chunk):
+            _import_chunk(session,chunk,accounts,date_format,report)
+
+    if carry is not None and len(carry):
+        _import_chunk(session,carry,accounts,date_format,report)
+    return report
+
+
+def _parse_amounts(column:pd.Series) -> tuple[np.ndarray,np.ndarray]:
+    """(cents, bad) for a Debit/Credit column, blanks are 0 but text is bad"""
+    amounts = pd.to_numeric(column,errors='coerce')
+    bad = (amounts.isna() & column.notna()).to_numpy()
+    return to_cents_array(amounts.fillna(0).to_numpy()),bad
+
+
+def _next_entry_id(session:Session) -> int:
+    """
+    Take the database write lock and return the first free JournalEntry id.
+    The lock is held until the chunk commits, so nobody can claim the ids
+    between this read and the insert
+    """
+    connection = session.connection()
+    # pysqlite only opens a transaction at the first write, if one is already
+    # open it holds the write lock and the id read below is safe as is
+    if not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+    return (session.exec(select(func.max(JournalEntry.id))).one() or 0) + 1
+
+
+def _import_chunk(session:Session,chunk:pd.DataFrame,accounts:dict,
+                  date_format:str,report:dict) -> None:
+    txn = chunk['Transaction_ID'].to_numpy()
+    dates = pd.to_datetime(chunk['Date'],format=date_format,errors='coerce')
+    account_ids = chunk['Account_ID'].str.strip().map(accounts)
+    debit_cents,bad_debit = _parse_amounts(chunk['Debit'])
+    credit_cents,bad_credit = _parse_amounts(chunk['Credit'])
+
+    # one entry per run of equal Transaction_IDs
+    starts = np.flatnonzero(np.r_[True,txn[1:] != txn[:-1]])
+    entry_of_line = np.repeat(np.arange(len(starts)),np.diff(np.r_[starts,len(txn)]))
+
+    bad_account = account_ids.isna().to_numpy()
+    bad_date = dates.isna().to_numpy()
+    imbalance = np.bincount(entry_of_line,weights=debit_cents - credit_cents,minlength=len(starts))
+    entry_bad_account = np.bincount(entry_of_line,weights=bad_account,minlength=len(starts)) > 0
+    entry_bad_date = np.bincount(entry_of_line,weights=bad_date,minlength=len(starts)) > 0
+    entry_bad_amount = np.bincount(entry_of_line,weights=bad_debit | bad_credit,minlength=len(starts)) > 0
+    # an unparseable amount counts as 0 above, so do not also report the imbalance it causes
+    entry_unbalanced = (imbalance != 0) & ~entry_bad_amount
+    entry_ok = ~(entry_bad_account | entry_bad_date | entry_bad_amount | entry_unbalanced)
+
+    for i in np.flatnonzero(~entry_ok):
+        report['entries_rejected'] += 1
+        if len(report['errors']) >= MAX_REPORTED_ERRORS:
+            continue
+        reasons = []
+        if entry_bad_account[i]:
+            rows = (entry_of_line == i) & bad_account
+            reasons.append(f"unknown account code(s) {sorted(set(chunk['Account_ID'].to_numpy()[rows]))}")
+        if entry_bad_date[i]:
+            reasons.append('unparseable date')
+        if entry_bad_amount[i]:
+            reasons.append('non-numeric debit or credit')
+        if entry_unbalanced[i]:
+            reasons.append(f'debits and credits differ by {imbalance[i] / 100:.2f}')
+        report['errors'].append({'transaction_id':txn[starts[i]],'error':'; '.join(reasons)})
+
+    if not entry_ok.any():
+        return
+
+    ok_entries = np.flatnonzero(entry_ok)
+    next_entry_id = _next_entry_id(session)
+    new_ids = np.full(len(starts),-1,dtype=np.int64)
+    new_ids[ok_entries] = np.arange(next_entry_id,next_entry_id + len(ok_entries))
+    line_ok = entry_ok[entry_of_line]
+
+    first_rows = starts[ok_entries]
+    descriptions = (
+        chunk['Description'].fillna('').astype(str).to_numpy()
+        if 'Description' in chunk.columns else txn
+    )
+    entry_dates = dates.dt.date.to_numpy()
+    created_at = datetime.utcnow()
+    session.execute(JournalEntry.__table__.insert(),[
+        {
+            'id':int(entry_id),
+            'date':entry_dates[row],
+            'description':descriptions[row],
+            'reference_number':txn[row],
+            'created_at':created_at,
+        }
+        for entry_id,row in zip(new_ids[ok_entries],first_rows)
+    ])
+
+    line_account = account_ids.to_numpy()[line_ok].astype(np.int64)
+    line_entry = new_ids[entry_of_line[line_ok]]
+    line_debit = debit_cents[line_ok]
+    line_credit = credit_cents[line_ok]
+    session.execute(TransactionLine.__table__.insert(),[
+        {'journal_entry_id':entry_id,'account_id':account_id,'debit':debit,'credit':credit,'memo':None}
+        for entry_id,account_id,debit,credit
+        in zip(line_entry.tolist(),line_account.tolist(),line_debit.tolist(),line_credit.tolist())
+    ])
+
+    lines = pd.DataFrame({
+        'account_id':line_account,
+        'month':dates.to_numpy()[line_ok].astype('datetime64[M]'),
+        'debit':line_debit,
+        'credit':line_credit,
+    })
+    by_account = lines.groupby('account_id')[['debit','credit']].sum()
+    by_month = lines.groupby(['account_id','month'])[['debit','credit']].sum()
+    apply_totals(
+        session,
+        {int(a):(int(d),int(c)) for a,d,c in by_account.itertuples()},
+        {(int(a),m.date()):(int(d),int(c)) for (a,m),d,c in by_month.itertuples()},
+    )
+    session.commit()
+
+    report['entries_imported'] += len(ok_entries)
+    report['lines_imported'] += int(line_ok.sum())
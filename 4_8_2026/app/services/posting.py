@@ -0,0 +1,207 @@
+from collections import defaultdict
+from datetime import date
+from sqlalchemy import delete,insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session,select,func
+from app.money import from_cents
+from app.models.transactions import (
+    TransactionLine,JournalEntry,Account,AccountBalance,AccountMonthlyRollup
+)
+
+
+def post_journal_entry(session:Session,entry:JournalEntry,lines:list[TransactionLine]) -> JournalEntry:
+    """
+    Add a journal entry with its lines and update AccountBalance and
+    AccountMonthlyRollup in the same transaction. Line amounts are integer
+    cents, so the balance check is exact. The caller owns the commit.
+    """
+    if any(not isinstance(amount,int) for line in lines for amount in (line.debit,line.credit)):
+        raise ValueError('line amounts must be integer cents, convert with app.money.to_cents')
+    total_debit = sum(line.debit for line in lines)
+    total_credit = sum(line.credit for line in lines)
+    if not lines or total_debit != total_credit:
+        raise ValueError(
+            f'journal entry is not balanced: debit {from_cents(total_debit)} != credit {from_cents(total_credit)}'
+        )
+
+    session.add(entry)
+    session.flush()
+    for line in lines:
+        line.journal_entry_id = entry.id
+        session.add(line)
+    apply_lines(session,[
+        (line.account_id,entry.date,line.debit,line.credit) for line in lines
+    ])
+    return entry
+
+
+def month_start(day:date) -> date:
+    return day.replace(day=1)
+
+
+def apply_lines(session:Session,lines:list[tuple[int,date,int,int]]) -> None:
+    """
+    Fold (account_id, entry_date, debit, credit) deltas in cents into
+    AccountBalance and AccountMonthlyRollup, one upsert per table
+    """
+    balances = defaultdict(lambda: [0,0])
+    months = defaultdict(lambda: [0,0])
+    for account_id,entry_date,debit,credit in lines:
+        balances[account_id][0] += debit
+        balances[account_id][1] += credit
+        months[account_id,month_start(entry_date)][0] += debit
+        months[account_id,month_start(entry_date)][1] += credit
+    apply_totals(session,balances,months)
+
+
+def apply_totals(session:Session,balances:dict,months:dict) -> None:
+    """
+    Upsert pre-aggregated cent totals: balances maps account_id -> (debit, credit),
+    months maps (account_id, month_start) -> (debit, credit)
+    """
+    if not balances:
+        return
+
+    stmt = sqlite_insert(AccountBalance)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AccountBalance.account_id],
+        set_={
+            'debit':AccountBalance.debit + stmt.excluded.debit,
+            'credit':AccountBalance.credit + stmt.excluded.credit,
+        }
+    )
+    session.execute(stmt,[
+        {'account_id':account_id,'debit':debit,'credit':credit}
+        for account_id,(debit,credit) in balances.items()
+    ])
+
+    account_types = dict(session.exec(
+        select(Account.id,Account.account_type).where(Account.id.in_(list(balances)))
+    ).all())
+    stmt = sqlite_insert(AccountMonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AccountMonthlyRollup.account_id,AccountMonthlyRollup.month],
+        set_={
+            'debit':AccountMonthlyRollup.debit + stmt.excluded.debit,
+            'credit':AccountMonthlyRollup.credit + stmt.excluded.credit,
+        }
+    )
+    session.execute(stmt,[
+        {
+            'account_id':account_id,
+            'month':month,
+            'account_type':account_types[account_id],
+            'debit':debit,
+            'credit':credit,
+        }
+        for (account_id,month),(debit,credit) in months.items()
+    ])
+
+
+def _ledger_totals():
+    return (
+        select(
+            TransactionLine.account_id,
+            func.sum(TransactionLine.debit),
+            func.sum(TransactionLine.credit),
+        )
+        .group_by(TransactionLine.account_id)
+    )
+
+
+def _monthly_totals():
+    month = func.strftime('%Y-%m-01',JournalEntry.date)
+    return (
+        select(
+            TransactionLine.account_id,
+            month,
+            Account.account_type,
+            func.sum(TransactionLine.debit),
+            func.sum(TransactionLine.credit),
+        )
+        .join(JournalEntry,TransactionLine.journal_entry_id == JournalEntry.id)
+        .join(Account,TransactionLine.account_id == Account.id)
+        .group_by(TransactionLine.account_id,month)
+    )
+
+
+def rebuild_account_balances(session:Session) -> int:
+    """Recompute AccountBalance from raw TransactionLine rows, returns row count"""
+    session.execute(delete(AccountBalance))
+    session.execute(
+        insert(AccountBalance).from_select(
+            ['account_id','debit','credit'],_ledger_totals()
+        )
+    )
+    return session.exec(select(func.count()).select_from(AccountBalance)).one()
+
+
+def rebuild_monthly_rollups(session:Session) -> int:
+    """Recompute AccountMonthlyRollup from raw lines, returns row count"""
+    session.execute(delete(AccountMonthlyRollup))
+    session.execute(
+        insert(AccountMonthlyRollup).from_select(
+            ['account_id','month','account_type','debit','credit'],_monthly_totals()
+        )
+    )
+    return session.exec(select(func.count()).select_from(AccountMonthlyRollup)).one()
+
+
+def _drift(expected:dict,stored:dict,tolerance:int) -> list[tuple]:
+    drift = []
+    for key in sorted(expected.keys() | stored.keys()):
+        exp_debit,exp_credit = expected.get(key,(0,0))
+        got_debit,got_credit = stored.get(key,(0,0))
+        if abs(exp_debit - got_debit) > tolerance or abs(exp_credit - got_credit) > tolerance:
+            drift.append((key,exp_debit,exp_credit,got_debit,got_credit))
+    return drift
+
+
+def verify_account_balances(session:Session,tolerance:int = 0) -> list[dict]:
+    """
+    Compare AccountBalance against raw TransactionLine sums (cents, exact by
+    default). Returns one dict per account that drifted, empty list when in sync
+    """
+    expected = {
+        account_id:(debit or 0,credit or 0)
+        for account_id,debit,credit in session.exec(_ledger_totals()).all()
+    }
+    stored = {
+        row.account_id:(row.debit,row.credit)
+        for row in session.exec(select(AccountBalance)).all()
+    }
+    return [
+        {
+            'account_id':account_id,
+            'expected_debit':exp_debit,
+            'expected_credit':exp_credit,
+            'stored_debit':got_debit,
+            'stored_credit':got_credit,
+        }
+        for account_id,exp_debit,exp_credit,got_debit,got_credit
+        in _drift(expected,stored,tolerance)
+    ]
+
+
+def verify_monthly_rollups(session:Session,tolerance:int = 0) -> list[dict]:
+    """Same as verify_account_balances, per (account, month) rollup row"""
+    expected = {
+        (account_id,date.fromisoformat(month)):(debit or 0,credit or 0)
+        for account_id,month,_,debit,credit in session.exec(_monthly_totals()).all()
+    }
+    stored = {
+        (row.account_id,row.month):(row.debit,row.credit)
+        for row in session.exec(select(AccountMonthlyRollup)).all()
+    }
+    return [
+        {
+            'account_id':account_id,
+            'month':month.isoformat(),
+            'expected_debit':exp_debit,
+            'expected_credit':exp_credit,
+            'stored_debit':got_debit,
+            'stored_credit':got_credit,
+        }
+        for (account_id,month),exp_debit,exp_credit,got_debit,got_credit
+        in _drift(expected,stored,tolerance)
+    ]
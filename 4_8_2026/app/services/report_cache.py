@@ -0,0 +1,146 @@
+"""
+Report payload cache, invalidated through the database
+
+Every cached data set ('ledger', 'aging') has a DataVersion row. A session
+that writes one of the data set's tables bumps that row inside the same
+transaction, and a cache lookup reads the row first (one primary key read),
+so writes from any process (the server, python -m app.cli import-journal,
+a rebuild) make the cached reports stale at the moment they commit.
+
+Writers that bypass the ORM session (raw DB-API connections, the sqlite3
+shell) are not seen; call bump_data_versions() after those.
+"""
+import os
+import threading
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session,select
+from app.models.transactions import (
+    Account,AccountBalance,AccountClosure,AccountMonthlyRollup,DataVersion,
+    JournalEntry,TransactionLine,Invoice,
+)
+
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv('REPORT_CACHE_MAX_ENTRIES','256'))
+
+# the chart of accounts counts too: rollups follow AccountClosure and the
+# statements group by Account.account_type; the materialized balances only
+# change outside a posting when they are rebuilt
+LEDGER_MODELS = (Account,AccountClosure,JournalEntry,TransactionLine,AccountBalance,AccountMonthlyRollup)
+# receivables aging only reads Invoice, so an invoice load does not
+# invalidate the statements and a posting does not invalidate aging
+AGING_MODELS = (Invoice,)
+VERSION_MODELS = {'ledger':LEDGER_MODELS,'aging':AGING_MODELS}
+TABLE_VERSIONS = {
+    model.__tablename__:name for name,models in VERSION_MODELS.items() for model in models
+}
+
+
+def data_version(session:Session,name:str) -> int:
+    return session.exec(select(DataVersion.version).where(DataVersion.name == name)).first() or 0
+
+
+def bump_data_versions(session:Session,names) -> None:
+    """Bump the DataVersion rows of names, the caller owns the commit"""
+    stmt = sqlite_insert(DataVersion)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.name],
+        set_={'version':DataVersion.version + 1},
+    )
+    session.execute(stmt,[{'name':name,'version':1} for name in sorted(names)])
+
+
+class ReportCache:
+    """
+    In-process LRU cache for report payloads.
+
+    Keys include the DataVersion of the data set the report reads, so an
+    entry computed before a write is never served after it and simply ages
+    out of the LRU.
+    """
+
+    def __init__(self,max_entries:int = REPORT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # last version read per data set, for stats()
+        self.versions = dict.fromkeys(VERSION_MODELS,0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self,session:Session,endpoint:str,params:dict,compute,depends_on:str = 'ledger'):
+        version = self.versions[depends_on] = data_version(session,depends_on)
+        key = (endpoint,tuple(sorted(params.items())),depends_on,version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                **{f'{name}_version':version for name,version in self.versions.items()},
+                'entries':len(self._entries),
+                'max_entries':self.max_entries,
+                'hits':self.hits,
+                'misses':self.misses,
+                'evictions':self.evictions,
+                'hit_ratio':self.hits / lookups if lookups else 0.0,
+            }
+
+
+report_cache = ReportCache()
+
+
+def _mark(session,table_name:str) -> None:
+    name = TABLE_VERSIONS.get(table_name)
+    if name is not None:
+        session.info.setdefault('dirty_versions',set()).add(name)
+
+
+@event.listens_for(OrmSession,'after_flush')
+def _mark_writes(session,flush_context):
+    for obj in (*session.new,*session.dirty,*session.deleted):
+        _mark(session,getattr(obj,'__tablename__',None))
+
+
+@event.listens_for(OrmSession,'do_orm_execute')
+def _mark_bulk_writes(orm_execute_state):
+    # bulk insert/update/delete statements skip the flush, catch them here
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement,'table',None)
+        if table is not None:
+            _mark(orm_execute_state.session,table.name)
+
+
+@event.listens_for(OrmSession,'before_commit')
+def _bump_in_transaction(session):
+    # flush first so pending objects are marked, then bump before COMMIT
+    session.flush()
+    names = session.info.pop('dirty_versions',None)
+    if names:
+        bump_data_versions(session,names)
+
+
+@event.listens_for(OrmSession,'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('dirty_versions',None)
@@ -0,0 +1,113 @@
+"""
+Reads and writes side by side under each database profile
+
+Writer threads post balanced journal entries through post_journal_entry on
+the write engine while reader threads run the trial balance and balance
+sheet on the read engine. Reports ops/second and errors per side.
+
+    python -m benchmarks.concurrency
+    python -m benchmarks.concurrency --lines 200000 --readers 4 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date,timedelta
+from sqlmodel import Session
+from app.database import create_engines
+from app.models.transactions import JournalEntry,TransactionLine
+from app.services.analytics import AccountingAnalytics
+from app.services.posting import post_journal_entry
+from benchmarks.seed import seed_ledger
+
+
+def writer(engine,n_accounts:int,stop:threading.Event,stats:dict,seed:int):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        amount = rng.randrange(100,500_000)  # cents
+        try:
+            with Session(engine) as session:
+                post_journal_entry(
+                    session,
+                    JournalEntry(date=date(2025,1,1) + timedelta(days=rng.randrange(365)),description='bench'),
+                    [
+                        TransactionLine(account_id=rng.randrange(n_accounts) + 1,debit=amount),
+                        TransactionLine(account_id=rng.randrange(n_accounts) + 1,credit=amount),
+                    ]
+                )
+                session.commit()
+            stats['ops'] += 1
+        except Exception:
+            stats['errors'] += 1
+
+
+def reader(engine,stop:threading.Event,stats:dict):
+    while not stop.is_set():
+        try:
+            with Session(engine) as session:
+                analytics = AccountingAnalytics(session)
+                analytics.get_trial_balance()
+                analytics.get_balance_sheet()
+            stats['ops'] += 1
+        except Exception:
+            stats['errors'] += 1
+
+
+def run_profile(profile:str,args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp,'bench.db')
+        write_engine,read_engine = create_engines(path,profile)
+        write_engine.echo = read_engine.echo = False
+        seed_ledger(write_engine,args.lines,n_accounts=args.accounts)
+
+        stop = threading.Event()
+        write_stats = [{'ops':0,'errors':0} for _ in range(args.writers)]
+        read_stats = [{'ops':0,'errors':0} for _ in range(args.readers)]
+        threads = [
+            threading.Thread(target=writer,args=(write_engine,args.accounts,stop,s,i))
+            for i,s in enumerate(write_stats)
+        ] + [
+            threading.Thread(target=reader,args=(read_engine,stop,s))
+            for s in read_stats
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        write_engine.dispose()
+        read_engine.dispose()
+
+    return {
+        'profile':profile,
+        'writes_per_sec':sum(s['ops'] for s in write_stats) / args.seconds,
+        'write_errors':sum(s['errors'] for s in write_stats),
+        'reads_per_sec':sum(s['ops'] for s in read_stats) / args.seconds,
+        'read_errors':sum(s['errors'] for s in read_stats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profiles',nargs='+',default=['default','performance'])
+    parser.add_argument('--lines',type=int,default=100_000)
+    parser.add_argument('--accounts',type=int,default=500)
+    parser.add_argument('--readers',type=int,default=4)
+    parser.add_argument('--writers',type=int,default=1)
+    parser.add_argument('--seconds',type=float,default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'profile':>12} {'writes/s':>10} {'w.err':>6} {'reads/s':>10} {'r.err':>6}")
+    for profile in args.profiles:
+        r = run_profile(profile,args)
+        print(
+            f"{r['profile']:>12} {r['writes_per_sec']:>10.1f} {r['write_errors']:>6} "
+            f"{r['reads_per_sec']:>10.1f} {r['read_errors']:>6}"
+        )
+
+
+if __name__ == '__main__':
+    main()
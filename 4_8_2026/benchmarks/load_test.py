@@ -0,0 +1,226 @@
+"""
+Load test for the /api/reports endpoints
+
+Seeds a synthetic ledger (or reuses --db), then drives every report endpoint
+concurrently through an in-process ASGI client and prints one JSON document
+with p50/p95/p99 latency, throughput and SQL statements per request for each
+endpoint, so runs can be diffed.
+
+    python -m benchmarks.load_test --lines 1000000 --concurrency 16 --requests 200
+    python -m benchmarks.load_test --db /tmp/ledger.db --output run.json
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+# set by main() before the app (and its engines) is imported
+_statements = contextvars.ContextVar('statements',default=None)
+
+
+def endpoints(start:date,end:date) -> dict:
+    return {
+        'trial-balance':('/api/reports/trial-balance',{}),
+        'trial-balance-rollup':('/api/reports/trial-balance',{'rollup':'true'}),
+        'balance-sheet':('/api/reports/balance-sheet',{}),
+        'income-statement-month':(
+            '/api/reports/income-statement',
+            {'start_date':end.replace(day=1).isoformat(),'end_date':end.isoformat()},
+        ),
+        'income-statement-full-range':(
+            '/api/reports/income-statement',
+            {'start_date':start.isoformat(),'end_date':end.isoformat()},
+        ),
+        'income-statement-partial-edges':(
+            '/api/reports/income-statement',
+            {'start_date':start.replace(day=15).isoformat(),'end_date':end.replace(day=10).isoformat()},
+        ),
+        'income-statement-series-month':(
+            '/api/reports/income-statement/series',
+            {'start_date':start.isoformat(),'end_date':end.isoformat(),'grain':'month'},
+        ),
+        'income-statement-series-week':(
+            '/api/reports/income-statement/series',
+            {'start_date':start.isoformat(),'end_date':end.isoformat(),'grain':'week'},
+        ),
+        'dashboard':('/api/reports/dashboard',{}),
+        'aging':('/api/reports/aging',{'as_of':end.isoformat()}),
+        'general-ledger-month':(
+            '/api/reports/general-ledger',
+            {'start_date':end.replace(day=1).isoformat(),'end_date':end.isoformat()},
+        ),
+    }
+
+
+def percentile(sorted_values:list,pct:float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1,len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+async def drive(client,path:str,params:dict,n_requests:int,concurrency:int) -> dict:
+    latencies = []
+    statements = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            counter = [0]
+            token = _statements.set(counter)
+            start = time.perf_counter()
+            try:
+                response = await client.get(path,params=params)
+                if response.status_code != 200:
+                    errors += 1
+            except Exception:
+                errors += 1
+            finally:
+                latencies.append(time.perf_counter() - start)
+                statements.append(counter[0])
+                _statements.reset(token)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests':n_requests,
+        'errors':errors,
+        'p50_ms':round(percentile(latencies,50) * 1000,3),
+        'p95_ms':round(percentile(latencies,95) * 1000,3),
+        'p99_ms':round(percentile(latencies,99) * 1000,3),
+        'mean_ms':round(sum(latencies) / len(latencies) * 1000,3),
+        'throughput_rps':round(n_requests / elapsed,2),
+        'sql_statements_per_request':round(sum(statements) / len(statements),2),
+        'sql_statements_max':max(statements),
+    }
+
+
+async def run(args,start:date,end:date) -> dict:
+    import httpx
+    from sqlalchemy import event
+    from app.database import engine,read_engine
+    from app.main import app
+
+    def count(*_):
+        counter = _statements.get()
+        if counter is not None:
+            counter[0] += 1
+
+    for e in (engine,read_engine):
+        e.echo = False
+        event.listen(e,'before_cursor_execute',count)
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport,base_url='http://bench',timeout=None) as client:
+        for name,(path,params) in endpoints(start,end).items():
+            if args.endpoints and name not in args.endpoints:
+                continue
+            await client.get(path,params=params)  # warm up connections and page cache
+            results[name] = await drive(client,path,params,args.requests,args.concurrency)
+            print(f'{name}: p50 {results[name]["p50_ms"]}ms p99 {results[name]["p99_ms"]}ms',file=sys.stderr)
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git','rev-parse','--short','HEAD'],capture_output=True,text=True,check=True
+        ).stdout.strip()
+    except (OSError,subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db',help='existing database to test, seeded into a temp file when omitted')
+    parser.add_argument('--lines',type=int,default=100_000)
+    parser.add_argument('--accounts',type=int,default=2000)
+    parser.add_argument('--fanout',type=int,default=None,help='children per account in the chart, 0 for flat')
+    parser.add_argument('--invoices',type=int,default=None,help='default: lines // 20')
+    parser.add_argument('--days',type=int,default=730)
+    parser.add_argument('--seed',type=int,default=42)
+    parser.add_argument('--profile',default='performance')
+    parser.add_argument('--concurrency',type=int,default=8)
+    parser.add_argument('--requests',type=int,default=100,help='requests per endpoint')
+    parser.add_argument('--endpoints',nargs='*',help='only run these endpoint names')
+    parser.add_argument('--cache',action='store_true',help='leave the report cache on')
+    parser.add_argument('--output',help='write the JSON here instead of stdout')
+    args = parser.parse_args()
+
+    tmp = None
+    path = args.db
+    if path is None:
+        tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp.name,'load.db')
+    os.environ['ACCOUNTING_DB_PATH'] = path
+    os.environ['ACCOUNTING_DB_PROFILE'] = args.profile
+
+    from sqlmodel import Session,select,func
+    from app.database import engine,create_db_and_tables
+    from app.models.transactions import JournalEntry
+    from app.services.report_cache import report_cache
+    from benchmarks.seed import seed_ledger,HIERARCHY_FANOUT
+
+    engine.echo = False
+    seed_seconds = None
+    if args.db is None:
+        t = time.perf_counter()
+        seed_ledger(
+            engine,args.lines,n_accounts=args.accounts,seed=args.seed,days=args.days,
+            n_invoices=args.lines // 20 if args.invoices is None else args.invoices,
+            fanout=HIERARCHY_FANOUT if args.fanout is None else args.fanout,
+        )
+        seed_seconds = round(time.perf_counter() - t,3)
+    create_db_and_tables()
+    if not args.cache:
+        report_cache.max_entries = 0
+
+    with Session(engine) as session:
+        start,end = session.exec(select(func.min(JournalEntry.date),func.max(JournalEntry.date))).one()
+    start = start or date.today()
+    end = end or date.today()
+
+    results = asyncio.run(run(args,start,end))
+    document = {
+        'meta':{
+            'git_revision':git_revision(),
+            'timestamp':time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'db':args.db,
+            'lines':args.lines if args.db is None else None,
+            'accounts':args.accounts if args.db is None else None,
+            'seed_seconds':seed_seconds,
+            'profile':args.profile,
+            'concurrency':args.concurrency,
+            'requests_per_endpoint':args.requests,
+            'report_cache':args.cache,
+            'ledger_start':start.isoformat(),
+            'ledger_end':end.isoformat(),
+        },
+        'endpoints':results,
+    }
+    output = json.dumps(document,indent=2)
+    if args.output:
+        with open(args.output,'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+from datetime import date,datetime
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import SQLModel,Session
+from app.models.transactions import AccountType
+from app.services.posting import rebuild_account_balances,rebuild_monthly_rollups
+from app.services.hierarchy import rebuild_account_closure
+
+# share of the chart of accounts per type
+ACCOUNT_MIX = {
+    AccountType.ASSET:0.25,
+    AccountType.LIABILITY:0.15,
+    AccountType.EQUITY:0.05,
+    AccountType.REVENUE:0.20,
+    AccountType.EXPENSE:0.35,
+}
+
+# (debit type, credit type, weight) of the entry scenarios, loosely a small business:
+# sales, collections, expenses paid or accrued, bills paid, owner funding
+SCENARIOS = [
+    (AccountType.ASSET,AccountType.REVENUE,0.35),
+    (AccountType.ASSET,AccountType.ASSET,0.10),
+    (AccountType.EXPENSE,AccountType.ASSET,0.30),
+    (AccountType.EXPENSE,AccountType.LIABILITY,0.15),
+    (AccountType.LIABILITY,AccountType.ASSET,0.08),
+    (AccountType.ASSET,AccountType.EQUITY,0.02),
+]
+
+CHUNK_ENTRIES = 250_000
+
+# children per account in the seeded chart, every type is one tree of this
+# fanout, so 2000 accounts give 4-5 levels with the widest level at the leaves
+HIERARCHY_FANOUT = 4
+
+
+def seed_ledger(engine,n_lines:int,n_accounts:int = 2000,seed:int = 42,
+                start:date = date(2024,1,1),days:int = 730,n_invoices:int = 0,
+                materialize:bool = True,fanout:int = HIERARCHY_FANOUT) -> None:
+    """
+    Fill an empty database with a synthetic ledger of n_lines transaction lines
+    (n_lines // 2 balanced journal entries, one debit and one credit line each).
+
+    Accounts follow ACCOUNT_MIX and form one tree per type with `fanout`
+    children per account (0 leaves the chart flat). Entries follow SCENARIOS
+    with lognormal amounts in cents, and dates are spread over `days` with
+    busier month ends.
+    Secondary indexes are dropped during the load and rebuilt afterwards,
+    then AccountBalance, the monthly rollups and the closure table are rebuilt unless
+    materialize is False.
+    """
+    SQLModel.metadata.create_all(engine)
+    rng = np.random.default_rng(seed)
+    types = list(ACCOUNT_MIX)
+
+    counts = np.maximum(1,np.round(np.array(list(ACCOUNT_MIX.values())) * n_accounts)).astype(int)
+    account_types = np.repeat(np.arange(len(types)),counts)
+    n_accounts = len(account_types)
+    ids_by_type = [np.flatnonzero(account_types == t) + 1 for t in range(len(types))]
+    parent_ids = _tree_parents(ids_by_type,fanout)
+
+    indexes = [
+        index for table in SQLModel.metadata.sorted_tables
+        for index in table.indexes if not index.unique
+    ]
+    with engine.begin() as conn:
+        for index in indexes:
+            conn.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.executemany(
+            'INSERT INTO account (id,code,name,account_type,parent_id,is_active) VALUES (?,?,?,?,?,?)',
+            [
+                (i + 1,str(1000 + i),f'{types[t].value.title()} {1000 + i}',types[t].name,parent,1)
+                for i,(t,parent) in enumerate(zip(account_types.tolist(),parent_ids))
+            ]
+        )
+
+        weights = np.array([w for _,_,w in SCENARIOS])
+        debit_types = np.array([types.index(d) for d,_,_ in SCENARIOS])
+        credit_types = np.array([types.index(c) for _,c,_ in SCENARIOS])
+        # month ends get roughly twice the traffic of an ordinary day
+        day_weights = np.array([
+            2.0 if (np.datetime64(start) + d + 1).astype(object).day == 1 else 1.0
+            for d in range(days)
+        ])
+        day_weights /= day_weights.sum()
+        created_at = datetime.utcnow().isoformat(sep=' ')
+
+        n_entries = n_lines // 2
+        for first in range(0,n_entries,CHUNK_ENTRIES):
+            n = min(CHUNK_ENTRIES,n_entries - first)
+            entry_ids = np.arange(first + 1,first + n + 1)
+            scenario = rng.choice(len(SCENARIOS),size=n,p=weights / weights.sum())
+            dates = (np.datetime64(start) + rng.choice(days,size=n,p=day_weights)).astype(str)
+            amounts = np.rint(rng.lognormal(mean=5.5,sigma=1.2,size=n) * 100).astype(np.int64)
+            dr = _pick(rng,ids_by_type,debit_types[scenario])
+            cr = _pick(rng,ids_by_type,credit_types[scenario])
+
+            cur.executemany(
+                'INSERT INTO journalentry (id,date,description,reference_number,created_at) VALUES (?,?,?,?,?)',
+                zip(entry_ids.tolist(),dates.tolist(),[f'Entry {i}' for i in entry_ids.tolist()],
+                    [None] * n,[created_at] * n)
+            )
+            zeros = np.zeros(n,dtype=np.int64)
+            cur.executemany(
+                'INSERT INTO transactionline (journal_entry_id,account_id,debit,credit) VALUES (?,?,?,?)',
+                zip(np.repeat(entry_ids,2).tolist(),
+                    np.column_stack([dr,cr]).ravel().tolist(),
+                    np.column_stack([amounts,zeros]).ravel().tolist(),
+                    np.column_stack([zeros,amounts]).ravel().tolist())
+            )
+
+        if n_invoices:
+            customers = [f'Customer {i}' for i in range(max(1,n_invoices // 20))]
+            invoice_days = rng.integers(0,days,size=n_invoices)
+            invoice_dates = np.datetime64(start) + invoice_days
+            due_dates = invoice_dates + rng.choice([15,30,45,60],size=n_invoices)
+            amounts = np.round(rng.lognormal(mean=7,sigma=1,size=n_invoices),2)
+            paid = np.round(amounts * rng.choice([0,0.5,1],size=n_invoices,p=[0.4,0.2,0.4]),2)
+            cur.executemany(
+                'INSERT INTO invoice (invoice_number,customer_name,invoice_date,due_date,invoice_amount,amount_paid) '
+                'VALUES (?,?,?,?,?,?)',
+                zip([f'INV-{i}' for i in range(n_invoices)],
+                    [customers[i] for i in rng.integers(0,len(customers),size=n_invoices).tolist()],
+                    invoice_dates.astype(str).tolist(),due_dates.astype(str).tolist(),
+                    amounts.tolist(),paid.tolist())
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+    for index in indexes:
+        index.create(engine,checkfirst=True)
+
+    if materialize:
+        with Session(engine) as session:
+            rebuild_account_balances(session)
+            rebuild_monthly_rollups(session)
+            rebuild_account_closure(session)
+            session.commit()
+
+
+def _tree_parents(ids_by_type:list,fanout:int) -> list:
+    """
+    parent_id per account id (index id - 1): the first account of each type
+    is the root and the k-th one hangs under the (k - 1) // fanout-th, so the
+    type's accounts fill a complete tree level by level
+    """
+    parents = [None] * sum(len(ids) for ids in ids_by_type)
+    if fanout:
+        for ids in ids_by_type:
+            for k in range(1,len(ids)):
+                parents[ids[k] - 1] = int(ids[(k - 1) // fanout])
+    return parents
+
+
+def _pick(rng,ids_by_type:list,type_per_row:np.ndarray) -> np.ndarray:
+    """One random account id of the requested type for each row"""
+    out = np.empty(len(type_per_row),dtype=np.int64)
+    for t,ids in enumerate(ids_by_type):
+        rows = type_per_row == t
+        out[rows] = ids[rng.integers(0,len(ids),size=rows.sum())]
+    return out
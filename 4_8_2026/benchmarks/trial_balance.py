@@ -0,0 +1,77 @@
+"""
+Trial balance benchmark: per-account queries vs one grouped aggregate
+
+    python -m benchmarks.trial_balance
+    python -m benchmarks.trial_balance --sizes 10000 100000 1000000 --legacy-max 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+from sqlalchemy import event
+from sqlmodel import Session,create_engine,select
+from app.models.transactions import Account
+from app.services.analytics import AccountingAnalytics
+from benchmarks.seed import seed_ledger
+
+
+def legacy_trial_balance(analytics:AccountingAnalytics) -> list[dict]:
+    """The old shape of get_trial_balance: one balance query per account"""
+    rows = []
+    for account in analytics.session.exec(select(Account)).all():
+        balance = analytics.get_account_balance(account.id)
+        rows.append({
+            'code':account.code,
+            'name':account.name,
+            'type':account.account_type,
+            'debit_balance':balance if balance > 0 else 0,
+            'credit_balance': abs(balance) if balance < 0 else 0,
+        })
+    return rows
+
+
+def measure(engine,fn) -> tuple[float,int,list]:
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    event.listen(engine,'before_cursor_execute',count)
+    try:
+        with Session(engine) as session:
+            start = time.perf_counter()
+            result = fn(AccountingAnalytics(session))
+            elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine,'before_cursor_execute',count)
+    return elapsed,len(statements),result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes',type=int,nargs='+',default=[10_000,100_000,1_000_000])
+    parser.add_argument('--accounts',type=int,default=2000)
+    parser.add_argument('--legacy-max',type=int,default=100_000,
+                        help='skip the per-account path above this many lines')
+    args = parser.parse_args()
+
+    print(f"{'lines':>10} {'path':>8} {'queries':>8} {'seconds':>10}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp,'bench.db')}")
+            seed_ledger(engine,size,n_accounts=args.accounts,materialize=False)
+
+            elapsed,queries,grouped = measure(engine,lambda a: a.get_trial_balance())
+            print(f'{size:>10} {"grouped":>8} {queries:>8} {elapsed:>10.4f}')
+
+            if size <= args.legacy_max:
+                elapsed,queries,legacy = measure(engine,legacy_trial_balance)
+                print(f'{size:>10} {"legacy":>8} {queries:>8} {elapsed:>10.4f}')
+                assert [r['code'] for r in legacy] == [r['code'] for r in grouped]
+                # integer cents, both paths have to agree exactly
+                assert legacy == grouped
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
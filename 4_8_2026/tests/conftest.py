@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel,Session,create_engine
+from app.models.transactions import Account,AccountType
+from app.services.hierarchy import create_account
+
+CHART = [
+    ('1000',AccountType.ASSET),('2000',AccountType.LIABILITY),('3000',AccountType.EQUITY),
+    ('4000',AccountType.REVENUE),('5000',AccountType.EXPENSE),
+]
+
+
+@pytest.fixture
+def ledger_engine():
+    """A fresh in-memory ledger with one account per type (ids 1-5 in CHART order)"""
+    engine = create_engine('sqlite://',connect_args={'check_same_thread':False},poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for code,account_type in CHART:
+            create_account(session,Account(code=code,name=code,account_type=account_type))
+        session.commit()
+    yield engine
+    engine.dispose()
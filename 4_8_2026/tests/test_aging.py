@@ -0,0 +1,107 @@
+"""
+Invoice loading for the aging report and its cache version, which is
+separate from the ledger's and seen by every process sharing the database.
+"""
+from datetime import date
+import io
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel,Session,create_engine,select
+from app.database import get_read_session
+from app.models.transactions import Account,AccountType,Invoice
+from app.routers import reports
+from app.services.aging import AgingEngine,import_invoices_csv
+from app.services.hierarchy import create_account
+from app.services.report_cache import data_version,report_cache
+
+EXPORT = '''Invoice_ID,Customer_Name,Invoice_Date,Due_Date,Invoice_Amount,Amount_Paid,,
+INV-1,Acme Corp,1/15/2026,2/14/2026,5000,5000,,
+INV-2,Globex,1/20/2026,2/19/2026,12000,0,,
+INV-3,Globex,3/01/2026,3/31/2026,800,300,,
+INV-4,Initech,3/10/2026,4/09/2026,1500,0,,
+'''
+AS_OF = date(2026,4,15)
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def load(engine,content) -> int:
+    with Session(engine) as session:
+        count = import_invoices_csv(session,io.StringIO(content))
+        session.commit()
+    return count
+
+
+def test_loaded_invoices_report_like_the_export(ledger_engine):
+    assert load(ledger_engine,EXPORT) == 4
+    with Session(ledger_engine) as session:
+        from_db = AgingEngine.from_session(session).report(AS_OF)
+    assert from_db == AgingEngine.from_csv(io.StringIO(EXPORT)).report(AS_OF)
+    assert from_db['invoice_count'] == 3
+    assert from_db['totals'] == {'current':0.0,'1-30':2000.0,'31-60':12000.0,'61-90':0.0,'90+':0.0,'total':14000.0}
+
+
+def test_reimport_updates_payments(ledger_engine):
+    load(ledger_engine,EXPORT)
+    load(ledger_engine,EXPORT.replace('INV-2,Globex,1/20/2026,2/19/2026,12000,0','INV-2,Globex,1/20/2026,2/19/2026,12000,12000'))
+    with Session(ledger_engine) as session:
+        invoices = session.exec(select(Invoice).order_by(Invoice.invoice_number)).all()
+    assert [invoice.invoice_number for invoice in invoices] == ['INV-1','INV-2','INV-3','INV-4']
+    assert invoices[1].amount_paid == 12000
+    assert invoices[1].due_date == date(2026,2,19)
+
+
+def versions(engine) -> dict:
+    with Session(engine) as session:
+        return {name:data_version(session,name) for name in ('ledger','aging')}
+
+
+def test_invoice_and_ledger_writes_bump_their_own_version(ledger_engine):
+    ledger,aging = versions(ledger_engine).values()
+    load(ledger_engine,EXPORT)
+    assert versions(ledger_engine) == {'ledger':ledger,'aging':aging + 1}
+    with Session(ledger_engine) as session:
+        create_account(session,Account(code='1200',name='Receivables',account_type=AccountType.ASSET))
+        session.commit()
+    assert versions(ledger_engine) == {'ledger':ledger + 1,'aging':aging + 1}
+
+
+@pytest.fixture
+def server(tmp_path):
+    """The /aging endpoint on a database file that another process can write"""
+    path = tmp_path / 'aging.db'
+    engine = create_engine(f'sqlite:///{path}')
+    SQLModel.metadata.create_all(engine)
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(reports.router)
+    app.dependency_overrides[get_read_session] = session_override
+    report_cache.clear()
+    with TestClient(app) as client:
+        yield client,path
+    report_cache.clear()
+    engine.dispose()
+
+
+def test_aging_sees_invoices_imported_by_another_process(server):
+    client,path = server
+    params = {'as_of':AS_OF.isoformat()}
+    assert client.get('/api/reports/aging',params=params).json()['invoice_count'] == 0
+    export = path.parent / 'ar_aging_data.csv'
+    export.write_text(EXPORT)
+    result = subprocess.run(
+        [sys.executable,'-m','app.cli','import-invoices',str(export)],cwd=APP_DIR,capture_output=True,text=True,
+        env={**os.environ,'ACCOUNTING_DB_PATH':str(path)},
+    )
+    assert result.returncode == 0,result.stderr[-2000:]
+    report = client.get('/api/reports/aging',params=params).json()
+    assert report['invoice_count'] == 3
+    assert report['totals']['total'] == 14000.0
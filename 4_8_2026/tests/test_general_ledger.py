@@ -0,0 +1,77 @@
+"""
+General ledger export: running balances that open from the monthly rollups
+plus the partial month, and the streamed formats.
+"""
+from datetime import date
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.models.transactions import JournalEntry,TransactionLine
+from app.routers import reports
+from app.services.general_ledger import iter_general_ledger
+from app.services.posting import post_journal_entry
+
+# (date, cents) of sales debited to 1000 (id 1) and credited to 4000 (id 4)
+SALES = [
+    (date(2026,1,10),1000),(date(2026,1,31),200),(date(2026,2,1),30),
+    (date(2026,2,14),4),(date(2026,2,15),50000),(date(2026,3,2),600),
+]
+
+
+@pytest.fixture
+def ledger(ledger_engine):
+    with Session(ledger_engine) as session:
+        for day,amount in SALES:
+            post_journal_entry(session,JournalEntry(date=day,description='sale'),[
+                TransactionLine(account_id=1,debit=amount),TransactionLine(account_id=4,credit=amount),
+            ])
+        session.commit()
+    return ledger_engine
+
+
+def rows(engine,**kwargs) -> list[dict]:
+    with Session(engine) as session:
+        return [row for batch in iter_general_ledger(session,**kwargs) for row in batch]
+
+
+@pytest.mark.parametrize('start_date',[date(2026,1,1),date(2026,2,1),date(2026,2,15),date(2026,3,1),date(2026,3,3)])
+def test_running_balance_opens_with_everything_before_start(ledger,start_date):
+    before = sum(amount for day,amount in SALES if day < start_date)
+    after = [amount for day,amount in SALES if day >= start_date]
+    cash = rows(ledger,start_date=start_date,account_code='1000')
+    assert [row['debit'] for row in cash] == [amount / 100 for amount in after]
+    expected = before
+    for row,amount in zip(cash,after):
+        expected += amount
+        assert row['balance'] == expected / 100
+    revenue = rows(ledger,start_date=start_date,account_code='4000')
+    if after:
+        assert revenue[0]['balance'] == -(before + after[0]) / 100
+
+
+def test_export_covers_every_account_in_order(ledger):
+    exported = rows(ledger,start_date=date(2026,2,10),end_date=date(2026,2,28))
+    assert [(row['account_code'],row['date']) for row in exported] == [
+        ('1000','2026-02-14'),('1000','2026-02-15'),('4000','2026-02-14'),('4000','2026-02-15'),
+    ]
+    assert exported[1]['balance'] == (1000 + 200 + 30 + 4 + 50000) / 100
+
+
+@pytest.fixture
+def client(ledger,monkeypatch):
+    monkeypatch.setattr(reports,'read_engine',ledger)
+    app = FastAPI()
+    app.include_router(reports.router)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_endpoint_streams_csv_and_ndjson(client):
+    response = client.get('/api/reports/general-ledger',params={'format':'csv','account_code':'1000'})
+    assert response.headers['content-type'].startswith('text/csv')
+    assert len(response.text.splitlines()) == len(SALES) + 1
+    response = client.get('/api/reports/general-ledger',params={'account_code':'4000'})
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert len(response.text.splitlines()) == len(SALES)
+    assert client.get('/api/reports/general-ledger',params={'format':'xml'}).status_code == 422
@@ -0,0 +1,122 @@
+"""
+Account hierarchy: closure rows kept by create_account / reparent_account
+and the seeded benchmark chart.
+"""
+from datetime import date
+import pytest
+from sqlalchemy import insert
+from sqlmodel import SQLModel,Session,create_engine,select
+from app import database
+from app.models.transactions import Account,AccountClosure,AccountType,JournalEntry,TransactionLine
+from app.services.analytics import AccountingAnalytics
+from app.services.hierarchy import create_account,reparent_account,verify_account_closure
+from app.services.posting import rebuild_account_balances
+from benchmarks.seed import seed_ledger
+
+
+def add(session,code,parent_id=None) -> int:
+    account = Account(code=code,name=code,account_type=AccountType.ASSET,parent_id=parent_id)
+    return create_account(session,account).id
+
+
+def ancestors(session,account_id) -> list[tuple[int,int]]:
+    """(ancestor_id, depth) pairs of an account, nearest first"""
+    return session.exec(
+        select(AccountClosure.ancestor_id,AccountClosure.depth)
+        .where(AccountClosure.descendant_id == account_id)
+        .order_by(AccountClosure.depth)
+    ).all()
+
+
+@pytest.fixture
+def tree(ledger_engine):
+    """1000 (id 1) > 1100 > 1110 > 1111, plus 1200 under 1000"""
+    with Session(ledger_engine) as session:
+        ids = {'1000':1}
+        ids['1100'] = add(session,'1100',1)
+        ids['1110'] = add(session,'1110',ids['1100'])
+        ids['1111'] = add(session,'1111',ids['1110'])
+        ids['1200'] = add(session,'1200',1)
+        session.commit()
+        yield session,ids
+
+
+def test_create_account_links_every_ancestor(tree):
+    session,ids = tree
+    assert ancestors(session,ids['1111']) == [(ids['1111'],0),(ids['1110'],1),(ids['1100'],2),(1,3)]
+    assert verify_account_closure(session) == []
+
+
+def test_create_account_with_unknown_parent_is_rejected(tree):
+    session,_ = tree
+    with pytest.raises(ValueError,match='does not exist'):
+        add(session,'1300',999)
+
+
+def test_reparent_moves_the_whole_subtree(tree):
+    session,ids = tree
+    reparent_account(session,ids['1110'],ids['1200'])
+    session.commit()
+    assert ancestors(session,ids['1111']) == [(ids['1111'],0),(ids['1110'],1),(ids['1200'],2),(1,3)]
+    assert ancestors(session,ids['1100']) == [(ids['1100'],0),(1,1)]
+    assert session.get(Account,ids['1110']).parent_id == ids['1200']
+    assert verify_account_closure(session) == []
+
+
+def test_reparent_to_the_top_level(tree):
+    session,ids = tree
+    reparent_account(session,ids['1100'],None)
+    session.commit()
+    assert ancestors(session,ids['1111']) == [(ids['1111'],0),(ids['1110'],1),(ids['1100'],2)]
+    assert verify_account_closure(session) == []
+
+
+@pytest.mark.parametrize('parent',['1100','1110','1111'])
+def test_reparent_into_own_subtree_is_rejected(tree,parent):
+    session,ids = tree
+    with pytest.raises(ValueError,match='inside the subtree'):
+        reparent_account(session,ids['1100'],ids[parent])
+    session.rollback()
+    assert ancestors(session,ids['1100']) == [(ids['1100'],0),(1,1)]
+    assert verify_account_closure(session) == []
+
+
+def test_seeded_chart_is_a_consistent_tree():
+    engine = create_engine('sqlite://')
+    seed_ledger(engine,200,n_accounts=200,fanout=3)
+    with Session(engine) as session:
+        assert verify_account_closure(session) == []
+        roots = session.exec(select(Account.account_type).where(Account.parent_id == None)).all()
+        assert sorted(roots) == sorted(AccountType)
+        depth = session.exec(select(AccountClosure.depth).order_by(AccountClosure.depth.desc())).first()
+        assert depth >= 3
+
+
+def test_startup_builds_the_closure_for_existing_accounts(monkeypatch):
+    # accounts written before the closure table existed, so none of them has rows
+    engine = create_engine('sqlite://')
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(Account),[
+            {'id':1,'code':'1000','name':'Cash','account_type':AccountType.ASSET.name,'parent_id':None},
+            {'id':2,'code':'1100','name':'Petty cash','account_type':AccountType.ASSET.name,'parent_id':1},
+            {'id':3,'code':'4000','name':'Sales','account_type':AccountType.REVENUE.name,'parent_id':None},
+        ])
+        session.add(JournalEntry(id=1,date=date(2026,4,1),description='sale'))
+        session.add_all([
+            TransactionLine(journal_entry_id=1,account_id=2,debit=29),
+            TransactionLine(journal_entry_id=1,account_id=3,credit=29),
+        ])
+        rebuild_account_balances(session)
+        session.commit()
+        assert len(verify_account_closure(session)) == 4
+
+    monkeypatch.setattr(database,'engine',engine)
+    database.create_db_and_tables()
+    with Session(engine) as session:
+        assert verify_account_closure(session) == []
+        analytics = AccountingAnalytics(session)
+        flat = {row['code']:row['debit_balance'] - row['credit_balance'] for row in analytics.get_trial_balance()}
+        rollup = {row['code']:row['debit_balance'] - row['credit_balance'] for row in analytics.get_trial_balance(rollup=True)}
+    assert flat == {'1000':0,'1100':29,'4000':-29}
+    assert rollup == {'1000':29,'1100':29,'4000':-29}
@@ -0,0 +1,106 @@
+"""
+The income statement reads whole months from AccountMonthlyRollup and only
+the partial edge months from raw lines; every range has to come out the same
+as summing the raw TransactionLine rows.
+"""
+from datetime import date,timedelta
+import pytest
+from sqlalchemy import func
+from sqlmodel import Session,select
+from app.models.transactions import Account,AccountType,JournalEntry,TransactionLine
+from app.services.analytics import AccountingAnalytics
+from app.services.posting import post_journal_entry
+
+CASH,REVENUE,EXPENSE = 1,4,5
+FIRST_DAY,LAST_DAY = date(2025,12,20),date(2026,5,10)
+
+
+@pytest.fixture
+def ledger(ledger_engine):
+    """Daily sales and an expense every third day, nothing in April 2026"""
+    with Session(ledger_engine) as session:
+        day = FIRST_DAY
+        while day <= LAST_DAY:
+            if day.month != 4:
+                amount = 100 + day.toordinal() % 97
+                post_journal_entry(
+                    session,JournalEntry(date=day,description='sale'),
+                    [TransactionLine(account_id=CASH,debit=amount),TransactionLine(account_id=REVENUE,credit=amount)]
+                )
+                if day.toordinal() % 3 == 0:
+                    post_journal_entry(
+                        session,JournalEntry(date=day,description='rent'),
+                        [TransactionLine(account_id=EXPENSE,debit=amount // 2),TransactionLine(account_id=CASH,credit=amount // 2)]
+                    )
+            day += timedelta(days=1)
+        session.commit()
+    return ledger_engine
+
+
+def raw_sum(session,account_type,start_date,end_date) -> int:
+    """credit - debit straight from the lines, no rollups"""
+    return session.exec(
+        select(func.coalesce(func.sum(TransactionLine.credit - TransactionLine.debit),0))
+        .join(Account,TransactionLine.account_id == Account.id)
+        .join(JournalEntry,TransactionLine.journal_entry_id == JournalEntry.id)
+        .where(Account.account_type == account_type)
+        .where(JournalEntry.date >= start_date)
+        .where(JournalEntry.date <= end_date)
+    ).one()
+
+
+RANGES = {
+    'mid_to_mid_month':(date(2026,1,15),date(2026,3,10)),
+    'mid_month_to_month_end':(date(2026,1,15),date(2026,2,28)),
+    'month_start_to_mid_month':(date(2026,2,1),date(2026,3,10)),
+    'across_a_year_end':(date(2025,12,24),date(2026,1,7)),
+    'inside_one_month':(date(2026,2,3),date(2026,2,20)),
+    'single_day':(date(2026,2,12),date(2026,2,12)),
+    'one_whole_month':(date(2026,2,1),date(2026,2,28)),
+    'whole_months':(date(2026,1,1),date(2026,3,31)),
+    'one_day_either_side_of_whole_months':(date(2025,12,31),date(2026,3,1)),
+    'month_without_activity':(date(2026,4,1),date(2026,4,30)),
+    'everything':(FIRST_DAY,LAST_DAY),
+}
+
+
+@pytest.mark.parametrize('name',RANGES)
+def test_income_statement_matches_the_raw_lines(ledger,name):
+    start_date,end_date = RANGES[name]
+    with Session(ledger) as session:
+        statement = AccountingAnalytics(session).get_income_statement(start_date,end_date)
+        revenue = raw_sum(session,AccountType.REVENUE,start_date,end_date)
+        expenses = raw_sum(session,AccountType.EXPENSE,start_date,end_date)
+    assert statement['total_revenue'] == revenue
+    assert statement['total_expenses'] == expenses
+    assert statement['net_income'] == revenue - expenses
+    if name != 'month_without_activity':
+        assert revenue != 0 and expenses != 0
+
+
+@pytest.mark.parametrize('grain',['day','week','month','quarter'])
+def test_series_buckets_match_the_income_statement(ledger,grain):
+    start_date,end_date = date(2026,1,15),date(2026,5,10)
+    with Session(ledger) as session:
+        analytics = AccountingAnalytics(session)
+        series = analytics.get_income_statement_series(start_date,end_date,grain)
+        periods = series['periods']
+        for period in periods:
+            bucket_start = date.fromisoformat(period['period']['start'])
+            bucket_end = date.fromisoformat(period['period']['end'])
+            assert period == analytics.get_income_statement(bucket_start,bucket_end)
+
+    # contiguous buckets clipped to the range, so every day is counted once
+    assert periods[0]['period']['start'] == str(start_date)
+    assert periods[-1]['period']['end'] == str(end_date)
+    for previous,current in zip(periods,periods[1:]):
+        assert date.fromisoformat(current['period']['start']) == date.fromisoformat(previous['period']['end']) + timedelta(days=1)
+    # April has no entries, its buckets are there with zero totals
+    april = [
+        period for period in periods
+        if date(2026,4,1) <= date.fromisoformat(period['period']['start'])
+        and date.fromisoformat(period['period']['end']) <= date(2026,4,30)
+    ]
+    if grain != 'quarter':
+        assert april and all(period['total_revenue'] == period['total_expenses'] == 0 for period in april)
+    assert {'day':116,'week':17,'month':5,'quarter':2}[grain] == len(periods)
@@ -0,0 +1,233 @@
+"""
+IngestionQueue and the n8n webhook: deduplication, backpressure, batching
+and retries after a rejected or failed write.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel,Session,create_engine,select
+from app import migrations
+from app.models.transactions import JournalEntry,TransactionLine
+from app.routers import webhooks
+from app.services.ingestion import IngestionQueue,QueueFull,WebhookTransaction
+
+
+def transaction(key,debit_code='1000',credit_code='4000',amount=10.0):
+    return WebhookTransaction(
+        idempotency_key=key,date=date(2026,4,1),description=key,
+        lines=[
+            {'account_code':debit_code,'debit':amount},
+            {'account_code':credit_code,'credit':amount},
+        ],
+    )
+
+
+def references(engine) -> list[str]:
+    with Session(engine) as session:
+        return sorted(session.exec(select(JournalEntry.reference_number)).all())
+
+
+async def wait_for(condition,timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline,'timed out waiting for the ingestion worker'
+        await asyncio.sleep(0.01)
+
+
+def test_duplicates_are_written_once(ledger_engine):
+    async def scenario():
+        queue = IngestionQueue(engine=ledger_engine,flush_interval=0.01)
+        await queue.start()
+        assert queue.submit(transaction('a')) == 'queued'
+        assert queue.submit(transaction('a')) == 'duplicate'
+        await wait_for(lambda: queue.entries_written == 1)
+        assert queue.submit(transaction('a')) == 'duplicate'
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert references(ledger_engine) == ['a']
+    assert queue.duplicates == 2
+
+
+def test_duplicate_of_a_committed_key_is_skipped_on_flush(ledger_engine):
+    # a restarted process has an empty _recent, the reference_number check catches it
+    async def scenario():
+        for _ in range(2):
+            queue = IngestionQueue(engine=ledger_engine,flush_interval=0.01)
+            await queue.start()
+            queue.submit(transaction('a'))
+            await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert references(ledger_engine) == ['a']
+    assert queue.duplicates == 1 and queue.entries_written == 0
+
+
+def test_imported_reference_numbers_do_not_shadow_webhook_keys(ledger_engine):
+    # journal imports store their Transaction_ID in reference_number
+    with Session(ledger_engine) as session:
+        session.add(JournalEntry(date=date(2026,4,1),description='imported',reference_number='a'))
+        session.commit()
+
+    async def scenario():
+        queue = IngestionQueue(engine=ledger_engine,flush_interval=0.01)
+        await queue.start()
+        queue.submit(transaction('a'))
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert queue.entries_written == 1 and queue.duplicates == 0
+    with Session(ledger_engine) as session:
+        keys = session.exec(select(JournalEntry.idempotency_key).order_by(JournalEntry.id)).all()
+    assert keys == [None,'a']
+
+
+def test_existing_database_gains_the_key_column(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "v1.db"}')
+    SQLModel.metadata.create_all(engine,tables=[TransactionLine.__table__])
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'CREATE TABLE journalentry (id INTEGER PRIMARY KEY,date DATE NOT NULL,'
+            'description VARCHAR NOT NULL,reference_number VARCHAR,created_at DATETIME NOT NULL)'
+        )
+        conn.exec_driver_sql("INSERT INTO journalentry VALUES (1,'2026-04-01','old','a','2026-04-01')")
+        conn.exec_driver_sql('PRAGMA user_version=1')
+    assert migrations.migrate(engine) == ['added journalentry.idempotency_key']
+    assert migrations.migrate(engine) == []
+    with engine.connect() as conn:
+        indexes = {row[1]:row[2] for row in conn.exec_driver_sql('PRAGMA index_list(journalentry)')}
+        assert indexes['ix_journalentry_idempotency_key'] == 1
+        assert conn.exec_driver_sql('PRAGMA user_version').scalar() == migrations.SCHEMA_VERSION
+    with Session(engine) as session:
+        assert session.exec(select(JournalEntry.reference_number,JournalEntry.idempotency_key)).all() == [('a',None)]
+    engine.dispose()
+
+
+def test_full_queue_pushes_back(ledger_engine):
+    async def scenario():
+        queue = IngestionQueue(engine=ledger_engine,max_size=2,flush_interval=0.01)
+        await queue.start()
+        # submit never yields, so the worker has not drained anything yet
+        queue.submit(transaction('a'))
+        queue.submit(transaction('b'))
+        with pytest.raises(QueueFull):
+            queue.submit(transaction('c'))
+        await queue.stop()
+        with pytest.raises(QueueFull):
+            queue.submit(transaction('d'))
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert references(ledger_engine) == ['a','b']
+    assert queue.rejected == 2
+
+
+def test_batches_flush_by_size_and_on_stop(ledger_engine):
+    async def scenario():
+        queue = IngestionQueue(engine=ledger_engine,batch_size=2,flush_interval=60)
+        await queue.start()
+        for key in 'abcde':
+            queue.submit(transaction(key))
+        # two full batches go out without waiting for the interval
+        await wait_for(lambda: queue.entries_written == 4)
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert references(ledger_engine) == list('abcde')
+    assert queue.flushes == 3
+
+
+def test_rejected_entry_can_be_retried_with_the_same_key(ledger_engine):
+    async def scenario():
+        queue = IngestionQueue(engine=ledger_engine,flush_interval=0.01)
+        await queue.start()
+        assert queue.submit(transaction('a',credit_code='9999')) == 'queued'
+        await wait_for(lambda: queue.entries_failed == 1)
+        assert queue.last_errors[-1]['idempotency_key'] == 'a'
+        assert queue.submit(transaction('a')) == 'queued'
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert references(ledger_engine) == ['a']
+    assert queue.entries_written == 1
+
+
+def test_failed_flush_can_be_retried_with_the_same_key(ledger_engine,monkeypatch):
+    async def scenario():
+        queue = IngestionQueue(engine=ledger_engine,flush_interval=0.01)
+        flush = queue._flush
+
+        def broken(batch):
+            raise RuntimeError('database is locked')
+
+        monkeypatch.setattr(queue,'_flush',broken)
+        await queue.start()
+        queue.submit(transaction('a'))
+        await wait_for(lambda: queue.entries_failed == 1)
+        monkeypatch.setattr(queue,'_flush',flush)
+        assert queue.submit(transaction('a')) == 'queued'
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert references(ledger_engine) == ['a']
+
+
+@pytest.fixture
+def client(ledger_engine,monkeypatch):
+    queue = IngestionQueue(engine=ledger_engine,flush_interval=0.01)
+    monkeypatch.setattr(webhooks,'ingestion_queue',queue)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await queue.start()
+        yield
+        await queue.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(webhooks.router)
+    with TestClient(app) as client:
+        yield client
+
+
+def body(key=None):
+    payload = transaction(key or 'unused').model_dump(mode='json')
+    if key is None:
+        del payload['idempotency_key']
+    return payload
+
+
+def test_webhook_takes_the_key_from_the_header(client,ledger_engine):
+    response = client.post('/api/webhook/n8n/transaction',json=body(),headers={'Idempotency-Key':'h1'})
+    assert response.status_code == 202
+    assert response.json() == {'status':'queued','idempotency_key':'h1'}
+    response = client.post('/api/webhook/n8n/transaction',json=body('h1'))
+    assert response.json()['status'] == 'duplicate'
+
+
+def test_webhook_without_a_key_is_a_400(client):
+    response = client.post('/api/webhook/n8n/transaction',json=body())
+    assert response.status_code == 400
+
+
+def test_webhook_rejects_unbalanced_entries(client):
+    payload = body('u')
+    payload['lines'][1]['credit'] = 9.99
+    assert client.post('/api/webhook/n8n/transaction',json=payload).status_code == 422
+
+
+@pytest.mark.parametrize('lines',[0,1])
+def test_webhook_rejects_entries_with_fewer_than_two_lines(client,lines):
+    payload = body('short')
+    payload['lines'] = payload['lines'][:lines]
+    response = client.post('/api/webhook/n8n/transaction',json=payload)
+    assert response.status_code == 422
+    assert response.json()['detail'] == 'a journal entry needs at least two lines'
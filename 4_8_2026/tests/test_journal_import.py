@@ -0,0 +1,152 @@
+"""
+Bulk journal CSV import: the per-entry error report, transactions split
+across chunks, id allocation between chunks and malformed files.
+"""
+from datetime import date
+import io
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session,select
+from app.database import get_session
+from app.models.transactions import AccountBalance,JournalEntry,TransactionLine
+from app.routers import imports
+from app.services import journal_import
+from app.services.journal_import import import_journal_csv
+
+HEADER = 'Transaction_ID,Date,Account_ID,Debit,Credit\n'
+
+
+def csv(*rows) -> io.StringIO:
+    return io.StringIO(HEADER + ''.join(f'{row}\n' for row in rows))
+
+
+def run_import(engine,source,**kwargs) -> dict:
+    with Session(engine) as session:
+        return import_journal_csv(session,source,**kwargs)
+
+
+def entries(engine) -> dict:
+    """reference_number -> [(account_id, debit, credit)]"""
+    with Session(engine) as session:
+        rows = session.exec(
+            select(JournalEntry.reference_number,TransactionLine.account_id,
+                   TransactionLine.debit,TransactionLine.credit)
+            .join(TransactionLine,TransactionLine.journal_entry_id == JournalEntry.id)
+            .order_by(TransactionLine.id)
+        ).all()
+    result = {}
+    for reference,account_id,debit,credit in rows:
+        result.setdefault(reference,[]).append((account_id,debit,credit))
+    return result
+
+
+def test_bad_entries_are_reported_and_the_rest_imported(ledger_engine):
+    report = run_import(ledger_engine,csv(
+        'T1,2026-04-01,1000,12.50,',
+        'T1,2026-04-01,4000,,12.50',
+        'T2,2026-04-01,9999,5,',
+        'T2,2026-04-01,4000,,5',
+        'T3,not a date,1000,5,',
+        'T3,not a date,4000,,5',
+        'T4,2026-04-01,1000,5,',
+        'T4,2026-04-01,4000,,4',
+        'T5,2026-04-01,1000,five,',
+        'T5,2026-04-01,4000,,5',
+        'T6,2026-04-02,5000,3,',
+        'T6,2026-04-02,1000,,3',
+    ))
+    assert report['entries_imported'] == 2 and report['lines_imported'] == 4
+    assert report['entries_rejected'] == 4
+    errors = {error['transaction_id']:error['error'] for error in report['errors']}
+    assert errors == {
+        'T2':"unknown account code(s) ['9999']",
+        'T3':'unparseable date',
+        'T4':'debits and credits differ by 1.00',
+        'T5':'non-numeric debit or credit',
+    }
+    assert entries(ledger_engine) == {
+        'T1':[(1,1250,0),(4,0,1250)],
+        'T6':[(5,300,0),(1,0,300)],
+    }
+    with Session(ledger_engine) as session:
+        assert session.get(AccountBalance,1).debit == 1250
+        assert session.get(AccountBalance,1).credit == 300
+
+
+def test_transaction_split_across_chunks_is_one_entry(ledger_engine):
+    report = run_import(ledger_engine,csv(
+        'T1,2026-04-01,1000,10,',
+        'T1,2026-04-01,5000,5,',
+        'T1,2026-04-01,4000,,15',
+        'T2,2026-04-01,1000,1,',
+        'T2,2026-04-01,4000,,1',
+    ),chunksize=2)
+    assert report['entries_rejected'] == 0
+    assert entries(ledger_engine) == {
+        'T1':[(1,1000,0),(5,500,0),(4,0,1500)],
+        'T2':[(1,100,0),(4,0,100)],
+    }
+
+
+def test_entries_posted_between_chunks_do_not_collide(ledger_engine,monkeypatch):
+    import_chunk = journal_import._import_chunk
+
+    def import_then_post(session,*args):
+        import_chunk(session,*args)
+        # what a concurrent post_journal_entry commits while the import runs
+        with Session(ledger_engine) as other:
+            other.add(JournalEntry(date=date(2026,4,1),description='manual',reference_number='M'))
+            other.commit()
+
+    monkeypatch.setattr(journal_import,'_import_chunk',import_then_post)
+    report = run_import(ledger_engine,csv(
+        'T1,2026-04-01,1000,1,',
+        'T1,2026-04-01,4000,,1',
+        'T2,2026-04-01,1000,2,',
+        'T2,2026-04-01,4000,,2',
+        'T3,2026-04-01,1000,3,',
+        'T3,2026-04-01,4000,,3',
+    ),chunksize=2)
+    assert report['entries_imported'] == 3
+    assert sorted(entries(ledger_engine)) == ['T1','T2','T3']
+
+
+def test_header_only_file_imports_nothing(ledger_engine):
+    report = run_import(ledger_engine,csv())
+    assert report == {'entries_imported':0,'lines_imported':0,'entries_rejected':0,'errors':[]}
+
+
+@pytest.mark.parametrize('content,message',[
+    ('','empty'),
+    ('Transaction_ID,Date,Account_ID,Debit\nT1,2026-04-01,1000,1\n','missing columns'),
+])
+def test_malformed_files_raise(ledger_engine,content,message):
+    with pytest.raises(ValueError,match=message):
+        run_import(ledger_engine,io.StringIO(content))
+
+
+@pytest.fixture
+def client(ledger_engine):
+    def session_override():
+        with Session(ledger_engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(imports.router)
+    app.dependency_overrides[get_session] = session_override
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize('content',[b'',b'Transaction_ID,Date\nT1,2026-04-01\n'])
+def test_upload_of_a_malformed_file_is_a_400(client,content):
+    response = client.post('/api/imports/journal',files={'file':('journal.csv',content)})
+    assert response.status_code == 400
+
+
+def test_upload_returns_the_report(client):
+    content = (HEADER + 'T1,2026-04-01,1000,1,\nT1,2026-04-01,4000,,1\n').encode()
+    response = client.post('/api/imports/journal',files={'file':('journal.csv',content)})
+    assert response.status_code == 200
+    assert response.json()['entries_imported'] == 1
@@ -0,0 +1,108 @@
+"""
+Integer cents at the edges (to_cents, to_cents_array, present) and the
+migration of a REAL-valued database from before the switch to cents.
+"""
+from datetime import date
+from decimal import Decimal
+import numpy as np
+import pytest
+from sqlmodel import Session,create_engine,select
+from app import database,migrations
+from app.models.transactions import AccountBalance,AccountMonthlyRollup,TransactionLine
+from app.money import present,to_cents,to_cents_array
+from app.services.posting import verify_account_balances,verify_monthly_rollups
+
+
+@pytest.mark.parametrize('amount,cents',[
+    (0.285,29),(0.284,28),(-0.285,-29),(1.005,101),(0.1 + 0.2,30),
+    (12,1200),('19.995',2000),(Decimal('0.125'),13),(None,0),
+])
+def test_to_cents_rounds_half_up(amount,cents):
+    assert to_cents(amount) == cents
+
+
+def test_to_cents_array_matches_to_cents():
+    amounts = [0.285,0.284,-0.285,1.005,0.1 + 0.2,12.0,19.995,0.0,-0.005,123456789.125]
+    result = to_cents_array(np.array(amounts))
+    assert result.dtype == np.int64
+    assert result.tolist() == [to_cents(amount) for amount in amounts]
+
+
+def test_present_converts_money_fields_only():
+    report = {
+        'net_income':-1234,
+        'accounts':[{'code':'1000','debit':29,'credit':0,'count':3,'is_active':True}],
+        'period':{'start':'2026-01-01'},
+        'balance':1.5,
+    }
+    assert present(report) == {
+        'net_income':-12.34,
+        'accounts':[{'code':'1000','debit':0.29,'credit':0.0,'count':3,'is_active':True}],
+        'period':{'start':'2026-01-01'},
+        'balance':1.5,
+    }
+    # a copy, the cents stay in the original
+    assert report['net_income'] == -1234
+
+
+BASELINE_SCHEMA = (
+    'CREATE TABLE account (id INTEGER NOT NULL,code VARCHAR NOT NULL,name VARCHAR NOT NULL,'
+    'account_type VARCHAR(9) NOT NULL,parent_id INTEGER,is_active BOOLEAN NOT NULL,'
+    'PRIMARY KEY (id),UNIQUE (code))',
+    'CREATE TABLE journalentry (id INTEGER NOT NULL,date DATE NOT NULL,description VARCHAR NOT NULL,'
+    'reference_number VARCHAR,created_at DATETIME NOT NULL,PRIMARY KEY (id))',
+    'CREATE TABLE transactionline (id INTEGER NOT NULL,journal_entry_id INTEGER NOT NULL,'
+    'account_id INTEGER NOT NULL,debit FLOAT NOT NULL,credit FLOAT NOT NULL,memo VARCHAR,'
+    'PRIMARY KEY (id),FOREIGN KEY(journal_entry_id) REFERENCES journalentry (id),'
+    'FOREIGN KEY(account_id) REFERENCES account (id))',
+)
+
+
+def test_baseline_database_is_migrated_to_cents(tmp_path,monkeypatch):
+    engine = create_engine(f'sqlite:///{tmp_path / "baseline.db"}')
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(
+            "INSERT INTO account VALUES (1,'1000','Cash','ASSET',NULL,1),(2,'4000','Sales','REVENUE',NULL,1)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO journalentry VALUES (1,'2026-03-31','a',NULL,'2026-03-31'),"
+            "(2,'2026-04-01','b',NULL,'2026-04-01'),(3,'2026-04-20','c',NULL,'2026-04-20')"
+        )
+        conn.exec_driver_sql(
+            'INSERT INTO transactionline (id,journal_entry_id,account_id,debit,credit) VALUES '
+            '(1,1,1,0.285,0),(2,1,2,0,0.285),(3,2,1,0.1,0),(4,2,2,0,0.1),(5,3,1,0.2,0),(6,3,2,0,0.2)'
+        )
+
+    monkeypatch.setattr(database,'engine',engine)
+    steps = database.create_db_and_tables()
+    assert steps[:3] == [
+        'converted transactionline amounts to cents',
+        'rebuilt 2 account balance rows',
+        'rebuilt 4 monthly rollup rows',
+    ]
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA user_version').scalar() == migrations.SCHEMA_VERSION
+        for model in migrations.MONEY_TABLES:
+            assert migrations._column_type(conn,model.__tablename__,'debit') == 'INTEGER'
+
+    with Session(engine) as session:
+        lines = session.exec(select(TransactionLine.debit,TransactionLine.credit).order_by(TransactionLine.id)).all()
+        assert lines == [(29,0),(0,29),(10,0),(0,10),(20,0),(0,20)]
+        assert session.get(AccountBalance,1).debit == 59
+        assert session.get(AccountBalance,2).credit == 59
+        rollups = session.exec(
+            select(AccountMonthlyRollup.account_id,AccountMonthlyRollup.month,
+                   AccountMonthlyRollup.debit,AccountMonthlyRollup.credit)
+            .order_by(AccountMonthlyRollup.account_id,AccountMonthlyRollup.month)
+        ).all()
+        assert rollups == [
+            (1,date(2026,3,1),29,0),(1,date(2026,4,1),30,0),
+            (2,date(2026,3,1),0,29),(2,date(2026,4,1),0,30),
+        ]
+        assert verify_account_balances(session) == []
+        assert verify_monthly_rollups(session) == []
+    # a second start finds nothing left to migrate
+    assert migrations.migrate(engine) == []
+    engine.dispose()
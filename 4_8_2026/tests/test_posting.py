@@ -0,0 +1,61 @@
+"""
+post_journal_entry keeps AccountBalance and AccountMonthlyRollup in step with
+the lines it writes, and refuses entries that do not balance.
+"""
+from datetime import date
+import pytest
+from sqlmodel import Session,select
+from app.models.transactions import AccountBalance,AccountMonthlyRollup,AccountType,JournalEntry,TransactionLine
+from app.services.posting import post_journal_entry,verify_account_balances,verify_monthly_rollups
+
+
+def post(session,day,*lines):
+    post_journal_entry(
+        session,
+        JournalEntry(date=day,description=day.isoformat()),
+        [TransactionLine(account_id=account_id,debit=debit,credit=credit) for account_id,debit,credit in lines]
+    )
+
+
+def test_postings_accumulate_per_account_and_month(ledger_engine):
+    with Session(ledger_engine) as session:
+        post(session,date(2026,3,5),(1,1000,0),(4,0,1000))
+        post(session,date(2026,3,31),(1,250,0),(4,0,250))
+        # the same account on both sides of one entry, and a second month
+        post(session,date(2026,4,1),(5,40,0),(1,0,40),(1,15,0),(4,0,15))
+        session.commit()
+
+    with Session(ledger_engine) as session:
+        balances = {
+            row.account_id:(row.debit,row.credit)
+            for row in session.exec(select(AccountBalance)).all()
+        }
+        rollups = {
+            (row.account_id,row.month):(row.account_type,row.debit,row.credit)
+            for row in session.exec(select(AccountMonthlyRollup)).all()
+        }
+        assert balances == {1:(1265,40),4:(0,1265),5:(40,0)}
+        assert rollups == {
+            (1,date(2026,3,1)):(AccountType.ASSET,1250,0),
+            (4,date(2026,3,1)):(AccountType.REVENUE,0,1250),
+            (1,date(2026,4,1)):(AccountType.ASSET,15,40),
+            (4,date(2026,4,1)):(AccountType.REVENUE,0,15),
+            (5,date(2026,4,1)):(AccountType.EXPENSE,40,0),
+        }
+        assert verify_account_balances(session) == []
+        assert verify_monthly_rollups(session) == []
+
+
+@pytest.mark.parametrize('lines,message',[
+    ([],'not balanced'),
+    ([(1,100,0),(4,0,99)],'not balanced'),
+    ([(1,1.5,0),(4,0,1.5)],'integer cents'),
+])
+def test_rejected_entries_leave_no_trace(ledger_engine,lines,message):
+    with Session(ledger_engine) as session:
+        with pytest.raises(ValueError,match=message):
+            post(session,date(2026,3,5),*lines)
+        session.commit()
+        assert session.exec(select(JournalEntry)).all() == []
+        assert session.exec(select(AccountBalance)).all() == []
+        assert session.exec(select(AccountMonthlyRollup)).all() == []
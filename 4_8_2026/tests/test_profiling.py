@@ -0,0 +1,55 @@
+"""
+Per-request SQL profiling: response headers, per-route aggregates and the
+N+1 flag. The 4_9_2026 copy of app/profiling.py is checked against this one
+by its own tests.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.profiling import SQLProfiler,SQLProfilerMiddleware
+
+
+@pytest.fixture
+def profiled(ledger_engine):
+    profiler = SQLProfiler(enabled=True,repeat_threshold=3)
+    profiler.instrument(ledger_engine)
+    app = FastAPI()
+    app.add_middleware(SQLProfilerMiddleware,profiler=profiler)
+
+    @app.get('/accounts/{n}')
+    def accounts(n:int):
+        with ledger_engine.connect() as conn:
+            return [conn.execute(text('SELECT code FROM account WHERE id = :id'),{'id':i}).scalar() for i in range(1,n + 1)]
+
+    with TestClient(app) as client:
+        yield client,profiler
+
+
+def test_headers_count_the_request_statements(profiled):
+    client,_ = profiled
+    response = client.get('/accounts/2')
+    assert response.json() == ['1000','2000']
+    assert response.headers['x-sql-statements'] == '2'
+    assert response.headers['x-sql-repeated-statements'] == '0'
+    assert float(response.headers['x-sql-time-ms']) >= 0
+
+
+def test_repeated_statements_are_flagged_per_route(profiled):
+    client,profiler = profiled
+    client.get('/accounts/1')
+    response = client.get('/accounts/4')
+    assert response.headers['x-sql-repeated-statements'] == '1'
+    snapshot = profiler.snapshot()
+    route = snapshot['routes']['/accounts/{n}']
+    assert route['requests'] == 2 and route['max_statements'] == 4
+    assert route['n_plus_one_requests'] == 1
+    assert snapshot['n_plus_one'][0]['max_repeats'] == 4
+
+
+def test_disabled_profiler_leaves_responses_alone(ledger_engine):
+    app = FastAPI()
+    app.add_middleware(SQLProfilerMiddleware,profiler=SQLProfiler(enabled=False))
+    app.get('/ping')(lambda: 'pong')
+    with TestClient(app) as client:
+        assert 'x-sql-statements' not in client.get('/ping').headers
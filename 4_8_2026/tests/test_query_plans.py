@@ -0,0 +1,136 @@
+"""
+EXPLAIN QUERY PLAN regression suite for AccountingAnalytics.
+
+Every report runs against a small ledger while its SELECTs are captured, and
+each one is re-planned with EXPLAIN QUERY PLAN. A plan that scans one of the
+ledger tables without an index fails the test.
+"""
+import re
+from datetime import date
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel,Session,create_engine
+from app.models.transactions import Account,AccountType,JournalEntry,TransactionLine
+from app.services.analytics import AccountingAnalytics
+from app.services.general_ledger import iter_general_ledger
+from app.services.posting import post_journal_entry
+from app.services.hierarchy import create_account
+from app.services.ingestion import IngestionQueue,WebhookTransaction
+
+LEDGER_TABLES = ('transactionline','journalentry','accountbalance','accountmonthlyrollup','accountclosure')
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+REPORTS = {
+    'trial_balance':lambda a: a.get_trial_balance(),
+    'trial_balance_rollup':lambda a: a.get_trial_balance(rollup=True),
+    'subtree_balance':lambda a: a.get_rollup_trial_balance(1),
+    'account_balance':lambda a: a.get_account_balance(1),
+    'balance_sheet':lambda a: a.get_balance_sheet(),
+    'income_statement_full_months':lambda a: a.get_income_statement(date(2026,1,1),date(2026,3,31)),
+    'income_statement_partial_months':lambda a: a.get_income_statement(date(2026,1,15),date(2026,3,10)),
+    'income_statement_inside_month':lambda a: a.get_income_statement(date(2026,2,3),date(2026,2,20)),
+    'income_statement_series_day':lambda a: a.get_income_statement_series(date(2026,1,1),date(2026,3,31),'day'),
+    'income_statement_series_week':lambda a: a.get_income_statement_series(date(2026,1,1),date(2026,3,31),'week'),
+    'income_statement_series_month':lambda a: a.get_income_statement_series(date(2026,1,15),date(2026,3,10),'month'),
+    'income_statement_series_quarter':lambda a: a.get_income_statement_series(date(2026,1,1),date(2026,3,31),'quarter'),
+    'general_ledger_mid_month':lambda a: list(iter_general_ledger(a.session,date(2026,2,15),date(2026,3,31))),
+    'general_ledger_account':lambda a: list(iter_general_ledger(a.session,date(2026,2,15),account_code='1000')),
+    'general_ledger_few_days':lambda a: list(iter_general_ledger(a.session,date(2026,2,9),date(2026,2,11))),
+}
+
+
+@pytest.fixture(scope='module')
+def engine():
+    engine = create_engine('sqlite://')
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for code,account_type in [('1000',AccountType.ASSET),('2000',AccountType.LIABILITY),
+                                  ('3000',AccountType.EQUITY),('4000',AccountType.REVENUE),
+                                  ('5000',AccountType.EXPENSE)]:
+            create_account(session,Account(code=code,name=code,account_type=account_type))
+        session.commit()
+        for month in (1,2,3):
+            post_journal_entry(
+                session,
+                JournalEntry(date=date(2026,month,10),description='sale'),
+                [TransactionLine(account_id=1,debit=100),TransactionLine(account_id=4,credit=100)]
+            )
+        session.commit()
+    return engine
+
+
+def full_scans(engine,statement,parameters) -> list[str]:
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}',parameters).all()
+    scans = []
+    for row in plan:
+        match = FULL_SCAN.match(row[-1])
+        if match and match.group(1) in LEDGER_TABLES:
+            scans.append(row[-1])
+    return scans
+
+
+@pytest.mark.parametrize('report',sorted(REPORTS))
+def test_report_queries_use_indexes(engine,report):
+    captured = []
+
+    def capture(conn,cursor,statement,parameters,context,executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement,parameters))
+
+    event.listen(engine,'before_cursor_execute',capture)
+    try:
+        with Session(engine) as session:
+            REPORTS[report](AccountingAnalytics(session))
+    finally:
+        event.remove(engine,'before_cursor_execute',capture)
+
+    assert captured
+    for statement,parameters in captured:
+        scans = full_scans(engine,statement,parameters)
+        assert not scans,f'{report} falls back to a full scan {scans}:\n{statement}'
+
+
+def test_general_ledger_date_range_can_use_the_date_index(engine):
+    # a bare comparison on the column, date(JournalEntry.date) would hide it
+    captured = []
+
+    def capture(conn,cursor,statement,parameters,context,executemany):
+        if 'ORDER BY transactionline.account_id' in statement:
+            captured.append((statement,parameters))
+
+    event.listen(engine,'before_cursor_execute',capture)
+    try:
+        with Session(engine) as session:
+            list(iter_general_ledger(session,date(2026,2,9),date(2026,2,11)))
+    finally:
+        event.remove(engine,'before_cursor_execute',capture)
+
+    (statement,parameters), = captured
+    with engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}',parameters)]
+    assert any('ix_journalentry_date' in step for step in plan),plan
+
+
+def test_ingestion_key_lookup_uses_its_index(ledger_engine):
+    captured = []
+
+    def capture(conn,cursor,statement,parameters,context,executemany):
+        if 'idempotency_key IN' in statement:
+            captured.append((statement,parameters))
+
+    batch = [
+        WebhookTransaction(idempotency_key=key,date=date(2026,4,1),description=key,lines=[
+            {'account_code':'1000','debit':1.0},{'account_code':'4000','credit':1.0},
+        ])
+        for key in 'ab'
+    ]
+    event.listen(ledger_engine,'before_cursor_execute',capture)
+    try:
+        IngestionQueue(engine=ledger_engine)._flush(batch)
+    finally:
+        event.remove(ledger_engine,'before_cursor_execute',capture)
+
+    assert captured
+    for statement,parameters in captured:
+        assert not full_scans(ledger_engine,statement,parameters),statement
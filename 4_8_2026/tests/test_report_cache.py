@@ -0,0 +1,124 @@
+"""
+The report cache is invalidated by committed writes to the ledger and to
+the chart of accounts, from this process or another one, not by reads or
+rolled back writes.
+"""
+from datetime import date
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from sqlmodel import SQLModel,Session,create_engine
+from app.models.transactions import Account,AccountBalance,AccountType,JournalEntry,TransactionLine
+from app.services.analytics import AccountingAnalytics
+from app.services.hierarchy import create_account,reparent_account
+from app.services.posting import post_journal_entry,rebuild_account_balances
+from app.services.report_cache import data_version,report_cache
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    report_cache.clear()
+    yield
+    report_cache.clear()
+
+
+def cached_rollup(engine) -> dict:
+    with Session(engine) as session:
+        analytics = AccountingAnalytics(session)
+        rows = report_cache.get_or_compute(
+            session,'trial-balance',{'rollup':True},lambda: analytics.get_trial_balance(True)
+        )
+    return {row['code']:row['debit_balance'] for row in rows}
+
+
+@pytest.fixture
+def child_account(ledger_engine):
+    """1100 under 1000 with 25.00 posted to it"""
+    with Session(ledger_engine) as session:
+        child = create_account(session,Account(code='1100',name='1100',account_type=AccountType.ASSET,parent_id=1))
+        post_journal_entry(session,JournalEntry(date=date(2026,4,1),description='sale'),[
+            TransactionLine(account_id=child.id,debit=2500,credit=0),
+            TransactionLine(account_id=4,debit=0,credit=2500),
+        ])
+        session.commit()
+        return child.id
+
+
+def test_reparent_invalidates_the_cached_rollup(ledger_engine,child_account):
+    assert cached_rollup(ledger_engine)['1000'] == 2500
+    with Session(ledger_engine) as session:
+        reparent_account(session,child_account,2)
+        session.commit()
+    rollup = cached_rollup(ledger_engine)
+    assert rollup['1000'] == 0
+    assert rollup['2000'] == 2500
+
+
+def test_new_account_invalidates_the_cached_rollup(ledger_engine,child_account):
+    assert '1200' not in cached_rollup(ledger_engine)
+    with Session(ledger_engine) as session:
+        create_account(session,Account(code='1200',name='1200',account_type=AccountType.ASSET,parent_id=1))
+        session.commit()
+    assert '1200' in cached_rollup(ledger_engine)
+
+
+def ledger_version(engine) -> int:
+    with Session(engine) as session:
+        return data_version(session,'ledger')
+
+
+def test_reads_and_rollbacks_keep_the_cache(ledger_engine,child_account):
+    cached_rollup(ledger_engine)
+    version,hits = ledger_version(ledger_engine),report_cache.hits
+    with Session(ledger_engine) as session:
+        reparent_account(session,child_account,2)
+        session.rollback()
+    with Session(ledger_engine) as session:
+        session.get(Account,1)
+        session.commit()
+    assert ledger_version(ledger_engine) == version
+    assert cached_rollup(ledger_engine)['1000'] == 2500
+    assert report_cache.hits == hits + 1
+
+
+def test_balance_rebuild_invalidates_the_cache(ledger_engine,child_account):
+    assert cached_rollup(ledger_engine)['1000'] == 2500
+    with Session(ledger_engine) as session:
+        session.get(AccountBalance,child_account).debit = 0
+        session.commit()
+    assert cached_rollup(ledger_engine)['1000'] == 0
+    with Session(ledger_engine) as session:
+        rebuild_account_balances(session)
+        session.commit()
+    assert cached_rollup(ledger_engine)['1000'] == 2500
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    """A database file shared with a second process, with the conftest chart"""
+    path = tmp_path / 'ledger.db'
+    engine = create_engine(f'sqlite:///{path}')
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for code,account_type in [('1000',AccountType.ASSET),('4000',AccountType.REVENUE)]:
+            create_account(session,Account(code=code,name=code,account_type=account_type))
+        session.commit()
+    yield path,engine
+    engine.dispose()
+
+
+def test_import_from_another_process_invalidates_the_cache(db_file):
+    path,engine = db_file
+    assert cached_rollup(engine)['1000'] == 0
+    journal = path.parent / 'journal.csv'
+    journal.write_text('Transaction_ID,Date,Account_ID,Debit,Credit\nT1,2026-04-01,1000,0.29,\nT1,2026-04-01,4000,,0.29\n')
+    result = subprocess.run(
+        [sys.executable,'-m','app.cli','import-journal',str(journal)],cwd=APP_DIR,capture_output=True,text=True,
+        env={**os.environ,'ACCOUNTING_DB_PATH':str(path)},
+    )
+    assert result.returncode == 0,result.stderr[-2000:]
+    assert cached_rollup(engine)['1000'] == 29
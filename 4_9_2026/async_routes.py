@@ -0,0 +1,55 @@
+"""
+Async versions of the transaction and dashboard routes (DB_STACK=async)
+
+Same paths, parameters and responses as the sync routes in main.py, but
+the handlers run on the event loop with an AsyncSession on aiosqlite
+instead of taking a threadpool worker each, so concurrent requests are
+not capped by the threadpool size. main.py registers this router ahead of
+its own routes when DB_STACK=async.
+"""
+from datetime import date
+from typing import Literal
+from fastapi import APIRouter,Depends,Query,HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_async_session
+from models import Transaction
+from counters import apply_transactions_async,category_totals_async,dashboard_summary
+from pagination import PAGE_SIZE,MAX_PAGE_SIZE,transactions_page_async,parse_fields
+
+router = APIRouter()
+
+
+@router.post('/transactions')
+async def create_transaction(transaction:Transaction,session:AsyncSession = Depends(get_async_session)):
+    session.add(transaction)
+    # counted in the same transaction as the insert
+    await apply_transactions_async(session,[transaction])
+    await session.commit()
+    await session.refresh(transaction)
+    return transaction
+
+
+@router.get('/transactions')
+async def get_all_transaction(
+    limit:int = Query(PAGE_SIZE,ge=1,le=MAX_PAGE_SIZE),
+    cursor:str = Query(None,description='next_cursor of the previous page'),
+    fields:str = Query(None,description='comma separated columns, e.g. id,amount,category'),
+    category:str = Query(None),
+    start_date:date = Query(None),
+    end_date:date = Query(None),
+    order:Literal['asc','desc'] = Query('asc'),
+    session:AsyncSession = Depends(get_async_session)
+    ):
+    """Transactions by (created_at, id), one page at a time"""
+    try:
+        return await transactions_page_async(
+            session,limit=limit,cursor=cursor,fields=parse_fields(fields),category=category,
+            start_date=start_date,end_date=end_date,descending=order == 'desc',
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422,detail=str(exc))
+
+
+@router.get('/dashboard')
+async def dashboard(session:AsyncSession = Depends(get_async_session)):
+    return dashboard_summary(await category_totals_async(session))
@@ -0,0 +1,64 @@
+"""
+Bulk transaction inserts for POST /transactions/batch
+
+Items are validated a chunk at a time with one TypeAdapter call, then each
+chunk is written with a single executemany INSERT ... RETURNING id and one
+counters upsert. The caller keeps every chunk in one transaction.
+"""
+import json
+import os
+from datetime import datetime
+from pydantic import TypeAdapter,ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session
+from models import Transaction,TransactionCreate
+from counters import apply_transactions
+
+BATCH_CHUNK = int(os.getenv('TRANSACTION_BATCH_CHUNK','1000'))
+MAX_BATCH_ITEMS = int(os.getenv('TRANSACTION_BATCH_MAX_ITEMS','100000'))
+MAX_REPORTED_ERRORS = 1000
+
+_items = TypeAdapter(list[TransactionCreate])
+
+
+def validate_chunk(chunk:list) -> tuple[list[TransactionCreate],list[int],dict]:
+    """
+    Validate raw items (dicts, or the JSONDecodeError of an NDJSON line that
+    did not parse). Returns the valid models, their positions in chunk and
+    {position: errors} for the rest
+    """
+    errors = {
+        i:[{'loc':[],'msg':f'invalid JSON: {item.msg}'}]
+        for i,item in enumerate(chunk) if isinstance(item,json.JSONDecodeError)
+    }
+    positions = [i for i in range(len(chunk)) if i not in errors]
+    try:
+        return _items.validate_python([chunk[i] for i in positions]),positions,errors
+    except ValidationError as exc:
+        for error in exc.errors(include_url=False,include_input=False):
+            index,*loc = error['loc']
+            errors.setdefault(positions[index],[]).append({'loc':loc,'msg':error['msg']})
+    positions = [i for i in positions if i not in errors]
+    # the second pass only sees items that already validated
+    return _items.validate_python([chunk[i] for i in positions]),positions,errors
+
+
+def insert_chunk(session:Session,items:list[TransactionCreate]) -> list[int]:
+    """Insert validated items and count them, returns the new ids in order"""
+    if not items:
+        return []
+    now = datetime.utcnow()
+    ids = session.execute(
+        insert(Transaction).returning(Transaction.id,sort_by_parameter_order=True),
+        [
+            {
+                'description':item.description,
+                'amount':item.amount,
+                'category':item.category,
+                'created_at':item.created_at or now,
+            }
+            for item in items
+        ]
+    ).scalars().all()
+    apply_transactions(session,items)
+    return ids
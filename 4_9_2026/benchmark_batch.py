@@ -0,0 +1,81 @@
+"""
+POST /transactions one row at a time vs POST /transactions/batch
+
+Runs against a fresh accounting.db in a temp directory and prints rows/second
+for each path. The single-row path pays an HTTP round trip, a commit and a
+refresh per row, the batch path one request and one commit.
+
+    python benchmark_batch.py
+    python benchmark_batch.py --rows 20000 --single-rows 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+
+def payload(n:int,seed:int) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            'description':f'statement line {i}',
+            'amount':round(rng.uniform(1,500),2),
+            'category':rng.choice(['Income','Expense']),
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows',type=int,default=10_000,help='rows sent through the batch endpoint')
+    parser.add_argument('--single-rows',type=int,default=500,help='rows sent one request at a time')
+    parser.add_argument('--seed',type=int,default=42)
+    args = parser.parse_args()
+
+    # database.py opens ./accounting.db, so run from an empty directory
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0,here)
+    tmp = tempfile.TemporaryDirectory()
+    os.chdir(tmp.name)
+
+    from fastapi.testclient import TestClient
+    from database import engine
+    from main import app
+    engine.echo = False
+
+    rows = payload(args.rows,args.seed)
+    print(f"{'path':>14} {'rows':>8} {'seconds':>9} {'rows/s':>10}")
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        for row in rows[:args.single_rows]:
+            client.post('/transactions',json=row).raise_for_status()
+        elapsed = time.perf_counter() - start
+        print(f"{'single':>14} {args.single_rows:>8} {elapsed:>9.3f} {args.single_rows / elapsed:>10.0f}")
+
+        start = time.perf_counter()
+        response = client.post('/transactions/batch',json=rows)
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        assert response.json()['inserted'] == args.rows
+        print(f"{'batch json':>14} {args.rows:>8} {elapsed:>9.3f} {args.rows / elapsed:>10.0f}")
+
+        body = '\n'.join(json.dumps(row) for row in rows)
+        start = time.perf_counter()
+        response = client.post(
+            '/transactions/batch',content=body,headers={'content-type':'application/x-ndjson'}
+        )
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        assert response.json()['inserted'] == args.rows
+        print(f"{'batch ndjson':>14} {args.rows:>8} {elapsed:>9.3f} {args.rows / elapsed:>10.0f}")
+    engine.dispose()
+    os.chdir(here)
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Sync vs async database stack under concurrent load
+
+Runs the app once per DB_STACK (each in its own process, the stack is read
+at import time) against a seeded accounting.db in a temp directory, drives
+/dashboard, a GET /transactions page and POST /transactions with 10, 100
+and 1000 concurrent clients through an in-process ASGI client, and prints
+requests/second side by side.
+
+Writes go through SQLite's single writer lock and a commit each whichever
+stack serves them, so create-transaction gets its own (smaller) request
+budget and mostly shows how the two stacks queue for that lock.
+
+    python benchmark_stacks.py
+    python benchmark_stacks.py --rows 100000 --requests 5000 --concurrency 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+STACKS = ('sync','async')
+
+
+def endpoints() -> dict:
+    rng = random.Random(7)
+    return {
+        'dashboard':('GET','/dashboard',lambda: {},False),
+        'transactions-page':('GET','/transactions',lambda: {'params':{'limit':50,'order':'desc'}},False),
+        'create-transaction':('POST','/transactions',lambda: {'json':{
+            'description':'bench','amount':round(rng.uniform(1,500),2),
+            'category':rng.choice(['Income','Expense']),
+        }},True),
+    }
+
+
+def percentile(sorted_values:list,pct:float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1,int(len(sorted_values) * pct / 100))]
+
+
+async def drive(client,method:str,path:str,kwargs,n_requests:int,concurrency:int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = n_requests
+
+    async def worker():
+        # one client keeps one request in flight at a time
+        nonlocal errors,remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(method,path,**kwargs())
+                if response.status_code != 200:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests':n_requests,
+        'errors':errors,
+        'rps':round(n_requests / elapsed,1),
+        'p50_ms':round(percentile(latencies,50) * 1000,2),
+        'p99_ms':round(percentile(latencies,99) * 1000,2),
+    }
+
+
+async def run_stack(args) -> dict:
+    import httpx
+    from database import engine,async_engine
+    from main import app
+
+    engine.echo = False
+    if async_engine is not None:
+        async_engine.echo = False
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport,base_url='http://bench',timeout=None) as client:
+        for name,(method,path,kwargs,writes) in endpoints().items():
+            await client.request(method,path,**kwargs())  # warm up the pool
+            for concurrency in args.concurrency:
+                n_requests = max(args.write_requests if writes else args.requests,concurrency)
+                results[f'{name}@{concurrency}'] = await drive(client,method,path,kwargs,n_requests,concurrency)
+    if async_engine is not None:
+        await async_engine.dispose()
+    return results
+
+
+def child(args) -> None:
+    """Seed a database in a temp directory and benchmark the DB_STACK of this process"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0,here)
+    tmp = tempfile.TemporaryDirectory()
+    os.chdir(tmp.name)
+
+    from sqlmodel import Session
+    from database import engine,create_db_and_tables
+    from batch import insert_chunk
+    from models import TransactionCreate
+
+    engine.echo = False
+    create_db_and_tables()
+    rng = random.Random(args.seed)
+    with Session(engine) as session:
+        for offset in range(0,args.rows,10_000):
+            insert_chunk(session,[
+                TransactionCreate(
+                    description=f'seed {i}',amount=round(rng.uniform(1,500),2),
+                    category=rng.choice(['Income','Expense','Transfer']),
+                )
+                for i in range(offset,min(offset + 10_000,args.rows))
+            ])
+        session.commit()
+
+    results = asyncio.run(run_stack(args))
+    engine.dispose()
+    os.chdir(here)
+    tmp.cleanup()
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows',type=int,default=50_000,help='transactions seeded before the run')
+    parser.add_argument('--requests',type=int,default=2000,help='requests per endpoint per concurrency level')
+    parser.add_argument('--write-requests',type=int,default=200,help='the same for create-transaction')
+    parser.add_argument('--concurrency',type=int,nargs='+',default=[10,100,1000])
+    parser.add_argument('--seed',type=int,default=42)
+    parser.add_argument('--output',help='also write the raw results as JSON here')
+    parser.add_argument('--child',action='store_true',help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    results = {}
+    for stack in STACKS:
+        print(f'running DB_STACK={stack}',file=sys.stderr)
+        out = subprocess.run(
+            [sys.executable,os.path.abspath(__file__),'--child'] + sys.argv[1:],
+            env={**os.environ,'DB_STACK':stack},capture_output=True,text=True,check=True,
+        )
+        results[stack] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print(
+        f"{'endpoint':>20} {'clients':>8} {'sync rps':>10} {'async rps':>10} "
+        f"{'sync p99':>10} {'async p99':>10} {'sync err':>9} {'async err':>9}"
+    )
+    for key in results['sync']:
+        name,concurrency = key.split('@')
+        s,a = results['sync'][key],results['async'][key]
+        print(
+            f"{name:>20} {concurrency:>8} {s['rps']:>10} {a['rps']:>10} "
+            f"{s['p99_ms']:>8}ms {a['p99_ms']:>8}ms {s['errors']:>9} {a['errors']:>9}"
+        )
+    if args.output:
+        with open(args.output,'w') as f:
+            json.dump(results,f,indent=2)
+
+
+if __name__ == '__main__':
+    main()
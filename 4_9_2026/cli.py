@@ -0,0 +1,67 @@
+"""
+Maintenance commands for the 4_9_2026 database
+
+    python cli.py counters verify
+    python cli.py counters rebuild
+    python cli.py enrollments verify
+    python cli.py enrollments rebuild
+"""
+import argparse
+import sys
+from sqlmodel import Session
+from database import engine,create_db_and_tables
+from counters import rebuild_counters,verify_counters
+from enrollment import rebuild_enrollment_counts,verify_enrollment_counts
+
+
+def counters(args) -> int:
+    with Session(engine) as session:
+        if args.action == 'rebuild':
+            count = rebuild_counters(session)
+            session.commit()
+            print(f'rebuilt {count} dashboard counter rows')
+            return 0
+        drift = verify_counters(session)
+        for row in drift:
+            print(
+                f"{row['category']}: amount {row['stored_amount']} (expected {row['expected_amount']}), "
+                f"count {row['stored_count']} (expected {row['expected_count']})"
+            )
+        print(f'{len(drift)} dashboard counter row(s) drifted')
+        return 1 if drift else 0
+
+
+def enrollments(args) -> int:
+    with Session(engine) as session:
+        if args.action == 'rebuild':
+            count = rebuild_enrollment_counts(session)
+            session.commit()
+            print(f'rebuilt {count} course enrollment count rows')
+            return 0
+        drift = verify_enrollment_counts(session)
+        for row in drift:
+            print(f"course {row['course_id']} {row['school_year']}: {row['stored']} (expected {row['expected']})")
+        print(f'{len(drift)} course enrollment count row(s) drifted')
+        return 1 if drift else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python cli.py')
+    commands = parser.add_subparsers(dest='command',required=True)
+
+    counters_cmd = commands.add_parser('counters',help='running /dashboard totals')
+    counters_cmd.add_argument('action',choices=['verify','rebuild'])
+    counters_cmd.set_defaults(func=counters)
+
+    enrollments_cmd = commands.add_parser('enrollments',help='per course, per school year enrollment counts')
+    enrollments_cmd.add_argument('action',choices=['verify','rebuild'])
+    enrollments_cmd.set_defaults(func=enrollments)
+
+    args = parser.parse_args(argv)
+    engine.echo = False
+    create_db_and_tables()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Running dashboard totals
+
+DashboardCounter keeps one row per transaction category (sum of amount and
+row count). create_transaction folds every new row in with an upsert in the
+same transaction, so /dashboard reads a handful of rows instead of the
+whole history. The grouped aggregate over Transaction is the fallback
+and the source of truth for rebuild/verify.
+
+The *_async functions are the same statements on an AsyncSession, for
+the DB_STACK=async routes.
+"""
+from sqlalchemy import delete,insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session,select,func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Transaction,DashboardCounter
+
+
+def _counter_upsert(transactions:list[Transaction]):
+    """The upsert and its parameter rows, None when there is nothing to count"""
+    totals = {}
+    for t in transactions:
+        amount,count = totals.get(t.category,(0.0,0))
+        totals[t.category] = (amount + t.amount,count + 1)
+    if not totals:
+        return None
+    stmt = sqlite_insert(DashboardCounter)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DashboardCounter.category],
+        set_={
+            'total_amount':DashboardCounter.total_amount + stmt.excluded.total_amount,
+            'transaction_count':DashboardCounter.transaction_count + stmt.excluded.transaction_count,
+        }
+    )
+    return stmt,[
+        {'category':category,'total_amount':amount,'transaction_count':count}
+        for category,(amount,count) in totals.items()
+    ]
+
+
+def apply_transactions(session:Session,transactions:list[Transaction]) -> None:
+    """Add new transactions to the counters, the caller owns the commit"""
+    upsert = _counter_upsert(transactions)
+    if upsert is not None:
+        session.execute(*upsert)
+
+
+async def apply_transactions_async(session:AsyncSession,transactions:list[Transaction]) -> None:
+    upsert = _counter_upsert(transactions)
+    if upsert is not None:
+        stmt,rows = upsert
+        await session.exec(stmt,params=rows)
+
+
+def _category_totals():
+    return (
+        select(Transaction.category,func.sum(Transaction.amount),func.count())
+        .group_by(Transaction.category)
+    )
+
+
+def _counter_rows():
+    return select(DashboardCounter.category,DashboardCounter.total_amount,DashboardCounter.transaction_count)
+
+
+def category_totals(session:Session) -> dict:
+    """category -> (total amount, count), from the counters when they are populated"""
+    rows = session.exec(_counter_rows()).all()
+    if not rows:
+        # nothing counted yet, either an empty table or counters never built
+        rows = session.exec(_category_totals()).all()
+    return {category:(amount or 0.0,count) for category,amount,count in rows}
+
+
+async def category_totals_async(session:AsyncSession) -> dict:
+    rows = (await session.exec(_counter_rows())).all()
+    if not rows:
+        rows = (await session.exec(_category_totals())).all()
+    return {category:(amount or 0.0,count) for category,amount,count in rows}
+
+
+def dashboard_summary(totals:dict) -> dict:
+    """The /dashboard body from category_totals()"""
+    total_income = totals.get('Income',(0,0))[0]
+    total_expense = totals.get('Expense',(0,0))[0]
+    return {
+        "total_income":total_income,
+        "total_expense":total_expense,
+        "balance":total_income - total_expense,
+        "transaction_count":sum(count for _,count in totals.values())
+    }
+
+
+def rebuild_counters(session:Session) -> int:
+    """Recompute DashboardCounter from Transaction, returns row count"""
+    session.execute(delete(DashboardCounter))
+    session.execute(
+        insert(DashboardCounter).from_select(
+            ['category','total_amount','transaction_count'],_category_totals()
+        )
+    )
+    return session.exec(select(func.count()).select_from(DashboardCounter)).one()
+
+
+def verify_counters(session:Session,tolerance:float = 0.005) -> list[dict]:
+    """Categories whose counter differs from the grouped aggregate, empty when in sync"""
+    expected = {category:(amount,count) for category,amount,count in session.exec(_category_totals()).all()}
+    stored = {
+        row.category:(row.total_amount,row.transaction_count)
+        for row in session.exec(select(DashboardCounter)).all()
+    }
+    drift = []
+    for category in sorted(expected.keys() | stored.keys()):
+        exp_amount,exp_count = expected.get(category,(0.0,0))
+        got_amount,got_count = stored.get(category,(0.0,0))
+        if abs(exp_amount - got_amount) > tolerance or exp_count != got_count:
+            drift.append({
+                'category':category,
+                'expected_amount':exp_amount,'expected_count':exp_count,
+                'stored_amount':got_amount,'stored_count':got_count,
+            })
+    return drift
@@ -1,15 +1,50 @@
-from sqlmodel import create_engine,Session,SQLModel
+import os
+from sqlmodel import create_engine,Session,SQLModel,select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from profiling import sql_profiler
+from models import CourseEnrollmentCount,DashboardCounter,Enrollment,Transaction
+from counters import rebuild_counters
+from enrollment import rebuild_enrollment_counts
 
 sqlite_file_name = 'accounting.db'
 sqlite_url = f"sqlite:///{sqlite_file_name}"
 
+# sync: def routes on the threadpool, async: async def routes on aiosqlite
+DB_STACK = os.getenv('DB_STACK','sync')
+if DB_STACK not in ('sync','async'):
+    raise ValueError(f"DB_STACK must be 'sync' or 'async', got {DB_STACK!r}")
+
 engine = create_engine(sqlite_url,echo=True)
+sql_profiler.instrument(engine)
+
+# startup and the CLI stay on the sync engine, only the routes switch
+async_engine = None
+if DB_STACK == 'async':
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{sqlite_file_name}",echo=True)
+    sql_profiler.instrument(async_engine.sync_engine)
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    # create_all only indexes tables it creates, add new indexes to existing ones
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine,checkfirst=True)
+    # databases from before the counters tables get them built once
+    with Session(engine) as session:
+        if session.exec(select(DashboardCounter)).first() is None and session.exec(select(Transaction)).first() is not None:
+            rebuild_counters(session)
+            session.commit()
+        if session.exec(select(CourseEnrollmentCount)).first() is None and session.exec(select(Enrollment)).first() is not None:
+            rebuild_enrollment_counts(session)
+            session.commit()
 
 def get_session():
     with Session(engine) as session:
         yield session
 
-        
\ No newline at end of file
+        
+
+async def get_async_session():
+    async with AsyncSession(async_engine,expire_on_commit=False) as session:
+        yield session
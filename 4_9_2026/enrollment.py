@@ -0,0 +1,201 @@
+"""
+Bulk students and enrollments, course rosters
+
+Enrollments go in with INSERT ... ON CONFLICT DO NOTHING RETURNING, so the
+unique (student_id, course_id, school_year) index decides what is a
+duplicate and nothing is read before the write. CourseEnrollmentCount is
+bumped in the same transaction and new rows past Course.capacity are
+taken back out. The caller owns the commit. The grouped count over
+Enrollment is the source of truth for rebuild/verify (python cli.py
+enrollments verify|rebuild).
+"""
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import and_,delete,insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session,select,func
+from models import Student,Course,Enrollment,CourseEnrollmentCount,StudentCreate,EnrollmentCreate
+from batch import BATCH_CHUNK
+
+
+def create_students(session:Session,students:list[StudentCreate]) -> list[int]:
+    """Insert students a chunk at a time, returns their ids in input order"""
+    ids = []
+    now = datetime.utcnow()
+    for first in range(0,len(students),BATCH_CHUNK):
+        ids += session.execute(
+            insert(Student).returning(Student.id,sort_by_parameter_order=True),
+            [{**s.model_dump(),'created_at':now} for s in students[first:first + BATCH_CHUNK]]
+        ).scalars().all()
+    return ids
+
+
+def enroll(session:Session,requests:list[EnrollmentCreate]) -> dict:
+    """
+    Enroll students in bulk. Returns the new enrollment ids (None where
+    rejected, aligned with requests) and one {index, reason} per rejection:
+    unknown_student, unknown_course, duplicate or course_full
+    """
+    ids = [None] * len(requests)
+    reasons = {}
+    capacities = {}
+    new_by_course = defaultdict(list)
+    now = datetime.utcnow()
+
+    for first in range(0,len(requests),BATCH_CHUNK):
+        chunk = list(enumerate(requests[first:first + BATCH_CHUNK],start=first))
+        # foreign keys are not enforced by SQLite, so check the ids exist
+        students = set(session.exec(
+            select(Student.id).where(Student.id.in_({r.student_id for _,r in chunk}))
+        ).all())
+        capacities.update(session.exec(
+            select(Course.id,Course.capacity).where(Course.id.in_({r.course_id for _,r in chunk}))
+        ).all())
+        valid = []
+        for index,r in chunk:
+            if r.student_id not in students:
+                reasons[index] = 'unknown_student'
+            elif r.course_id not in capacities:
+                reasons[index] = 'unknown_course'
+            else:
+                valid.append((index,r))
+        if not valid:
+            continue
+
+        stmt = sqlite_insert(Enrollment).on_conflict_do_nothing(
+            index_elements=['student_id','course_id','school_year']
+        ).returning(Enrollment.id,Enrollment.student_id,Enrollment.course_id,Enrollment.school_year)
+        inserted = {
+            (student_id,course_id,school_year):id
+            for id,student_id,course_id,school_year in session.execute(stmt,[
+                {**r.model_dump(),'created_at':now} for _,r in valid
+            ]).all()
+        }
+        for index,r in valid:
+            # pop so a pair repeated inside the batch counts once
+            id = inserted.pop((r.student_id,r.course_id,r.school_year),None)
+            if id is None:
+                reasons[index] = 'duplicate'
+            else:
+                ids[index] = id
+                new_by_course[r.course_id,r.school_year].append(index)
+
+    if new_by_course:
+        stmt = sqlite_insert(CourseEnrollmentCount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['course_id','school_year'],
+            set_={'enrolled':CourseEnrollmentCount.enrolled + stmt.excluded.enrolled},
+        ).returning(CourseEnrollmentCount.course_id,CourseEnrollmentCount.school_year,CourseEnrollmentCount.enrolled)
+        counts = session.execute(stmt,[
+            {'course_id':course_id,'school_year':school_year,'enrolled':len(indexes)}
+            for (course_id,school_year),indexes in new_by_course.items()
+        ]).all()
+        for course_id,school_year,enrolled in counts:
+            capacity = capacities[course_id]
+            if capacity is None or enrolled <= capacity:
+                continue
+            # keep the earliest requests, the overflow is taken back out
+            overflow = new_by_course[course_id,school_year][-min(enrolled - capacity,len(new_by_course[course_id,school_year])):]
+            session.execute(delete(Enrollment).where(Enrollment.id.in_([ids[i] for i in overflow])))
+            session.execute(
+                CourseEnrollmentCount.__table__.update()
+                .where(CourseEnrollmentCount.course_id == course_id)
+                .where(CourseEnrollmentCount.school_year == school_year)
+                .values(enrolled=CourseEnrollmentCount.enrolled - len(overflow))
+            )
+            for index in overflow:
+                ids[index] = None
+                reasons[index] = 'course_full'
+
+    return {
+        'enrolled':sum(id is not None for id in ids),
+        'rejected':len(reasons),
+        'ids':ids,
+        'errors':[{'index':index,'reason':reason} for index,reason in sorted(reasons.items())],
+    }
+
+
+def course_roster(session:Session,course_id:int,school_year:str) -> dict:
+    """Course details and its enrolled students for one school year, one query. None for an unknown course"""
+    rows = session.exec(
+        select(
+            Course.name,Course.teacher,Course.schedule,Course.capacity,
+            Enrollment.id,Enrollment.status,
+            Student.id,Student.first_name,Student.last_name,Student.email,Student.grade_level,Student.section,
+        )
+        .select_from(Course)
+        .outerjoin(Enrollment,and_(Enrollment.course_id == Course.id,Enrollment.school_year == school_year))
+        .outerjoin(Student,Student.id == Enrollment.student_id)
+        .where(Course.id == course_id)
+        .order_by(Student.last_name,Student.first_name,Student.id)
+    ).all()
+    if not rows:
+        return None
+    name,teacher,schedule,capacity = rows[0][:4]
+    students = [
+        {
+            'enrollment_id':enrollment_id,'status':status,'student_id':student_id,
+            'first_name':first_name,'last_name':last_name,'email':email,
+            'grade_level':grade_level,'section':section,
+        }
+        for _,_,_,_,enrollment_id,status,student_id,first_name,last_name,email,grade_level,section in rows
+        if enrollment_id is not None
+    ]
+    return {
+        'course_id':course_id,'name':name,'teacher':teacher,'schedule':schedule,
+        'school_year':school_year,'capacity':capacity,'enrolled':len(students),
+        'students':students,
+    }
+
+
+def course_counts(session:Session,course:Course) -> list[dict]:
+    """Enrolled count and seats left per school year, from CourseEnrollmentCount"""
+    capacity = course.capacity
+    rows = session.exec(
+        select(CourseEnrollmentCount.school_year,CourseEnrollmentCount.enrolled)
+        .where(CourseEnrollmentCount.course_id == course.id)
+        .order_by(CourseEnrollmentCount.school_year)
+    ).all()
+    return [
+        {
+            'school_year':school_year,'enrolled':enrolled,'capacity':capacity,
+            'seats_left':None if capacity is None else max(capacity - enrolled,0),
+        }
+        for school_year,enrolled in rows
+    ]
+
+
+def _enrollment_counts():
+    return (
+        select(Enrollment.course_id,Enrollment.school_year,func.count())
+        .group_by(Enrollment.course_id,Enrollment.school_year)
+    )
+
+
+def rebuild_enrollment_counts(session:Session) -> int:
+    """Recompute CourseEnrollmentCount from Enrollment, returns row count"""
+    session.execute(delete(CourseEnrollmentCount))
+    session.execute(
+        insert(CourseEnrollmentCount).from_select(
+            ['course_id','school_year','enrolled'],_enrollment_counts()
+        )
+    )
+    return session.exec(select(func.count()).select_from(CourseEnrollmentCount)).one()
+
+
+def verify_enrollment_counts(session:Session) -> list[dict]:
+    """(course, school year) pairs whose counter differs from Enrollment, empty when in sync"""
+    expected = {(course_id,school_year):count for course_id,school_year,count in session.exec(_enrollment_counts()).all()}
+    stored = {
+        (row.course_id,row.school_year):row.enrolled
+        for row in session.exec(select(CourseEnrollmentCount)).all()
+    }
+    return [
+        {
+            'course_id':course_id,'school_year':school_year,
+            'expected':expected.get((course_id,school_year),0),
+            'stored':stored.get((course_id,school_year),0),
+        }
+        for course_id,school_year in sorted(expected.keys() | stored.keys())
+        if expected.get((course_id,school_year),0) != stored.get((course_id,school_year),0)
+    ]
@@ -1,9 +1,25 @@
-from fastapi import FastAPI,Depends
-from sqlmodel import Session,select
-from database import create_db_and_tables,get_session
-from models import Transaction
+import json
+from datetime import date
+from typing import Literal
+from fastapi import FastAPI,Depends,Request,Query,HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+from database import DB_STACK,create_db_and_tables,get_session
+from models import Transaction,Student,Course,StudentCreate,EnrollmentCreate
+from counters import apply_transactions,category_totals,dashboard_summary
+from pagination import PAGE_SIZE,MAX_PAGE_SIZE,transactions_page,parse_fields
+from batch import BATCH_CHUNK,MAX_BATCH_ITEMS,MAX_REPORTED_ERRORS,validate_chunk,insert_chunk
+from enrollment import create_students,enroll,course_roster,course_counts
+from profiling import SQLProfilerMiddleware,sql_profiler
 
 app = FastAPI()
+app.add_middleware(SQLProfilerMiddleware,profiler=sql_profiler)
+
+if DB_STACK == 'async':
+    # registered first, so these take /transactions and /dashboard over from the
+    # sync routes below, which then stay out of the OpenAPI schema
+    from async_routes import router as async_router
+    app.include_router(async_router)
 
 
 @app.on_event('startup')
@@ -12,37 +28,194 @@ def on_startup():
 
 
 
-@app.post('/transactions')
+@app.post('/transactions',include_in_schema=DB_STACK == 'sync')
 def create_transaction(transaction:Transaction,session:Session = Depends(get_session)):
     session.add(transaction)
+    # counted in the same transaction as the insert
+    apply_transactions(session,[transaction])
     session.commit()
     session.refresh(transaction)
     return transaction
 
 
+async def _ndjson_items(request:Request):
+    """Yield one decoded item per non-empty NDJSON line as the body streams in"""
+    buffer = b''
+    async for data in request.stream():
+        buffer += data
+        *lines,buffer = buffer.split(b'\n')
+        for line in lines:
+            if line.strip():
+                yield _decode(line)
+    if buffer.strip():
+        yield _decode(buffer)
+
+
+def _decode(line:bytes):
+    # a bad line is reported as that item's error, not the whole request's
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as exc:
+        return exc
+
+
+async def _array_items(request:Request):
+    try:
+        items = json.loads(await request.body())
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=422,detail=f'invalid JSON: {exc}')
+    if not isinstance(items,list):
+        raise HTTPException(status_code=422,detail='expected a JSON array of transactions')
+    for item in items:
+        yield item
+
+
+@app.post('/transactions/batch')
+async def create_transactions_batch(
+    request:Request,
+    strict:bool = Query(False,description='reject the whole batch if any item is invalid'),
+    session:Session = Depends(get_session)
+    ):
+    """
+    Insert many transactions in one database transaction. The body is a JSON
+    array, or NDJSON (one object per line) with Content-Type
+    application/x-ndjson. Invalid items are skipped and reported by index,
+    ids lines up with the input (null for rejected items).
+    """
+    if 'ndjson' in request.headers.get('content-type',''):
+        items = _ndjson_items(request)
+    else:
+        items = _array_items(request)
+
+    ids = []
+    errors = []
+    rejected = 0
+
+    async def flush(chunk:list,offset:int):
+        nonlocal rejected
+        models,positions,chunk_errors = validate_chunk(chunk)
+        new_ids = await run_in_threadpool(insert_chunk,session,models)
+        chunk_ids = [None] * len(chunk)
+        for position,new_id in zip(positions,new_ids):
+            chunk_ids[position] = new_id
+        ids.extend(chunk_ids)
+        rejected += len(chunk_errors)
+        for position in sorted(chunk_errors):
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'index':offset + position,'errors':chunk_errors[position]})
+
+    chunk = []
+    count = 0
+    try:
+        async for item in items:
+            count += 1
+            if count > MAX_BATCH_ITEMS:
+                raise HTTPException(status_code=413,detail=f'batches are limited to {MAX_BATCH_ITEMS} items')
+            chunk.append(item)
+            if len(chunk) >= BATCH_CHUNK:
+                await flush(chunk,count - len(chunk))
+                chunk = []
+        if chunk:
+            await flush(chunk,count - len(chunk))
+        if strict and rejected:
+            raise HTTPException(status_code=422,detail={'rejected':rejected,'errors':errors})
+    except HTTPException:
+        await run_in_threadpool(session.rollback)
+        raise
+    await run_in_threadpool(session.commit)
+    return {'inserted':count - rejected,'rejected':rejected,'ids':ids,'errors':errors}
+
+
+
+
+@app.get('/transactions',include_in_schema=DB_STACK == 'sync')
+def get_all_transaction(
+    limit:int = Query(PAGE_SIZE,ge=1,le=MAX_PAGE_SIZE),
+    cursor:str = Query(None,description='next_cursor of the previous page'),
+    fields:str = Query(None,description='comma separated columns, e.g. id,amount,category'),
+    category:str = Query(None),
+    start_date:date = Query(None),
+    end_date:date = Query(None),
+    order:Literal['asc','desc'] = Query('asc'),
+    session:Session = Depends(get_session)
+    ):
+    """Transactions by (created_at, id), one page at a time"""
+    try:
+        return transactions_page(
+            session,limit=limit,cursor=cursor,fields=parse_fields(fields),category=category,
+            start_date=start_date,end_date=end_date,descending=order == 'desc',
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422,detail=str(exc))
+
+
+
+@app.get('/dashboard',include_in_schema=DB_STACK == 'sync')
+def dashboard(session:Session = Depends(get_session)):
+    # one row per category from the running counters, not the whole history
+    return dashboard_summary(category_totals(session))
 
 
-@app.get('/transactions')
-def get_all_transaction(session:Session = Depends(get_session)):
-    transaction = session.exec(select(Transaction)).all()
-    return transaction
 
+@app.post('/api/v1/create/student')
+def create_student(student:Student,session:Session = Depends(get_session)):
+    session.add(student)
+    session.commit()
+    session.refresh(student)
+    return student
+
+
+@app.post('/api/v1/students/batch')
+def create_students_batch(students:list[StudentCreate],session:Session = Depends(get_session)):
+    """Insert many students in one transaction, ids come back in input order"""
+    ids = create_students(session,students)
+    session.commit()
+    return {'created':len(ids),'ids':ids}
+
+
+@app.post('/api/v1/create/course')
+def create_course(course:Course,session:Session = Depends(get_session)):
+    session.add(course)
+    session.commit()
+    session.refresh(course)
+    return course
+
+
+@app.post('/api/v1/enrollments/batch')
+def create_enrollments_batch(enrollments:list[EnrollmentCreate],session:Session = Depends(get_session)):
+    """
+    Enroll many students in one transaction. Duplicates, unknown ids and
+    requests past a course's capacity are skipped and reported by index
+    """
+    result = enroll(session,enrollments)
+    session.commit()
+    return result
+
+
+@app.get('/api/v1/courses/{course_id}/roster')
+def get_course_roster(course_id:int,school_year:str = Query(...),session:Session = Depends(get_session)):
+    roster = course_roster(session,course_id,school_year)
+    if roster is None:
+        raise HTTPException(status_code=404,detail='course not found')
+    return roster
+
+
+@app.get('/api/v1/courses/{course_id}/enrollment-counts')
+def get_course_enrollment_counts(course_id:int,session:Session = Depends(get_session)):
+    course = session.get(Course,course_id)
+    if course is None:
+        raise HTTPException(status_code=404,detail='course not found')
+    return course_counts(session,course)
 
 
-@app.get('/dashboard')
-def dashboard(session:Session = Depends(get_session)):
-    transaction = session.exec(select(Transaction)).all()
-    total_income = sum(t.amount for t in transaction if t.category == 'Income')
-    total_expense = sum(t.amount for t in transaction if t.category == 'Expense')
-    balance = total_income - total_expense
-    return {
-        "total_income":total_income,
-        "total_expense":total_expense,
-        "balance":balance,
-        "transaction_count":len(transaction)
-    }
 
 
+@app.get('/metrics')
+def metrics():
+    """Per-route SQL aggregates, N+1 suspects and the slowest statements (needs SQL_PROFILING=1)"""
+    return sql_profiler.snapshot()
 
 
-@app.post('api/v1/create/student')
+@app.delete('/metrics',status_code=204)
+def reset_metrics():
+    sql_profiler.reset()
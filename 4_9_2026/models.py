@@ -1,9 +1,15 @@
-from sqlmodel import SQLModel,Field
+from sqlmodel import SQLModel,Field,Index
 from datetime import datetime
 from typing import Optional
 
 
 class Transaction(SQLModel,table=True):
+    # keyset pagination walks (created_at, id), optionally within one category
+    __table_args__ = (
+        Index('ix_transaction_created_at_id','created_at','id'),
+        Index('ix_transaction_category_created_at_id','category','created_at','id'),
+    )
+
     id:Optional[int] = Field(default=None,primary_key=True)
     description:str
     amount:float
@@ -19,7 +25,7 @@ class Student(SQLModel,table=True):
     grade_level:str
     section:str
     status:str = 'Pending'
-    created_at:datetime = Field(default_factor=datetime.utcnow)
+    created_at:datetime = Field(default_factory=datetime.utcnow)
 
 
 class Course(SQLModel,table=True):
@@ -27,11 +33,57 @@ class Course(SQLModel,table=True):
     name:str
     teacher:str
     schedule:str
+    # seats per school year, None for no limit
+    capacity:Optional[int] = None
 
 class Enrollment(SQLModel,table=True):
+    # the unique index is the duplicate check, inserts never read first
+    __table_args__ = (
+        Index('ux_enrollment_student_course_year','student_id','course_id','school_year',unique=True),
+        Index('ix_enrollment_course_year','course_id','school_year'),
+    )
+
     id:Optional[int] = Field(default=None,primary_key=True)
     student_id:int = Field(foreign_key='student.id')
     course_id:int = Field(foreign_key='course.id')
     school_year:str
     status:str = 'Enrolled'
-    created_at:datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at:datetime = Field(default_factory=datetime.utcnow)
+
+
+class CourseEnrollmentCount(SQLModel,table=True):
+    """Enrollments per course per school year, kept in step by enrollment.py"""
+    course_id:int = Field(foreign_key='course.id',primary_key=True)
+    school_year:str = Field(primary_key=True)
+    enrolled:int = 0
+
+
+class DashboardCounter(SQLModel,table=True):
+    """Running total and row count per Transaction.category, see counters.py"""
+    category:str = Field(primary_key=True)
+    total_amount:float = 0.0
+    transaction_count:int = 0
+
+
+class TransactionCreate(SQLModel):
+    """Validated input row for POST /transactions/batch"""
+    description:str
+    amount:float
+    category:str
+    created_at:Optional[datetime] = None
+
+
+
+class StudentCreate(SQLModel):
+    first_name:str
+    last_name:str
+    email:str
+    grade_level:str
+    section:str
+    status:str = 'Pending'
+
+
+class EnrollmentCreate(SQLModel):
+    student_id:int
+    course_id:int
+    school_year:str
@@ -0,0 +1,101 @@
+"""
+Keyset pagination for GET /transactions
+
+Pages are ordered by (created_at, id) and the cursor is the last row's
+(created_at, id), so every page is an index range read of `limit` rows no
+matter how deep the client has paged.
+"""
+import base64
+import json
+import os
+from datetime import date,datetime,time,timedelta
+from sqlalchemy import tuple_
+from sqlmodel import Session,select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Transaction
+
+PAGE_SIZE = int(os.getenv('TRANSACTIONS_PAGE_SIZE','100'))
+MAX_PAGE_SIZE = int(os.getenv('TRANSACTIONS_MAX_PAGE_SIZE','1000'))
+TRANSACTION_FIELDS = tuple(Transaction.__table__.columns.keys())
+
+
+def encode_cursor(created_at:datetime,id:int) -> str:
+    raw = json.dumps([created_at.isoformat(),id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor:str) -> tuple[datetime,int]:
+    """Raises ValueError for anything encode_cursor did not produce"""
+    try:
+        created_at,id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at),int(id)
+    except (TypeError,ValueError) as exc:
+        raise ValueError('invalid cursor') from exc
+
+
+def parse_fields(fields:str) -> list[str]:
+    """Comma separated column names, all columns when empty"""
+    if not fields:
+        return list(TRANSACTION_FIELDS)
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = sorted(set(names) - set(TRANSACTION_FIELDS))
+    if unknown:
+        raise ValueError(f'unknown field(s) {unknown}, choose from {list(TRANSACTION_FIELDS)}')
+    return list(dict.fromkeys(names))
+
+
+def _page_query(limit:int,cursor:str,fields:list[str],category:str,start_date:date,end_date:date,
+                descending:bool):
+    # the sort key is always read so the next cursor can be built
+    columns = list(dict.fromkeys(fields + ['created_at','id']))
+    key = tuple_(Transaction.created_at,Transaction.id)
+    query = select(*(getattr(Transaction,name) for name in columns))
+    if category is not None:
+        query = query.where(Transaction.category == category)
+    if start_date is not None:
+        query = query.where(Transaction.created_at >= datetime.combine(start_date,time.min))
+    if end_date is not None:
+        query = query.where(Transaction.created_at < datetime.combine(end_date + timedelta(days=1),time.min))
+    if cursor is not None:
+        after = tuple_(*decode_cursor(cursor))
+        query = query.where(key < after if descending else key > after)
+    if descending:
+        query = query.order_by(Transaction.created_at.desc(),Transaction.id.desc())
+    else:
+        query = query.order_by(Transaction.created_at,Transaction.id)
+    # one extra row tells whether another page exists
+    return query.limit(limit + 1)
+
+
+def _page(rows:list,limit:int,fields:list[str]) -> dict:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at,last.id)
+    return {
+        'items':[{name:getattr(row,name) for name in fields} for row in rows],
+        'next_cursor':next_cursor,
+        'limit':limit,
+    }
+
+
+def transactions_page(session:Session,limit:int = PAGE_SIZE,cursor:str = None,fields:list[str] = None,
+                      category:str = None,start_date:date = None,end_date:date = None,
+                      descending:bool = False) -> dict:
+    """
+    One page of transactions as dicts with only `fields`, plus the cursor of
+    the next page (None on the last one). Dates filter created_at inclusively
+    """
+    fields = fields or list(TRANSACTION_FIELDS)
+    query = _page_query(limit,cursor,fields,category,start_date,end_date,descending)
+    return _page(session.exec(query).all(),limit,fields)
+
+
+async def transactions_page_async(session:AsyncSession,limit:int = PAGE_SIZE,cursor:str = None,
+                                  fields:list[str] = None,category:str = None,start_date:date = None,
+                                  end_date:date = None,descending:bool = False) -> dict:
+    """transactions_page on an AsyncSession"""
+    fields = fields or list(TRANSACTION_FIELDS)
+    query = _page_query(limit,cursor,fields,category,start_date,end_date,descending)
+    return _page((await session.exec(query)).all(),limit,fields)
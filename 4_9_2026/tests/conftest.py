@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel,Session,create_engine
+from database import get_session
+from main import app
+
+
+@pytest.fixture
+def engine():
+    """A fresh in-memory database, the tests never touch accounting.db"""
+    engine = create_engine('sqlite://',connect_args={'check_same_thread':False},poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(engine):
+    """The app on the in-memory database. Not entered as a context manager, so startup does not run"""
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = session_override
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,74 @@
+"""
+DB_STACK=async: the AsyncSession routes answer like the sync ones, and
+main.py serves them in place of the sync routes.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel,create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from async_routes import router
+from database import get_async_session
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    path = tmp_path / 'async.db'
+    SQLModel.metadata.create_all(create_engine(f'sqlite:///{path}'))
+    engine = create_async_engine(f'sqlite+aiosqlite:///{path}')
+
+    async def session_override():
+        async with AsyncSession(engine,expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_session] = session_override
+    with TestClient(app) as client:
+        yield client
+
+
+def exercise(client) -> tuple:
+    for amount,category in [(100.0,'Income'),(40.0,'Expense'),(5.0,'Income')]:
+        created = client.post('/transactions',json={'description':category,'amount':amount,'category':category})
+        assert created.status_code == 200
+    first = client.get('/transactions',params={'limit':2,'fields':'amount,category'}).json()
+    second = client.get('/transactions',params={'limit':2,'fields':'amount,category','cursor':first['next_cursor']}).json()
+    return first['items'] + second['items'],second['next_cursor'],client.get('/dashboard').json()
+
+
+def test_async_routes_answer_like_the_sync_routes(async_client,client):
+    assert exercise(async_client) == exercise(client)
+
+
+def test_async_routes_reject_bad_parameters(async_client):
+    assert async_client.get('/transactions',params={'cursor':'garbage'}).status_code == 422
+    assert async_client.get('/transactions',params={'fields':'nope'}).status_code == 422
+
+
+def test_db_stack_async_serves_the_async_routes(tmp_path):
+    # DB_STACK is read at import, so check it in a fresh interpreter; the sync
+    # session is made to fail, so only the async routes can answer
+    script = '\n'.join([
+        'from fastapi.testclient import TestClient',
+        'import database,main',
+        'def broken(): raise RuntimeError("sync session used")',
+        'database.create_db_and_tables()',
+        'main.app.dependency_overrides[database.get_session] = broken',
+        'client = TestClient(main.app)',
+        'assert client.post("/transactions",json={"description":"d","amount":1.0,"category":"Income"}).status_code == 200',
+        'assert client.get("/transactions").json()["items"][0]["amount"] == 1.0',
+        'assert client.get("/dashboard").json()["transaction_count"] == 1',
+    ])
+    result = subprocess.run(
+        [sys.executable,'-c',script],cwd=tmp_path,capture_output=True,text=True,
+        env={**os.environ,'DB_STACK':'async','PYTHONPATH':str(APP_DIR)},
+    )
+    assert result.returncode == 0,result.stderr[-2000:]
@@ -0,0 +1,70 @@
+"""
+POST /transactions/batch: JSON arrays and NDJSON, per-item errors aligned
+with the input, strict mode, chunking and the size limit.
+"""
+import json
+import pytest
+from sqlmodel import select,func
+import main
+from counters import verify_counters
+from models import Transaction
+
+
+def item(amount=1.0,category='Income',**extra):
+    return {'description':'d','amount':amount,'category':category,**extra}
+
+
+def count(session) -> int:
+    return session.exec(select(func.count()).select_from(Transaction)).one()
+
+
+def test_invalid_items_are_skipped_and_reported_by_index(client,session):
+    body = [item(10.0),item('lots'),item(5.0,'Expense'),{'amount':1.0}]
+    result = client.post('/transactions/batch',json=body).json()
+    assert result['inserted'] == 2 and result['rejected'] == 2
+    assert [id is not None for id in result['ids']] == [True,False,True,False]
+    assert [error['index'] for error in result['errors']] == [1,3]
+    assert {error['loc'][0] for error in result['errors'][1]['errors']} == {'description','category'}
+    assert count(session) == 2
+    assert verify_counters(session) == []
+
+
+def test_ndjson_reports_lines_that_do_not_parse(client,session):
+    lines = [json.dumps(item(1.0)),'{not json',json.dumps(item(2.0)),'']
+    response = client.post(
+        '/transactions/batch',content='\n'.join(lines),headers={'content-type':'application/x-ndjson'}
+    )
+    result = response.json()
+    assert result['inserted'] == 2
+    assert result['errors'][0]['index'] == 1
+    assert result['errors'][0]['errors'][0]['msg'].startswith('invalid JSON')
+    assert count(session) == 2
+
+
+def test_strict_batch_with_an_invalid_item_writes_nothing(client,session):
+    response = client.post('/transactions/batch',params={'strict':True},json=[item(1.0),item('x')])
+    assert response.status_code == 422
+    assert response.json()['detail']['rejected'] == 1
+    assert count(session) == 0
+
+
+def test_ids_stay_aligned_across_chunks(client,session,monkeypatch):
+    monkeypatch.setattr(main,'BATCH_CHUNK',2)
+    body = [item(float(i)) if i != 3 else item('bad') for i in range(5)]
+    result = client.post('/transactions/batch',json=body).json()
+    assert [e['index'] for e in result['errors']] == [3]
+    amounts = {t.id:t.amount for t in session.exec(select(Transaction)).all()}
+    assert [amounts.get(id) for id in result['ids']] == [0.0,1.0,2.0,None,4.0]
+
+
+@pytest.mark.parametrize('body',['{"description":"not an array"}','[1,'])
+def test_malformed_bodies_are_a_422(client,body):
+    response = client.post('/transactions/batch',content=body,headers={'content-type':'application/json'})
+    assert response.status_code == 422
+
+
+def test_oversized_batch_is_a_413(client,session,monkeypatch):
+    monkeypatch.setattr(main,'MAX_BATCH_ITEMS',2)
+    response = client.post('/transactions/batch',json=[item(),item(),item()])
+    assert response.status_code == 413
+    assert count(session) == 0
@@ -0,0 +1,58 @@
+"""
+Running dashboard totals: DashboardCounter follows every insert, falls back
+to the grouped aggregate when empty, and can be verified and rebuilt.
+"""
+from sqlmodel import select
+import database
+from counters import category_totals,rebuild_counters,verify_counters
+from models import DashboardCounter,Transaction
+
+
+def post(client,amount,category):
+    response = client.post('/transactions',json={'description':category,'amount':amount,'category':category})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_dashboard_follows_new_transactions(client,session):
+    post(client,100.0,'Income')
+    post(client,25.5,'Expense')
+    post(client,50.0,'Income')
+    assert client.get('/dashboard').json() == {
+        'total_income':150.0,'total_expense':25.5,'balance':124.5,'transaction_count':3,
+    }
+    assert verify_counters(session) == []
+
+
+def test_totals_fall_back_to_the_table_without_counters(session):
+    session.add_all([
+        Transaction(description='a',amount=10.0,category='Income'),
+        Transaction(description='b',amount=4.0,category='Expense'),
+    ])
+    session.commit()
+    assert session.exec(select(DashboardCounter)).first() is None
+    assert category_totals(session) == {'Income':(10.0,1),'Expense':(4.0,1)}
+
+
+def test_verify_reports_drift_and_rebuild_fixes_it(client,session):
+    post(client,100.0,'Income')
+    post(client,30.0,'Expense')
+    session.get(DashboardCounter,'Income').total_amount = 90.0
+    session.delete(session.get(DashboardCounter,'Expense'))
+    session.commit()
+    assert verify_counters(session) == [
+        {'category':'Expense','expected_amount':30.0,'expected_count':1,'stored_amount':0.0,'stored_count':0},
+        {'category':'Income','expected_amount':100.0,'expected_count':1,'stored_amount':90.0,'stored_count':1},
+    ]
+    assert rebuild_counters(session) == 2
+    session.commit()
+    assert verify_counters(session) == []
+
+
+def test_startup_backfills_counters_for_existing_transactions(engine,session,monkeypatch):
+    session.add(Transaction(description='a',amount=10.0,category='Income'))
+    session.commit()
+    monkeypatch.setattr(database,'engine',engine)
+    database.create_db_and_tables()
+    session.expire_all()
+    assert session.get(DashboardCounter,'Income').transaction_count == 1
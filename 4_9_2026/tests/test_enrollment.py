@@ -0,0 +1,108 @@
+"""
+Bulk enrollment: rejections by reason, capacity, and CourseEnrollmentCount
+staying in step with Enrollment.
+"""
+import pytest
+from sqlmodel import select
+import database
+from enrollment import create_students,enroll,rebuild_enrollment_counts,verify_enrollment_counts
+from models import Course,CourseEnrollmentCount,Enrollment,EnrollmentCreate,StudentCreate
+
+YEAR = '2026-2027'
+
+
+@pytest.fixture
+def school(session):
+    """Four students, course 1 with 2 seats and course 2 without a limit"""
+    students = create_students(session,[
+        StudentCreate(first_name=f'S{i}',last_name='Test',email=f's{i}@example.com',grade_level='10',section='A')
+        for i in range(4)
+    ])
+    session.add(Course(id=1,name='Algebra',teacher='T',schedule='Mon',capacity=2))
+    session.add(Course(id=2,name='Art',teacher='T',schedule='Tue'))
+    session.commit()
+    return students
+
+
+def requests(*pairs,year=YEAR) -> list[EnrollmentCreate]:
+    return [EnrollmentCreate(student_id=student,course_id=course,school_year=year) for student,course in pairs]
+
+
+def counts(session) -> dict:
+    return {(row.course_id,row.school_year):row.enrolled for row in session.exec(select(CourseEnrollmentCount)).all()}
+
+
+def test_rejections_are_reported_by_index(session,school):
+    s1,s2,s3,s4 = school
+    result = enroll(session,requests((s1,2),(s1,2),(999,2),(s2,999),(s1,1),(s2,1),(s3,1),(s4,2)))
+    session.commit()
+    assert result['enrolled'] == 4 and result['rejected'] == 4
+    assert result['errors'] == [
+        {'index':1,'reason':'duplicate'},
+        {'index':2,'reason':'unknown_student'},
+        {'index':3,'reason':'unknown_course'},
+        {'index':6,'reason':'course_full'},
+    ]
+    assert [id is not None for id in result['ids']] == [True,False,False,False,True,True,False,True]
+    assert counts(session) == {(1,YEAR):2,(2,YEAR):2}
+
+
+def test_duplicates_of_earlier_batches_and_full_courses_across_batches(session,school):
+    s1,s2,s3,_ = school
+    enroll(session,requests((s1,1)))
+    session.commit()
+    result = enroll(session,requests((s1,1),(s2,1),(s3,1)))
+    session.commit()
+    assert result['errors'] == [{'index':0,'reason':'duplicate'},{'index':2,'reason':'course_full'}]
+    assert counts(session) == {(1,YEAR):2}
+    assert len(session.exec(select(Enrollment).where(Enrollment.course_id == 1)).all()) == 2
+
+
+def test_capacity_is_per_school_year(session,school):
+    s1,s2,s3,_ = school
+    result = enroll(session,requests((s1,1),(s2,1),(s3,1),year='2026-2027') + requests((s3,1),year='2027-2028'))
+    session.commit()
+    assert [e['reason'] for e in result['errors']] == ['course_full']
+    assert counts(session) == {(1,'2026-2027'):2,(1,'2027-2028'):1}
+
+
+def test_counts_verify_and_rebuild(session,school):
+    s1,s2,s3,s4 = school
+    enroll(session,requests((s1,2),(s2,2),(s3,1)))
+    session.commit()
+    assert verify_enrollment_counts(session) == []
+
+    session.get(CourseEnrollmentCount,(2,YEAR)).enrolled = 7
+    session.delete(session.get(CourseEnrollmentCount,(1,YEAR)))
+    session.commit()
+    assert verify_enrollment_counts(session) == [
+        {'course_id':1,'school_year':YEAR,'expected':1,'stored':0},
+        {'course_id':2,'school_year':YEAR,'expected':2,'stored':7},
+    ]
+    assert rebuild_enrollment_counts(session) == 2
+    session.commit()
+    assert verify_enrollment_counts(session) == []
+    assert counts(session) == {(1,YEAR):1,(2,YEAR):2}
+
+
+def test_enrollment_endpoints(client,session,school):
+    s1,s2,s3,_ = school
+    body = [{'student_id':s,'course_id':1,'school_year':YEAR} for s in (s1,s2,s3)]
+    result = client.post('/api/v1/enrollments/batch',json=body).json()
+    assert result['enrolled'] == 2 and result['errors'] == [{'index':2,'reason':'course_full'}]
+    assert client.get('/api/v1/courses/1/enrollment-counts').json() == [
+        {'school_year':YEAR,'enrolled':2,'capacity':2,'seats_left':0},
+    ]
+    roster = client.get('/api/v1/courses/1/roster',params={'school_year':YEAR}).json()
+    assert [student['student_id'] for student in roster['students']] == [s1,s2]
+    assert client.get('/api/v1/courses/999/roster',params={'school_year':YEAR}).status_code == 404
+
+
+def test_startup_backfills_counts_for_existing_enrollments(engine,session,school,monkeypatch):
+    s1,s2,_,_ = school
+    session.add_all([Enrollment(student_id=s,course_id=2,school_year=YEAR) for s in (s1,s2)])
+    session.commit()
+    assert counts(session) == {}
+    monkeypatch.setattr(database,'engine',engine)
+    database.create_db_and_tables()
+    assert counts(session) == {(2,YEAR):2}
@@ -0,0 +1,60 @@
+"""
+GET /transactions keyset pages: every row exactly once in (created_at, id)
+order, ties on created_at, filters, field selection and bad cursors.
+"""
+from datetime import datetime,timedelta
+import pytest
+from models import Transaction
+from pagination import decode_cursor,encode_cursor
+
+START = datetime(2026,4,1,9,0)
+
+
+@pytest.fixture
+def transactions(session):
+    """12 rows, created_at advancing every third row so pages split ties"""
+    rows = [
+        Transaction(description=str(i),amount=float(i),category='Income' if i % 2 else 'Expense',
+                    created_at=START + timedelta(days=i // 3))
+        for i in range(12)
+    ]
+    session.add_all(rows)
+    session.commit()
+    return [(row.created_at,row.id) for row in rows]
+
+
+def walk(client,**params) -> list[dict]:
+    items,cursor = [],None
+    while True:
+        page = client.get('/transactions',params={**params,**({'cursor':cursor} if cursor else {})}).json()
+        items += page['items']
+        cursor = page['next_cursor']
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize('limit',[1,4,5,12,50])
+def test_pages_cover_every_row_once_in_order(client,transactions,limit):
+    ids = [item['id'] for item in walk(client,limit=limit)]
+    assert ids == [id for _,id in sorted(transactions)]
+    ids = [item['id'] for item in walk(client,limit=limit,order='desc')]
+    assert ids == [id for _,id in sorted(transactions,reverse=True)]
+
+
+def test_filters_and_fields(client,transactions):
+    items = walk(client,limit=2,category='Income',start_date='2026-04-02',end_date='2026-04-03',fields='id,amount')
+    assert items == [{'id':4,'amount':3.0},{'id':6,'amount':5.0},{'id':8,'amount':7.0}]
+
+
+def test_last_page_has_no_cursor(client,transactions):
+    page = client.get('/transactions',params={'limit':12}).json()
+    assert len(page['items']) == 12 and page['next_cursor'] is None
+
+
+@pytest.mark.parametrize('params',[{'cursor':'garbage'},{'fields':'id,secret'},{'limit':0}])
+def test_bad_parameters_are_a_422(client,transactions,params):
+    assert client.get('/transactions',params=params).status_code == 422
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(START,42)) == (START,42)
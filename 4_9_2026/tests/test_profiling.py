@@ -0,0 +1,14 @@
+"""profiling.py is a vendored copy of 4_8_2026/app/profiling.py and must not drift"""
+from pathlib import Path
+import pytest
+
+HERE = Path(__file__).resolve().parent.parent
+ORIGINAL = HERE.parent / '4_8_2026' / 'app' / 'profiling.py'
+
+
+@pytest.mark.skipif(not ORIGINAL.exists(),reason='4_8_2026 is not checked out alongside')
+def test_vendored_profiling_matches_the_original():
+    lines = (HERE / 'profiling.py').read_text().splitlines(keepends=True)
+    while lines[0].startswith('#'):
+        lines.pop(0)
+    assert ''.join(lines) == ORIGINAL.read_text(),'copy 4_8_2026/app/profiling.py over profiling.py'
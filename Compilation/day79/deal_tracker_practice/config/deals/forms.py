@@ -0,0 +1,20 @@
+from django import forms
+
+from .models import Deal
+
+
+class DealFilterForm(forms.Form):
+    stage = forms.ChoiceField(choices=[('', 'All stages')] + Deal.STAGE_CHOICE, required=False)
+    min_amount = forms.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=0)
+    max_amount = forms.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=0)
+
+    def filter(self, queryset):
+        """Apply the cleaned filters, call after is_valid()"""
+        data = self.cleaned_data
+        if data.get('stage'):
+            queryset = queryset.filter(stage=data['stage'])
+        if data.get('min_amount') is not None:
+            queryset = queryset.filter(amount__gte=data['min_amount'])
+        if data.get('max_amount') is not None:
+            queryset = queryset.filter(amount__lte=data['max_amount'])
+        return queryset
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deals", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="deal",
+            index=models.Index(fields=["stage", "amount"], name="deal_stage_amount_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="deal",
+            index=models.Index(fields=["amount"], name="deal_amount_idx"),
+        ),
+    ]
@@ -27,6 +27,13 @@ class Deal(models.Model):
     stage = models.CharField(max_length=20,choices=STAGE_CHOICE,default=NEW)
     probability = models.PositiveIntegerField(default=10,editable=False)
 
+    class Meta:
+        # the deal list pages by (amount, id) descending, within a stage when filtered
+        indexes = [
+            models.Index(fields=['stage','amount'],name='deal_stage_amount_idx'),
+            models.Index(fields=['amount'],name='deal_amount_idx'),
+        ]
+
     def save(self,*args, **kwargs):
 
         if self.stage == self.NEW:
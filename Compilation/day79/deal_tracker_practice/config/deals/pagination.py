@@ -0,0 +1,58 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+
+# Keyset pages over deals ordered by (amount, id) descending.
+# A cursor is the "amount_id" of the row a page starts after (?after=) or
+# ends before (?before=), so every page is one index range read of
+# PAGE_SIZE + 1 rows however deep it is, and nothing counts the table.
+
+PAGE_SIZE = 20
+ORDERING = ('-amount', '-id')
+
+
+def encode_cursor(deal):
+    return f'{deal.amount}_{deal.pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        amount, pk = cursor.split('_')
+        return Decimal(amount), int(pk)
+    except (ValueError, InvalidOperation):
+        raise BadRequest('invalid page cursor')
+
+
+def keyset_page(queryset, after=None, before=None, size=PAGE_SIZE):
+    """
+    One page of queryset as (rows, next_cursor, previous_cursor), the
+    cursors are None at either end
+    """
+    if after and before:
+        raise BadRequest('use either after or before')
+    # amount__lte / gte bounds the index range, the Q picks the side of the tie
+    if before:
+        amount, pk = decode_cursor(before)
+        rows = list(
+            queryset.filter(Q(amount__gt=amount) | Q(amount=amount, id__gt=pk), amount__gte=amount)
+            .order_by('amount', 'id')[:size + 1]
+        )
+        more_before = len(rows) > size
+        rows = rows[:size][::-1]
+        more_after = True
+    else:
+        if after:
+            amount, pk = decode_cursor(after)
+            queryset = queryset.filter(Q(amount__lt=amount) | Q(amount=amount, id__lt=pk), amount__lte=amount)
+        rows = list(queryset.order_by(*ORDERING)[:size + 1])
+        more_after = len(rows) > size
+        rows = rows[:size]
+        more_before = bool(after)
+    if not rows:
+        return rows, None, None
+    return (
+        rows,
+        encode_cursor(rows[-1]) if more_after else None,
+        encode_cursor(rows[0]) if more_before else None,
+    )
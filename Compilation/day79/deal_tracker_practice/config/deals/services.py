@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+
+from .models import Deal
+
+# Pipeline numbers per stage, computed by the database in one grouped query
+# and kept in the cache until a Deal is saved or deleted (see signals.py).
+
+PIPELINE_CACHE_KEY = 'deals:pipeline_summary'
+CENTS = Decimal('0.01')
+
+
+def compute_pipeline_summary():
+    # amount * probability, summed per stage; the /100 happens once per stage below
+    weighted = ExpressionWrapper(
+        F('amount') * F('probability'),
+        output_field=DecimalField(max_digits=17, decimal_places=2),
+    )
+    rows = (
+        Deal.objects
+        .order_by()  # no default ordering sneaking into the GROUP BY
+        .values('stage')
+        .annotate(count=Count('id'), total_amount=Sum('amount'), weighted=Sum(weighted))
+    )
+    by_stage = {row['stage']: row for row in rows}
+
+    stages = []
+    for stage, label in Deal.STAGE_CHOICE:
+        row = by_stage.get(stage, {})
+        stages.append({
+            'stage': stage,
+            'label': label,
+            'count': row.get('count', 0),
+            'total_amount': (row.get('total_amount') or Decimal(0)).quantize(CENTS),
+            'weighted_forecast': ((row.get('weighted') or Decimal(0)) / 100).quantize(CENTS),
+        })
+    return {
+        'stages': stages,
+        'count': sum(s['count'] for s in stages),
+        'total_amount': sum((s['total_amount'] for s in stages), Decimal(0)),
+        'weighted_forecast': sum((s['weighted_forecast'] for s in stages), Decimal(0)),
+    }
+
+
+def pipeline_summary():
+    summary = cache.get(PIPELINE_CACHE_KEY)
+    if summary is None:
+        summary = compute_pipeline_summary()
+        # no expiry, the Deal signals delete it when it goes stale
+        cache.set(PIPELINE_CACHE_KEY, summary, timeout=None)
+    return summary
+
+
+def invalidate_pipeline_summary():
+    cache.delete(PIPELINE_CACHE_KEY)
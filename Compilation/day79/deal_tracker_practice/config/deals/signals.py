@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Deal
+from .services import invalidate_pipeline_summary
+
+# QuerySet.update() and bulk_create() send no signals, call
+# invalidate_pipeline_summary() after those yourself.
+
+
+@receiver(post_save, sender=Deal)
+@receiver(post_delete, sender=Deal)
+def deal_changed(sender, **kwargs):
+    # after commit, so a request cannot re-cache the old totals in between
+    transaction.on_commit(invalidate_pipeline_summary)
@@ -1,3 +1,130 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Deal
+from .pagination import keyset_page
+from .services import PIPELINE_CACHE_KEY, pipeline_summary
 
 # Create your tests here.
+
+
+class PipelineSummaryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Deal.objects.create(title='A', amount=Decimal('1000.00'), stage=Deal.NEW)
+        Deal.objects.create(title='B', amount=Decimal('2500.50'), stage=Deal.NEW)
+        Deal.objects.create(title='C', amount=Decimal('400.00'), stage=Deal.NEGOTIATION)
+        Deal.objects.create(title='D', amount=Decimal('999.99'), stage=Deal.LOST)
+
+    def stage(self, summary, stage):
+        return next(row for row in summary['stages'] if row['stage'] == stage)
+
+    def test_totals_per_stage(self):
+        summary = pipeline_summary()
+        new = self.stage(summary, Deal.NEW)
+        self.assertEqual(new['count'], 2)
+        self.assertEqual(new['total_amount'], Decimal('3500.50'))
+        self.assertEqual(new['weighted_forecast'], Decimal('350.05'))
+        self.assertEqual(self.stage(summary, Deal.NEGOTIATION)['weighted_forecast'], Decimal('320.00'))
+        self.assertEqual(self.stage(summary, Deal.LOST)['weighted_forecast'], Decimal('0.00'))
+        self.assertEqual(self.stage(summary, Deal.WON)['count'], 0)
+        self.assertEqual(summary['count'], 4)
+        self.assertEqual(summary['total_amount'], Decimal('4900.49'))
+        self.assertEqual(summary['weighted_forecast'], Decimal('670.05'))
+
+    def test_one_query_then_cached(self):
+        with self.assertNumQueries(1):
+            pipeline_summary()
+        with self.assertNumQueries(0):
+            pipeline_summary()
+
+    def test_save_and_delete_invalidate(self):
+        pipeline_summary()
+        with self.captureOnCommitCallbacks(execute=True):
+            deal = Deal.objects.create(title='E', amount=Decimal('100.00'), stage=Deal.WON)
+        self.assertIsNone(cache.get(PIPELINE_CACHE_KEY))
+        self.assertEqual(self.stage(pipeline_summary(), Deal.WON)['weighted_forecast'], Decimal('100.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deal.delete()
+        self.assertEqual(self.stage(pipeline_summary(), Deal.WON)['count'], 0)
+
+    def test_list_page_shows_pipeline(self):
+        response = self.client.get(reverse('deal_list'))
+        self.assertContains(response, 'Weighted Forecast')
+        self.assertContains(response, '₱350.05')
+
+
+class DealListPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        stages = [stage for stage, _ in Deal.STAGE_CHOICE]
+        # repeated amounts, so pages split inside a tie
+        Deal.objects.bulk_create([
+            Deal(title=f'Deal {i}', amount=Decimal(100 + (i % 7) * 50), stage=stages[i % len(stages)])
+            for i in range(53)
+        ])
+
+    def walk(self, queryset, size):
+        pages = []
+        rows, next_cursor, previous_cursor = keyset_page(queryset, size=size)
+        self.assertIsNone(previous_cursor)
+        pages.append(rows)
+        while next_cursor:
+            rows, next_cursor, previous_cursor = keyset_page(queryset, after=next_cursor, size=size)
+            pages.append(rows)
+        return pages
+
+    def test_pages_cover_the_ordered_table(self):
+        expected = list(Deal.objects.order_by('-amount', '-id'))
+        pages = self.walk(Deal.objects.all(), 10)
+        self.assertEqual([len(page) for page in pages], [10, 10, 10, 10, 10, 3])
+        self.assertEqual([deal for page in pages for deal in page], expected)
+
+    def test_previous_pages_walk_back(self):
+        pages = self.walk(Deal.objects.all(), 10)
+        _, _, cursor = keyset_page(Deal.objects.all(), after=f'{pages[-2][-1].amount}_{pages[-2][-1].pk}', size=10)
+        for page in reversed(pages[:-1]):
+            rows, next_cursor, cursor = keyset_page(Deal.objects.all(), before=cursor, size=10)
+            self.assertEqual(rows, page)
+            self.assertIsNotNone(next_cursor)
+        self.assertIsNone(cursor)
+
+    def test_filters(self):
+        response = self.client.get(reverse('deal_list'), {'stage': Deal.WON, 'min_amount': '200'})
+        deals = response.context['deals']
+        self.assertTrue(deals)
+        self.assertTrue(all(d.stage == Deal.WON and d.amount >= 200 for d in deals))
+        self.assertEqual(
+            [d.pk for d in deals],
+            list(Deal.objects.filter(stage=Deal.WON, amount__gte=200).order_by('-amount', '-id').values_list('pk', flat=True)[:20]),
+        )
+
+    def test_list_page_is_paginated(self):
+        response = self.client.get(reverse('deal_list'))
+        self.assertEqual(len(response.context['deals']), 20)
+        self.assertContains(response, 'after=' + response.context['next_cursor'])
+        response = self.client.get(reverse('deal_list'), {'after': response.context['next_cursor']})
+        self.assertEqual(len(response.context['deals']), 20)
+        self.assertIsNotNone(response.context['previous_cursor'])
+
+    def test_bad_cursor_is_a_400(self):
+        self.assertEqual(self.client.get(reverse('deal_list'), {'after': 'nope'}).status_code, 400)
+
+    def test_pages_read_an_index_without_sorting(self):
+        for queryset in (Deal.objects.all(), Deal.objects.filter(stage=Deal.NEW, amount__gte=150)):
+            _, next_cursor, _ = keyset_page(queryset, size=5)
+            with CaptureQueriesContext(connection) as queries:
+                keyset_page(queryset, after=next_cursor, size=5)
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {queries[0]["sql"]}')
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+            self.assertIn('USING INDEX', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
@@ -1,15 +1,41 @@
 from django.shortcuts import render
 from django.views.generic import ListView,CreateView,UpdateView
 from .models import Deal
+from .forms import DealFilterForm
+from .pagination import keyset_page
+from .services import pipeline_summary
 from django.urls import reverse_lazy
 
 
 
+# what deal_list.html reads from a deal
+LIST_FIELDS = ['id','title','amount','stage','probability']
+
+
 class DealListView(ListView):
     model = Deal
     template_name = 'deals/deal_list.html'
     context_object_name = 'deals'
-    
+
+    def get_queryset(self):
+        self.filter_form = DealFilterForm(self.request.GET or None)
+        queryset = Deal.objects.only(*LIST_FIELDS)
+        if self.filter_form.is_valid():
+            queryset = self.filter_form.filter(queryset)
+        # one keyset page, see pagination.py
+        deals,self.next_cursor,self.previous_cursor = keyset_page(
+            queryset,after=self.request.GET.get('after'),before=self.request.GET.get('before')
+        )
+        return deals
+
+    def get_context_data(self,**kwargs):
+        context = super().get_context_data(**kwargs)
+        context['pipeline'] = pipeline_summary()
+        context['filter_form'] = self.filter_form
+        context['next_cursor'] = self.next_cursor
+        context['previous_cursor'] = self.previous_cursor
+        return context
+
 class DealCreateView(CreateView):
     model = Deal
     fields = ['title','amount','stage']